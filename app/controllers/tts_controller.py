@@ -1,9 +1,19 @@
-from typing import Dict, List
-from fastapi import APIRouter, HTTPException, UploadFile
+import asyncio
+import io
+import json
+import multiprocessing
+from typing import Callable, Dict, List, Optional
+from fastapi import APIRouter, HTTPException, Query, UploadFile
+from fastapi.responses import RedirectResponse, StreamingResponse
 from app.models.information_model import CreateVoiceModel, InformationModel
 from app.models.tts_model import TextToSpeechRequestById, TextToSpeechRequestByName, TextToSpeechRequestOptional
 from app.services.container_service import ServiceContainer
+from app.services.jobs.job_store import JobStore
+from app.services.jobs.job_worker import build_job_store, start_worker_processes, stop_worker_processes
+from app.services.jobs.prewarm import Prewarmer, read_corpus
+from app.services.tts.provider_stream import ProviderStreamingResponse
 from app.services.tts.tts_service import TTSService
+from app.services.voices.voice_registry import VoiceRegistry
 from app.services.zip_service import ZipService
 from app.validators.tts_validator import TTSValidator
 from ..utils.yaml_loader import YamlLoaderMixin
@@ -17,23 +27,93 @@ class AppConfig(YamlLoaderMixin):
 app_config = AppConfig()
 aws_config = app_config.load_yaml('config.yaml')['aws']
 db_config = app_config.load_yaml('config.yaml')['db']['mysql']
+cache_config = app_config.load_yaml('config.yaml')['db']['cache']
+feed_config = app_config.load_yaml('config.yaml')['db']['change_feed']
+batch_config = app_config.load_yaml('config.yaml')['api']['batch']
+zip_config = app_config.load_yaml('config.yaml')['api']['zip']
+jobs_config = app_config.load_yaml('config.yaml')['api']['jobs']
 
 output_dir = "app/resources/audios"
 router = APIRouter()
 
-# Crear el contenedor de servicios
-service_container = ServiceContainer(
-    output_dir=output_dir,
-    aws_config=aws_config,
-    db_config=db_config
-)
+tts_validator = TTSValidator()
 
-# Obtener el listado de los modelos
-voices = service_container.db_service.get_models()
+# Los servicios se crean en el arranque de la aplicación (lifespan), no al importar el módulo
+service_container: Optional[ServiceContainer] = None
+tts_service: Optional[TTSService] = None
+voice_registry: Optional[VoiceRegistry] = None
+job_store: Optional[JobStore] = None
+job_processes: List[multiprocessing.Process] = []
 
-# Crear el servicio TTS usando el contenedor
-tts_service = TTSService(service_container, voices)
-tts_validator = TTSValidator()
+def init_services() -> None:
+    """Crea el contenedor de servicios, carga los modelos de voz e inicia la precarga del caché."""
+    global service_container, tts_service, voice_registry, job_store, job_processes
+
+    # Crear el contenedor de servicios
+    service_container = ServiceContainer(
+        output_dir=output_dir,
+        aws_config=aws_config,
+        db_config=db_config,
+        cache_config=cache_config,
+        feed_config=feed_config
+    )
+
+    # Cargar los modelos de voz
+    voice_registry = service_container.voice_registry
+    voice_registry.refresh()
+
+    # Crear el servicio TTS usando el contenedor
+    tts_service = TTSService(service_container)
+
+    # El caché se precarga en segundo plano; el servicio acepta solicitudes mientras tanto
+    service_container.db_service.start_cache_warmup()
+
+    # Propagar los audios y modelos creados por otros workers
+    service_container.change_feed.start()
+
+    # Cola de trabajos. Los workers se ejecutan aparte (`python -m app.services.jobs.job_worker`); solo se
+    # embeben en la API si `api.jobs.workers` es mayor que 0, pensado para despliegues de un solo proceso
+    job_store = build_job_store(jobs_config)
+    job_processes = start_worker_processes(jobs_config.get('workers', 0))
+
+def shutdown_services() -> None:
+    """Detiene la precarga del caché, los workers de trabajos y libera el pool de hilos y las conexiones a los proveedores."""
+    stop_worker_processes(job_processes)
+    if service_container:
+        service_container.change_feed.stop()
+        service_container.db_service.stop_cache_warmup()
+    if tts_service:
+        tts_service.executor.shutdown(wait=False)
+        for provider in tts_service.providers.values():
+            provider.close()
+    if service_container:
+        service_container.db_service.close()
+
+async def resolve_model(lookup: Callable[[], Optional[InformationModel]]) -> Optional[InformationModel]:
+    """Busca un modelo en el registro; si no existe, carga los modelos nuevos de la BD y reintenta.
+    Args:
+        lookup (Callable[[], Optional[InformationModel]]): Búsqueda sobre el registro de voces.
+    Returns:
+        Optional[InformationModel]: Modelo encontrado o None.
+    """
+    model = lookup()
+    if model is None and await tts_service.run_blocking(voice_registry.refresh, False):
+        model = lookup()
+    return model
+
+@router.get("/health")
+async def health() -> Dict:
+    """Indica si el servicio está listo para recibir solicitudes.
+    Returns:
+        Dict: Estado del servicio, de la base de datos y de la precarga del caché.
+    """
+    if tts_service is None:
+        raise HTTPException(status_code=503, detail="Servicio iniciando")
+
+    db_service = service_container.db_service
+    if not await tts_service.run_blocking(db_service.health_check):
+        raise HTTPException(status_code=503, detail="Base de datos no disponible")
+    return {"status": "ok", "cache_warm": db_service.is_cache_warm}
 
 @router.post("/tts/by-name/")
 async def create_tts_by_name(request: TextToSpeechRequestByName) -> dict:
@@ -46,15 +126,17 @@ async def create_tts_by_name(request: TextToSpeechRequestByName) -> dict:
     try:
         tts_validator.validate_request_by_name(request)
         
-        model = next((m for m in voices if (m.language == request.language and m.voice_name == request.model)), None)
+        model = await resolve_model(lambda: voice_registry.get_by_name(request.language, request.model))
         if not model:
             raise HTTPException(
                 status_code=404, 
                 detail=f"Información no encontrada para el lenguage:'{request.language}' y para el nombre del modelo:'{request.model}'"
             )
         
-        audio_path = tts_service.generate_audio_from_text(request, model)
+        audio_path = await tts_service.generate_audio_from_text_async(request, model)
         return {"message": "Audio sintentizado correctamente", "audio_path": audio_path}
+    except TimeoutError as te:
+        raise HTTPException(status_code=503, detail=str(te))
     except ValueError as ve:
         raise HTTPException(status_code=422, detail=str(ve))
     except Exception as e:
@@ -71,15 +153,17 @@ async def create_tts_optional(request: TextToSpeechRequestOptional) -> dict:
     try:
         tts_validator.validate_request_optional(request)
 
-        model = next((m for m in voices if (m.language == request.language and m.gender == request.gender and m.type == request.type)), None)
+        model = await resolve_model(lambda: voice_registry.get_by_traits(request.language, request.gender, request.type))
         if not model:
             raise HTTPException(
                 status_code=404, 
                 detail=f"Información no encontrada para el lenguage:'{request.language}' para el genero :'{request.gender}' y del tipo:'{request.type}'"
             )
 
-        audio_path = tts_service.generate_audio_from_text(request, model)
+        audio_path = await tts_service.generate_audio_from_text_async(request, model)
         return {"message": "Audio sintentizado correctamente", "audio_path": audio_path}
+    except TimeoutError as te:
+        raise HTTPException(status_code=503, detail=str(te))
     except ValueError as ve:
         raise HTTPException(status_code=422, detail=str(ve))
     except Exception as e:
@@ -96,23 +180,249 @@ async def create_tts_by_id(model_id: int, request: TextToSpeechRequestById) -> d
     Raises:
     HTTPException: 
         - 404 Si el modelo especificado no exites
+        - 503 Si el proveedor no pudo atender la solicitud dentro del plazo de la cola
         - 500 Si hubo al momento de sintetizar el audio
     """
     try:
         tts_validator.validate_request_by_id(request)
 
-        model = next((m for m in voices if m.id == model_id), None)
+        model = await resolve_model(lambda: voice_registry.get_by_id(model_id))
         if not model:
             raise HTTPException(status_code=404, detail=f"Modelo con el id:{model_id} no encontrado")
             
-        audio_path = tts_service.generate_audio_from_text(request, model)
+        audio_path = await tts_service.generate_audio_from_text_async(request, model)
         
         return {"message": "Audio sintentizado correctamente", "audio_path": audio_path}
+    except TimeoutError as te:
+        raise HTTPException(status_code=503, detail=str(te))
     except ValueError as ve:
         raise HTTPException(status_code=422, detail=str(ve))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _stream_tts(model_id: int, request: TextToSpeechRequestById):
+    """Valida la solicitud y entrega el audio en streaming o la redirección al audio en caché."""
+    tts_validator.validate_request_by_id(request)
+
+    model = await resolve_model(lambda: voice_registry.get_by_id(model_id))
+    if not model:
+        raise HTTPException(status_code=404, detail=f"Modelo con el id:{model_id} no encontrado")
+
+    try:
+        cached_url, stream = await tts_service.stream_audio(request, model)
+    except TimeoutError as te:
+        raise HTTPException(status_code=503, detail=str(te))
+    except ValueError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
+
+    if cached_url:
+        return RedirectResponse(cached_url, status_code=303)
+    return ProviderStreamingResponse(stream, media_type="audio/mpeg")
+
+@router.post("/tts/stream/{model_id}")
+async def create_tts_stream(model_id: int, request: TextToSpeechRequestById):
+    """Transmite el audio a medida que el proveedor lo genera.
+    Args:
+        model_id (int): ID del modelo de voz a utilizar
+        request (TextToSpeechRequestById): Objeto con el texto a sintetizar
+    Returns:
+        StreamingResponse | RedirectResponse: Audio MP3 en streaming o redirección (303) al audio en caché.
+    Raises:
+    HTTPException: 
+        - 404 Si el modelo especificado no exites
+        - 422 Si la solicitud es inválida o el proveedor la rechaza
+        - 503 Si el proveedor no pudo atender la solicitud dentro del plazo de la cola
+    """
+    try:
+        return await _stream_tts(model_id, request)
+    except ValueError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
+
+@router.get("/tts/stream/{model_id}")
+async def get_tts_stream(model_id: int, read: str, text: str = ""):
+    """Transmite el audio a medida que el proveedor lo genera, recibiendo el texto por query string.
+    Args:
+        model_id (int): ID del modelo de voz a utilizar
+        read (str): Texto que se leerá
+        text (str): Texto original, si no se indica se usa `read`
+    Returns:
+        StreamingResponse | RedirectResponse: Audio MP3 en streaming o redirección (303) al audio en caché.
+    """
+    try:
+        return await _stream_tts(model_id, TextToSpeechRequestById(read=read, text=text or read))
+    except ValueError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
+
+@router.post("/tts/batch/{model_id}")
+async def create_tts_batch(model_id: int, requests: List[TextToSpeechRequestById]) -> StreamingResponse:
+    """Genera los audios de un lote de textos usando el ID del modelo.
+    Los resultados se devuelven como NDJSON, una línea por texto a medida que cada uno termina.
+    Args:
+        model_id (int): ID del modelo de voz a utilizar
+        requests (List[TextToSpeechRequestById]): Lista de textos a sintetizar
+    Returns:
+        StreamingResponse: Líneas JSON con `index` y `audio_path`, o `error` si la síntesis falló.
+    Raises:
+    HTTPException: 
+        - 404 Si el modelo especificado no exites
+        - 422 Si el lote está vacío, excede el tamaño máximo o contiene textos inválidos
+    """
+    model = await resolve_model(lambda: voice_registry.get_by_id(model_id))
+    if not model:
+        raise HTTPException(status_code=404, detail=f"Modelo con el id:{model_id} no encontrado")
+
+    if not requests:
+        raise HTTPException(status_code=422, detail="El lote no puede estar vacío")
+    if len(requests) > batch_config['max_items']:
+        raise HTTPException(status_code=422, detail=f"El lote excede el máximo de {batch_config['max_items']} elementos")
+
+    for index, request in enumerate(requests):
+        try:
+            tts_validator.validate_request_by_id(request)
+        except ValueError as ve:
+            raise HTTPException(status_code=422, detail=f"Elemento {index}: {ve}")
+
+    async def ndjson_results():
+        async for result in tts_service.generate_batch_async(requests, model):
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(ndjson_results(), media_type="application/x-ndjson")
+
+@router.post("/jobs/{model_id}")
+async def create_job(model_id: int, requests: List[TextToSpeechRequestById]) -> Dict:
+    """Registra un trabajo de síntesis que procesan en segundo plano los workers de la cola.
+    Args:
+        model_id (int): ID del modelo de voz a utilizar
+        requests (List[TextToSpeechRequestById]): Lista de textos a sintetizar
+    Returns:
+        Dict: Id del trabajo y cantidad de elementos.
+    Raises:
+    HTTPException: 
+        - 404 Si el modelo especificado no exites
+        - 422 Si el trabajo está vacío, excede el tamaño máximo o contiene textos inválidos
+    """
+    model = await resolve_model(lambda: voice_registry.get_by_id(model_id))
+    if not model:
+        raise HTTPException(status_code=404, detail=f"Modelo con el id:{model_id} no encontrado")
+
+    if not requests:
+        raise HTTPException(status_code=422, detail="El trabajo no puede estar vacío")
+    if len(requests) > jobs_config['max_items']:
+        raise HTTPException(status_code=422, detail=f"El trabajo excede el máximo de {jobs_config['max_items']} elementos")
+
+    for index, request in enumerate(requests):
+        try:
+            tts_validator.validate_request_by_id(request)
+        except ValueError as ve:
+            raise HTTPException(status_code=422, detail=f"Elemento {index}: {ve}")
+
+    try:
+        job_id = await tts_service.run_blocking(
+            job_store.create_job, model.id, [(request.read, request.text) for request in requests]
+        )
+        return {"message": "Trabajo registrado correctamente", "job_id": job_id, "total": len(requests)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str) -> Dict:
+    """Obtiene el estado y el progreso de un trabajo.
+    Args:
+        job_id (str): Id del trabajo
+    Returns:
+        Dict: Estado, contadores de elementos completados, fallidos y pendientes, y progreso.
+    Raises:
+        HTTPException: 404 Si el trabajo no existe
+    """
+    job = await tts_service.run_blocking(job_store.get_job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Trabajo con el id:{job_id} no encontrado")
+    return job
+
+@router.get("/jobs/{job_id}/results")
+async def get_job_results(job_id: str, after: int = 0, follow: bool = False) -> StreamingResponse:
+    """Entrega los resultados de un trabajo como NDJSON, en el orden en que terminaron.
+    Args:
+        job_id (str): Id del trabajo
+        after (int): Último `seq` ya recibido, para continuar una lectura anterior
+        follow (bool): Si es True la respuesta sigue abierta hasta que el trabajo termina
+    Returns:
+        StreamingResponse: Líneas JSON con `seq`, `index` y `audio_path`, o `error` si la síntesis falló.
+    Raises:
+        HTTPException: 404 Si el trabajo no existe
+    """
+    job = await tts_service.run_blocking(job_store.get_job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Trabajo con el id:{job_id} no encontrado")
+
+    poll_interval = jobs_config.get('poll_interval_seconds', 1)
+
+    async def ndjson_results():
+        last_seq = after
+        while True:
+            results = await tts_service.run_blocking(job_store.get_results, job_id, last_seq)
+            for result in results:
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+            if results:
+                last_seq = results[-1]['seq']
+                continue
+            if not follow:
+                break
+            current = await tts_service.run_blocking(job_store.get_job, job_id)
+            if current['status'] in ('completed', 'cancelled') and current['completed'] + current['failed'] <= last_seq:
+                break
+            await asyncio.sleep(poll_interval)
+
+    return StreamingResponse(ndjson_results(), media_type="application/x-ndjson")
+
+@router.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str) -> Dict:
+    """Cancela un trabajo; los elementos que ya están en curso terminan normalmente.
+    Args:
+        job_id (str): Id del trabajo
+    Returns:
+        Dict: Mensaje de confirmación.
+    Raises:
+        HTTPException: 
+            - 404 Si el trabajo no existe
+            - 409 Si el trabajo ya había terminado
+    """
+    job = await tts_service.run_blocking(job_store.get_job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Trabajo con el id:{job_id} no encontrado")
+    if not await tts_service.run_blocking(job_store.cancel_job, job_id):
+        raise HTTPException(status_code=409, detail=f"El trabajo {job_id} ya terminó")
+    return {"message": "Trabajo cancelado correctamente", "job_id": job_id}
+
+@router.post("/prewarm")
+async def prewarm_corpus(file: UploadFile, model_ids: List[int] = Query(...), dry_run: bool = False) -> Dict:
+    """Registra en la cola de trabajos los audios faltantes de un corpus para generarlos por adelantado.
+    Args:
+        file (UploadFile): Archivo JSONL con un texto por línea (`read` y opcionalmente `text`)
+        model_ids (List[int]): Ids de los modelos de voz (`?model_ids=1&model_ids=2`)
+        dry_run (bool): Si es True solo cuenta los textos faltantes
+    Returns:
+        Dict: Por modelo, textos del corpus, ya existentes, faltantes, caracteres e ids de los trabajos creados.
+    Raises:
+        HTTPException: 
+            - 422 Si el corpus no es válido o algún modelo no existe
+            - 500 Si hubo un error al registrar los trabajos
+    """
+    try:
+        corpus = await tts_service.run_blocking(read_corpus, io.TextIOWrapper(file.file, encoding='utf-8'))
+        if not corpus:
+            raise ValueError("El corpus está vacío")
+
+        prewarmer = Prewarmer(
+            service_container.db_service, voice_registry, job_store, tts_service.canonicalizer, jobs_config['max_items']
+        )
+        summary = await tts_service.run_blocking(prewarmer.submit, corpus, model_ids, dry_run)
+        return {"message": "Precarga registrada correctamente", "models": summary}
+    except (ValueError, UnicodeDecodeError) as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/tts/upload-zip/{model_id}")
 async def upload_zip_model(model_id: int, file: UploadFile) -> Dict:
     """Carga un archivo ZIP y lo procesa para el modelo de voz especificado.
@@ -120,7 +430,7 @@ async def upload_zip_model(model_id: int, file: UploadFile) -> Dict:
         model_id (int): ID del modelo de voz a utilizar
         file (UploadFile): Archivo ZIP a cargar
     Returns:
-        Dict: Mensaje de éxito y lista de archivos extraídos
+        Dict: Mensaje de éxito, lista de archivos extraídos y resumen de insertados, omitidos y fallidos
     Raises:
         HTTPException: 
             - 422 Si el archivo ZIP no es válido
@@ -129,23 +439,31 @@ async def upload_zip_model(model_id: int, file: UploadFile) -> Dict:
     """
     try:
         # Validar que el modelo exista
-        model = next((m for m in voices if m.id == model_id), None)
+        model = await resolve_model(lambda: voice_registry.get_by_id(model_id))
         if not model:
             raise HTTPException(status_code=404, detail=f"Modelo con el id:{model_id} no encontrado")
 
-        zip_service = ZipService()
-        
-        # Validar el archivo zip
-        await zip_service.validate_zip_file(file)
+        zip_service = ZipService(zip_config)
 
-        # Extraer archivos
-        files = await zip_service.extract_zip(file, model)
+        # Leer el ZIP directamente del archivo temporal de la carga, sin copiarlo
+        zip_file = await tts_service.run_blocking(zip_service.check_upload, file.file)
 
-        tts_service.save_files(files, model, zip_service.UPLOAD_DIR)
+        # Validar el archivo zip (solo el directorio central)
+        file_list = await tts_service.run_blocking(zip_service.validate_zip_file, zip_file)
+        files = zip_service.rename_files(file_list, model, tts_service.hash_text)
+
+        if zip_config.get('mode', 's3') == 'local':
+            # Extraer archivos a disco y subirlos desde allí
+            await tts_service.run_blocking(zip_service.extract_zip, zip_file, files)
+            summary = await tts_service.run_blocking(tts_service.save_files, files, model, zip_service.UPLOAD_DIR)
+        else:
+            # Subir cada archivo directamente desde el ZIP
+            summary = await tts_service.run_blocking(tts_service.save_zip_members, zip_file, files, model)
 
         return {
             "message": "Archivo zip cargado correctamente",
             "extracted_files": files,
+            "summary": summary,
         }
     except ValueError as ve:
         raise HTTPException(status_code=422, detail=str(ve))
@@ -166,22 +484,18 @@ async def create_voice_model(voice_model: CreateVoiceModel) -> Dict:
             - 500 Si hay un error al crear el modelo
     """
     try:
-        # Validar que no exista un modelo con el mismo nombre
-        existing_model = next(
-            (m for m in voices if m.voice_name == voice_model.voice_name), 
-            None
-        )
-        
-        if existing_model:
+        # Validar que no exista un modelo con el mismo nombre, incluyendo los creados por otros workers
+        await tts_service.run_blocking(voice_registry.refresh)
+        if voice_registry.exists_voice_name(voice_model.voice_name):
             raise ValueError(f"Ya existe un modelo con el nombre: {voice_model.voice_name}")
 
         # Crear el nuevo modelo
-        new_model = service_container.db_service.save_voice_model(voice_model)
+        new_model = await tts_service.run_blocking(service_container.db_service.save_voice_model, voice_model)
         if not new_model:
             raise ValueError("No se pudo crear el modelo")
 
-        # Actualizar la lista de voces en memoria
-        voices.append(new_model)
+        # Actualizar el registro de voces en memoria
+        voice_registry.add(new_model)
 
         return {
             "message": "Modelo creado correctamente",
@@ -196,6 +510,14 @@ async def create_voice_model(voice_model: CreateVoiceModel) -> Dict:
             detail=f"Error al crear el modelo: {str(e)}"
         )
 
+@router.get("/tts/stats")
+async def get_tts_stats() -> Dict:
+    """Obtiene las métricas internas del servicio TTS.
+    Returns:
+        Dict: Métricas agrupadas por componente.
+    """
+    return tts_service.get_stats()
+
 @router.get("/models/")
 async def get_all_models() -> List[InformationModel]:
     """Obtiene todos los modelos de voz disponibles.
@@ -205,7 +527,7 @@ async def get_all_models() -> List[InformationModel]:
         HTTPException: Si ocurre un error al recuperar los modelos.
     """
     try:
-        return voices
+        return voice_registry.all()
     except Exception as e:
         raise HTTPException(status_code=500, detail="Error al cargar los modelos")
 
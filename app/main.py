@@ -1,7 +1,9 @@
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from app.controllers.tts_controller import router as tts_router
+from app.controllers.tts_controller import init_services, shutdown_services, router as tts_router
 from app.utils.yaml_loader import YamlLoaderMixin
 from dotenv import load_dotenv
 
@@ -14,8 +16,15 @@ class AppConfig(YamlLoaderMixin):
     """
     pass
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Crea los servicios al arrancar la aplicación y los libera al detenerla."""
+    init_services()
+    yield
+    shutdown_services()
+
 # Inicialización de la aplicación FastAPI
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Cargar la configuración de la API desde el archivo YAML
 app_config = AppConfig()
@@ -34,6 +43,8 @@ app.add_middleware(
 )
 
 # Montar el directorio estático para servir archivos como audios o recursos
+# Los servicios (que crean los directorios de recursos) se inician en el lifespan, después de montar las rutas
+os.makedirs("app/resources", exist_ok=True)
 app.mount("/app/resources", StaticFiles(directory="app/resources"), name="resources")
 
 # Incluir las rutas definidas en el controlador de TTS (Text to Speech)
@@ -1,11 +1,56 @@
+import time
 from abc import ABC, abstractmethod
 from typing import Dict, Any
 
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
 from app.models.information_model import InformationModel
+from app.utils.latency_histogram import LatencyHistogram
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Claves de `metadata` usadas por el servicio para enrutar las solicitudes; no se envían al proveedor
+FALLBACK_VOICES_KEY = 'fallback_voices'
+ROUTING_METADATA_KEYS = frozenset([FALLBACK_VOICES_KEY])
 
 class TTSProvider(ABC):
+    """
+    Clase base de los proveedores de texto a voz.
+
+    Incluye el transporte HTTP compartido por los proveedores que usan una API REST: una sesión
+    con conexiones persistentes (keep-alive), tiempos de espera de conexión y lectura, reintentos
+    con espera exponencial ante respuestas 429/5xx y un histograma de latencias por proveedor.
+    La configuración se toma de la sección `http` del proveedor en `config.yaml`.
+    """
+
     def __init__(self, config: Dict[str, Any]):
         self.config = config
+        http_config = config.get('http', {})
+
+        self.timeout = (http_config.get('connect_timeout', 5), http_config.get('read_timeout', 60))
+        self.latency = LatencyHistogram()
+        self._errors = 0
+
+        retry = Retry(
+            total=http_config.get('max_retries', 3),
+            connect=http_config.get('max_retries', 3),
+            read=0,
+            status=http_config.get('max_retries', 3),
+            backoff_factor=http_config.get('backoff_factor', 0.5),
+            status_forcelist=RETRY_STATUS_CODES,
+            # La síntesis no tiene efectos secundarios, por lo que el POST se puede reintentar
+            allowed_methods=frozenset(['POST']),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        pool_size = http_config.get('pool_size', max(config.get('max_concurrency', 4), 10))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry, pool_block=False)
+
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
 
     @abstractmethod
     def build_request(self, text: str, model: InformationModel) -> Dict[str, Any]:
@@ -15,4 +60,51 @@ class TTSProvider(ABC):
     @abstractmethod
     def execute_request(self, request: Dict[str, Any]) -> bytes:
         """Ejecuta la solicitud y retorna el audio en bytes"""
-        pass
\ No newline at end of file
+        pass
+
+    def post(self, request: Dict[str, Any]) -> requests.Response:
+        """
+        Envía la solicitud al proveedor usando la sesión compartida y registra su latencia.
+        La respuesta se recibe en modo streaming, por lo que la latencia medida es el tiempo
+        hasta recibir los encabezados (incluidos los reintentos).
+        Args:
+            request (Dict[str, Any]): Solicitud con `url`, `headers` y `payload`.
+        Returns:
+            requests.Response: Respuesta exitosa del proveedor.
+        Raises:
+            ValueError: Si el proveedor responde con un código distinto de 200.
+            requests.exceptions.RequestException: Si la conexión falla o se agota el tiempo de espera.
+        """
+        started = time.perf_counter()
+        try:
+            response = self.session.post(
+                request['url'],
+                json=request['payload'],
+                headers=request['headers'],
+                stream=True,
+                timeout=self.timeout,
+            )
+        except requests.exceptions.RequestException:
+            self._errors += 1
+            raise
+        self.latency.observe((time.perf_counter() - started) * 1000)
+
+        if response.status_code != 200:
+            self._errors += 1
+            try:
+                raise ValueError(f"Error al llamar a la API: {response.text}")
+            finally:
+                response.close()
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna las métricas del proveedor.
+        Returns:
+            Dict[str, Any]: Histograma de latencias y cantidad de errores.
+        """
+        return dict(self.latency.stats(), errors=self._errors)
+
+    def close(self) -> None:
+        """Cierra las conexiones persistentes de la sesión"""
+        self.session.close()
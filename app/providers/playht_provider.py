@@ -1,5 +1,3 @@
-import requests
-
 from app.models.information_model import InformationModel
 from .base_provider import TTSProvider
 
@@ -25,11 +23,4 @@ class PlayHTProvider(TTSProvider):
         }
 
     def execute_request(self, request: dict) -> bytes:
-        response = requests.post(
-            request['url'],
-            json=request['payload'], 
-            headers=request['headers'],
-        )
-        if response.status_code != 200:
-            raise ValueError(f"Error al llamar a la API: {response.text}")
-        return response
\ No newline at end of file
+        return self.post(request)
\ No newline at end of file
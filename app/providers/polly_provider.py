@@ -1,25 +1,145 @@
+import time
+from typing import Any, Dict, Iterator, List
+
 import boto3
-from .base_provider import TTSProvider
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+
+from app.models.information_model import InformationModel
+from app.utils.text_splitter import split_text
+from .base_provider import ROUTING_METADATA_KEYS, TTSProvider
+
+def is_ssml(text: str) -> bool:
+    """Indica si el texto es un documento SSML"""
+    return text.lstrip().startswith('<speak')
+
+class PollyAudioResponse:
+    """
+    Adapta el `AudioStream` de Polly a la interfaz de `requests.Response` que usa el servicio
+    (`iter_content`, `content` y `close`), de modo que el audio sigue el mismo camino de guardado y subida
+    que el de los demás proveedores.
+
+    Si el texto se dividió en varias partes, cada parte se sintetiza al terminar de leer la anterior
+    y sus bloques se entregan uno tras otro; los MP3 de Polly no llevan etiquetas ID3, por lo que
+    la concatenación de sus tramas es un MP3 válido.
+    """
+
+    status_code = 200
+
+    def __init__(self, provider: "PollyProvider", first_stream, pending_parts: List[Dict[str, Any]]):
+        self._provider = provider
+        self._stream = first_stream
+        self._pending_parts = pending_parts
+        self._content = None
+
+    def iter_content(self, chunk_size: int = 8192) -> Iterator[bytes]:
+        while self._stream is not None:
+            try:
+                for chunk in self._stream.iter_chunks(chunk_size):
+                    yield chunk
+            finally:
+                self._stream.close()
+            self._stream = self._provider.synthesize(self._pending_parts.pop(0)) if self._pending_parts else None
+
+    @property
+    def content(self) -> bytes:
+        """Audio completo de todas las partes, leído la primera vez que se consulta"""
+        if self._content is None:
+            self._content = b''.join(self.iter_content())
+        return self._content
+
+    def close(self) -> None:
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        self._pending_parts = []
 
 class PollyProvider(TTSProvider):
+    """
+    Proveedor Amazon Polly.
+
+    Usa un único cliente boto3 compartido por todos los hilos, con su pool de conexiones dimensionado
+    para la concurrencia del proveedor. Acepta texto plano o SSML (`<speak>...</speak>`); el texto plano
+    que supera `max_text_length` se divide en oraciones y se sintetiza por partes.
+    """
+
     def __init__(self, config: dict):
         super().__init__(config)
+        http_config = config.get('http', {})
+        self.max_text_length = config.get('max_text_length', 3000)
         self.client = boto3.client(
             'polly',
             aws_access_key_id=config['access_key_id'],
             aws_secret_access_key=config['secret_access_key'],
-            region_name=config['region']
+            region_name=config['region'],
+            config=Config(
+                max_pool_connections=http_config.get('pool_size', max(config.get('max_concurrency', 8), 10)),
+                connect_timeout=http_config.get('connect_timeout', 5),
+                read_timeout=http_config.get('read_timeout', 60),
+                retries={'max_attempts': http_config.get('max_retries', 3) + 1, 'mode': 'adaptive'},
+            )
         )
 
-    #Código sin probar
-    def build_request(self, text: str, voice_id: str) -> dict:
-        return {
-            'Text': text,
-            'OutputFormat': 'mp3',
-            'VoiceId': voice_id,
-            'Engine': 'neural'
+    def build_request(self, text: str, model: InformationModel) -> dict:
+        """
+        Construye los parámetros de `synthesize_speech`, una entrada por cada parte del texto.
+        Los valores de `metadata` del modelo (por ejemplo `Engine` o `LanguageCode`) se agregan a los parámetros.
+        Raises:
+            ValueError: Si el texto es SSML y supera la longitud máxima.
+        """
+        params = {
+            'OutputFormat': self.config.get('output_format', 'mp3'),
+            'VoiceId': model.model,
+            'Engine': self.config.get('engine', 'neural'),
         }
-    
-    #Código sin probar
-    def execute_request(self, response):
-        return response['AudioStream'].read()
\ No newline at end of file
+        if self.config.get('sample_rate'):
+            params['SampleRate'] = str(self.config['sample_rate'])
+        if model.metadata:
+            for key, value in model.metadata.items():
+                if key not in ROUTING_METADATA_KEYS:
+                    params[key] = value
+
+        if is_ssml(text):
+            if len(text) > self.max_text_length:
+                raise ValueError(f"El texto SSML supera el máximo de {self.max_text_length} caracteres de Polly")
+            parts = [text]
+            text_type = 'ssml'
+        else:
+            parts = split_text(text, self.max_text_length)
+            text_type = 'text'
+
+        return {'parts': [dict(params, Text=part, TextType=text_type) for part in parts]}
+
+    def synthesize(self, params: Dict[str, Any]):
+        """
+        Llama a `synthesize_speech` y retorna el flujo de audio.
+        Args:
+            params (Dict[str, Any]): Parámetros de una parte del texto.
+        Returns:
+            botocore.response.StreamingBody: Audio de la parte.
+        Raises:
+            ValueError: Si Polly rechaza la solicitud o no se puede conectar.
+        """
+        started = time.perf_counter()
+        try:
+            response = self.client.synthesize_speech(**params)
+        except (ClientError, BotoCoreError) as e:
+            self._errors += 1
+            raise ValueError(f"Error al llamar a la API: {e}")
+        self.latency.observe((time.perf_counter() - started) * 1000)
+        return response['AudioStream']
+
+    def execute_request(self, request: dict) -> PollyAudioResponse:
+        """
+        Sintetiza la primera parte de inmediato, para detectar los errores antes de guardar el audio,
+        y las siguientes a medida que se lee la respuesta.
+        """
+        parts = list(request['parts'])
+        if not parts:
+            raise ValueError("El texto a sintetizar está vacío")
+        first_stream = self.synthesize(parts.pop(0))
+        return PollyAudioResponse(self, first_stream, parts)
+
+    def close(self) -> None:
+        super().close()
+        self.client.close()
@@ -1,7 +1,5 @@
-import requests
-
 from app.models.information_model import InformationModel
-from .base_provider import TTSProvider
+from .base_provider import ROUTING_METADATA_KEYS, TTSProvider
 
 class VoicemakerProvider(TTSProvider):
     def build_request(self, text:str, model:InformationModel) -> dict:
@@ -20,7 +18,8 @@ class VoicemakerProvider(TTSProvider):
         
         if hasattr(model, 'metadata') and model.metadata:
             for key, value in model.metadata.items():
-                payload[key] = value
+                if key not in ROUTING_METADATA_KEYS:
+                    payload[key] = value
             
         return {
             'url': self.config['url'],
@@ -31,12 +30,5 @@ class VoicemakerProvider(TTSProvider):
             'payload': payload
         }
 
-    def execute_request(self, request: dict) -> bytes:        
-        response = requests.post(
-            request['url'], 
-            headers=request['headers'], 
-            json=request['payload'], 
-        )
-        if response.status_code != 200:
-            raise ValueError(f"Error al llamar a la API: {response.text}")
-        return response
\ No newline at end of file
+    def execute_request(self, request: dict) -> bytes:
+        return self.post(request)
\ No newline at end of file
@@ -0,0 +1,35 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+class AudioCache(ABC):
+    """
+    Interfaz común de los cachés hash → URL de los audios generados.
+
+    Las claves son los digests MD5 de 16 bytes. La URL se guarda vacía cuando coincide con la que
+    se construye a partir del hash (ver `TieredCache`), de modo que solo ocupan espacio las excepciones.
+    """
+
+    @abstractmethod
+    def get(self, digest: bytes) -> Optional[str]:
+        """Retorna la URL del audio o None si no está en caché"""
+        pass
+
+    @abstractmethod
+    def set(self, digest: bytes, file_url: str) -> None:
+        """Guarda la URL de un audio en caché"""
+        pass
+
+    def set_many(self, items: Iterable[Tuple[bytes, str]]) -> None:
+        """Guarda varias parejas (digest, URL) en caché"""
+        for digest, file_url in items:
+            self.set(digest, file_url)
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Elimina todas las entradas del caché"""
+        pass
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Retorna las estadísticas de aciertos, fallos y desalojos"""
+        pass
@@ -0,0 +1,170 @@
+import fcntl
+import math
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator
+
+import numpy as np
+
+UINT64_MASK = 0xFFFFFFFFFFFFFFFF
+
+class BloomFilter:
+    """
+    Filtro de Bloom sobre los digests MD5 (16 bytes) de los audios, guardado en un archivo mapeado en memoria.
+
+    Todos los workers de la máquina mapean el mismo archivo, por lo que el filtro ocupa una sola vez
+    la memoria (~12 MB para 10 millones de hashes con 1% de falsos positivos). Un resultado negativo
+    garantiza que el hash no existe; uno positivo solo indica que podría existir.
+
+    Las posiciones de los bits se obtienen del propio digest con doble hashing
+    (`h1 + i * h2`, con `h1` y `h2` las dos mitades del MD5), sin calcular hashes adicionales.
+    Las escrituras se hacen con un bloqueo `fcntl` sobre el archivo, ya que varios procesos modifican
+    el mismo mapeo (los bits y los contadores del encabezado).
+    """
+
+    MAGIC = b'TTSBLM01'
+    # magic, bits, funciones hash, inserciones, marca de agua (mayor id de generated_audios incluido)
+    HEADER = struct.Struct('<8sQQQQ')
+
+    def __init__(self, path: str, capacity: int, error_rate: float):
+        """
+        Abre el filtro guardado en `path` o lo crea vacío si no existe.
+        Si el archivo ya existe se conservan sus parámetros, aunque la configuración haya cambiado.
+        Args:
+            path (str): Ruta del archivo del filtro.
+            capacity (int): Cantidad de hashes esperada.
+            error_rate (float): Tasa de falsos positivos deseada con `capacity` hashes.
+        """
+        self.path = path
+        self.capacity = capacity
+        self.error_rate = error_rate
+
+        if not os.path.exists(path) or os.path.getsize(path) < self.HEADER.size:
+            self._create(path, capacity, error_rate)
+
+        self._file = open(path, 'r+b')
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        magic, self.num_bits, self.num_hashes, _, _ = self.HEADER.unpack_from(self._mmap, 0)
+        if magic != self.MAGIC:
+            raise ValueError(f"El archivo {path} no es un filtro de Bloom válido")
+
+        self._bits = np.frombuffer(self._mmap, dtype=np.uint8, offset=self.HEADER.size)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def _create(cls, path: str, capacity: int, error_rate: float) -> None:
+        """Crea el archivo del filtro con todos los bits en cero"""
+        num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        num_bits += (-num_bits) % 8
+        num_hashes = max(1, int(round(num_bits / capacity * math.log(2))))
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as bloom_file:
+            bloom_file.write(cls.HEADER.pack(cls.MAGIC, num_bits, num_hashes, 0, 0))
+            bloom_file.truncate(cls.HEADER.size + num_bits // 8)
+        os.replace(tmp_path, path)
+
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        """Bloquea el filtro para escribir, entre los hilos del proceso y entre procesos"""
+        with self._lock:
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
+
+    def _read_header(self, index: int) -> int:
+        return self.HEADER.unpack_from(self._mmap, 0)[index]
+
+    def _write_header(self, index: int, value: int) -> None:
+        values = list(self.HEADER.unpack_from(self._mmap, 0))
+        values[index] = value
+        self.HEADER.pack_into(self._mmap, 0, *values)
+
+    @property
+    def insertions(self) -> int:
+        """Cantidad de inserciones realizadas (incluye hashes repetidos)"""
+        return self._read_header(3)
+
+    @property
+    def watermark(self) -> int:
+        """Mayor id de `generated_audios` incluido en el filtro"""
+        return self._read_header(4)
+
+    @watermark.setter
+    def watermark(self, value: int) -> None:
+        with self._write_lock():
+            if value > self.watermark:
+                self._write_header(4, value)
+
+    def _positions(self, audio_hash: str):
+        digest = bytes.fromhex(audio_hash)
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:16], 'little') | 1
+        return [((h1 + i * h2) & UINT64_MASK) % self.num_bits for i in range(self.num_hashes)]
+
+    def might_contain(self, audio_hash: str) -> bool:
+        """
+        Indica si el hash podría estar en el filtro.
+        Args:
+            audio_hash (str): Hash MD5 en hexadecimal.
+        Returns:
+            bool: False si el hash con seguridad no existe, True si podría existir.
+        """
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(audio_hash))
+
+    def add(self, audio_hash: str) -> None:
+        """Agrega un hash al filtro"""
+        self.add_many([audio_hash])
+
+    def add_many(self, audio_hashes: Iterable[str]) -> None:
+        """
+        Agrega varios hashes al filtro calculando las posiciones de forma vectorizada.
+        Args:
+            audio_hashes (Iterable[str]): Hashes MD5 en hexadecimal.
+        """
+        digests = b''.join(bytes.fromhex(audio_hash) for audio_hash in audio_hashes)
+        if not digests:
+            return
+
+        halves = np.frombuffer(digests, dtype='<u8').reshape(-1, 2)
+        h1 = halves[:, 0]
+        h2 = halves[:, 1] | np.uint64(1)
+        with self._write_lock(), np.errstate(over='ignore'):
+            for i in range(self.num_hashes):
+                positions = (h1 + np.uint64(i) * h2) % np.uint64(self.num_bits)
+                np.bitwise_or.at(
+                    self._bits,
+                    (positions >> np.uint64(3)).astype(np.int64),
+                    np.left_shift(1, (positions & np.uint64(7)).astype(np.uint8)).astype(np.uint8)
+                )
+            self._write_header(3, self.insertions + len(halves))
+
+    def flush(self) -> None:
+        """Escribe en disco los cambios del filtro"""
+        self._mmap.flush()
+
+    def close(self) -> None:
+        """Libera el mapeo en memoria y el archivo"""
+        self._bits = None
+        self._mmap.close()
+        self._file.close()
+
+    def stats(self) -> Dict[str, Any]:
+        insertions = self.insertions
+        estimated_error = (1 - math.exp(-self.num_hashes * insertions / self.num_bits)) ** self.num_hashes
+        return {
+            'path': self.path,
+            'size_mb': round(self.num_bits / 8 / (1024 * 1024), 2),
+            'num_hashes': self.num_hashes,
+            'insertions': insertions,
+            'capacity': self.capacity,
+            'estimated_error_rate': round(estimated_error, 6),
+            'watermark': self.watermark,
+        }
@@ -0,0 +1,166 @@
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+DIGEST_SIZE = 16
+
+def to_digest(audio_hash: str) -> bytes:
+    """Convierte un hash MD5 en hexadecimal a sus 16 bytes"""
+    return bytes.fromhex(audio_hash)
+
+class HashIndex:
+    """
+    Conjunto de digests MD5 guardado como un arreglo NumPy ordenado de 16 bytes por entrada.
+
+    Pensado para la carga masiva del caché: cada hash ocupa 16 bytes en lugar de un `str`
+    hexadecimal, su URL y la entrada de un diccionario. Las búsquedas se resuelven con búsqueda
+    binaria (`searchsorted`). Las inserciones se acumulan en un conjunto pequeño que se fusiona
+    con el arreglo ordenado al superar `merge_threshold` entradas.
+
+    Con `ttl_seconds` cada entrada vence como en `MemoryCache`: junto a cada digest se guarda el
+    segundo (relativo a la creación del índice) en que expira, en un arreglo `uint32` paralelo.
+    Las entradas vencidas dejan de encontrarse y se descartan en la siguiente fusión, por lo que un
+    audio borrado de la base deja de reportarse como acierto cuando vence su entrada.
+
+    Los digests siempre se comparan como arreglos `S16`, ya que NumPy descarta los bytes nulos
+    finales al extraer un elemento individual.
+    """
+
+    NO_EXPIRY = np.iinfo(np.uint32).max
+
+    def __init__(self, max_entries: int, merge_threshold: int = 50000, ttl_seconds: Optional[float] = None):
+        """
+        Args:
+            max_entries (int): Número máximo de hashes en el índice.
+            merge_threshold (int): Inserciones pendientes que disparan la fusión con el arreglo ordenado.
+            ttl_seconds (Optional[float]): Segundos de vida de cada entrada, None para no expirar.
+        """
+        self.max_entries = max_entries
+        self.merge_threshold = merge_threshold
+        self.ttl_seconds = ttl_seconds
+        self._started_at = time.monotonic()
+        self._keys = np.empty(0, dtype=f'S{DIGEST_SIZE}')
+        self._expires = np.empty(0, dtype=np.uint32)
+        self._pending: Dict[bytes, int] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._expirations = 0
+
+    def _now(self) -> int:
+        """Segundos transcurridos desde la creación del índice"""
+        return int(time.monotonic() - self._started_at)
+
+    def _expires_at(self) -> int:
+        if not self.ttl_seconds:
+            return self.NO_EXPIRY
+        return min(self._now() + int(self.ttl_seconds), self.NO_EXPIRY - 1)
+
+    def __len__(self) -> int:
+        return len(self._keys) + len(self._pending)
+
+    def is_full(self) -> bool:
+        """Indica si el índice alcanzó su tamaño máximo"""
+        return len(self) >= self.max_entries
+
+    def __contains__(self, digest: bytes) -> bool:
+        return bool(self.contains_many([digest])[0])
+
+    def contains_many(self, digests: List[bytes]) -> np.ndarray:
+        """
+        Busca varios digests con una sola búsqueda binaria vectorizada.
+        Args:
+            digests (List[bytes]): Digests de 16 bytes.
+        Returns:
+            np.ndarray: Arreglo booleano con la pertenencia de cada digest.
+        """
+        # Se lee primero el conjunto pendiente: `_merge` reemplaza los arreglos antes de vaciarlo
+        pending = self._pending
+        keys, expires = self._keys, self._expires
+        now = self._now()
+        queries = np.array(digests, dtype=f'S{DIGEST_SIZE}')
+        found = np.zeros(len(queries), dtype=bool)
+        if len(keys):
+            positions = np.minimum(np.searchsorted(keys, queries), len(keys) - 1)
+            found = (keys[positions] == queries) & (expires[positions] > now)
+        if pending:
+            found |= np.fromiter((pending.get(digest, 0) > now for digest in digests), dtype=bool, count=len(digests))
+        hits = int(found.sum())
+        self._hits += hits
+        self._misses += len(digests) - hits
+        return found
+
+    def add_many(self, digests: Iterable[bytes]) -> int:
+        """
+        Agrega digests al índice mientras haya espacio.
+        Args:
+            digests (Iterable[bytes]): Digests de 16 bytes.
+        Returns:
+            int: Cantidad de digests aceptados (los repetidos cuentan como aceptados).
+        """
+        accepted = 0
+        merged = False
+        expires_at = self._expires_at()
+        with self._lock:
+            for digest in digests:
+                if len(self._keys) + len(self._pending) >= self.max_entries:
+                    # Se libera el espacio de las entradas vencidas (y repetidas) antes de rechazar el resto
+                    if merged:
+                        break
+                    self._merge()
+                    merged = True
+                    if len(self._keys) >= self.max_entries:
+                        break
+                self._pending[digest] = expires_at
+                accepted += 1
+            if len(self._pending) >= self.merge_threshold:
+                self._merge()
+        return accepted
+
+    def compact(self) -> None:
+        """Fusiona las inserciones pendientes con el arreglo ordenado y descarta las entradas vencidas"""
+        with self._lock:
+            self._merge()
+
+    def _merge(self) -> int:
+        """
+        Fusiona el conjunto pendiente con el arreglo ordenado, descartando las entradas vencidas.
+        Returns:
+            int: Cantidad de entradas vencidas descartadas.
+        """
+        keys = np.concatenate((self._keys, np.array(list(self._pending), dtype=f'S{DIGEST_SIZE}')))
+        expires = np.concatenate((self._expires, np.fromiter(self._pending.values(), dtype=np.uint32, count=len(self._pending))))
+
+        alive = expires > self._now()
+        expired = len(keys) - int(alive.sum())
+        if not self._pending and not expired:
+            return 0
+        keys, expires = keys[alive], expires[alive]
+
+        # Se ordena por digest y, entre repetidos, se conserva el vencimiento más lejano
+        order = np.lexsort((expires, keys))
+        keys, expires = keys[order], expires[order]
+        last = np.ones(len(keys), dtype=bool)
+        last[:-1] = keys[1:] != keys[:-1]
+        self._keys, self._expires = keys[last], expires[last]
+        self._pending = {}
+        self._expirations += expired
+        return expired
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys = np.empty(0, dtype=f'S{DIGEST_SIZE}')
+            self._expires = np.empty(0, dtype=np.uint32)
+            self._pending = {}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'entries': len(self),
+            'max_entries': self.max_entries,
+            'size_mb': round((self._keys.nbytes + self._expires.nbytes) / (1024 * 1024), 2),
+            'hits': self._hits,
+            'misses': self._misses,
+            'expirations': self._expirations,
+        }
@@ -0,0 +1,74 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .base_cache import AudioCache
+
+class MemoryCache(AudioCache):
+    """
+    Caché LRU en memoria con tamaño máximo y tiempo de vida por entrada.
+
+    Es seguro para hilos; cuando se supera `max_entries` se desaloja la entrada usada
+    hace más tiempo, por lo que el consumo de memoria no crece con la tabla.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: Optional[float] = None):
+        """
+        Args:
+            max_entries (int): Número máximo de entradas en memoria.
+            ttl_seconds (Optional[float]): Segundos de vida de cada entrada, None para no expirar.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[bytes, Tuple[str, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, digest: bytes) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            file_url, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._entries[digest]
+                self._expirations += 1
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(digest)
+            self._hits += 1
+            return file_url
+
+    def set(self, digest: bytes, file_url: str) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._entries[digest] = (file_url, expires_at)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def is_full(self) -> bool:
+        """Indica si el caché alcanzó su tamaño máximo"""
+        return len(self._entries) >= self.max_entries
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self._hits,
+            'misses': self._misses,
+            'evictions': self._evictions,
+            'expirations': self._expirations,
+        }
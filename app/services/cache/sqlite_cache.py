@@ -0,0 +1,143 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .base_cache import AudioCache
+
+class SQLiteCache(AudioCache):
+    """
+    Caché compartido entre procesos respaldado por un archivo SQLite local.
+
+    Todos los workers de la máquina abren el mismo archivo en modo WAL y lo mapean en
+    memoria (`mmap_size`), de modo que un audio guardado por un worker es visible para
+    los demás sin consultar MySQL. El número de entradas se limita a `max_entries`
+    desalojando las insertadas hace más tiempo.
+    """
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: Optional[float] = None, mmap_size: int = 268435456):
+        """
+        Args:
+            path (str): Ruta del archivo SQLite.
+            max_entries (int): Número máximo de entradas.
+            ttl_seconds (Optional[float]): Segundos de vida de cada entrada, None para no expirar.
+            mmap_size (int): Bytes del archivo que se mapean en memoria.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.mmap_size = mmap_size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._errors = 0
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._connection().execute(
+            """CREATE TABLE IF NOT EXISTS audio_urls (
+                   digest BLOB PRIMARY KEY,
+                   file_url TEXT NOT NULL,
+                   expires_at REAL
+               )"""
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Retorna la conexión del hilo actual, creándola si no existe"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            self._local.connection = connection
+        return connection
+
+    def get(self, digest: bytes) -> Optional[str]:
+        try:
+            row = self._connection().execute(
+                "SELECT file_url, expires_at FROM audio_urls WHERE digest = ?", (digest,)
+            ).fetchone()
+        except sqlite3.Error as err:
+            # Por ejemplo `database is locked` con varios workers: se trata como un fallo del caché
+            self._errors += 1
+            self._misses += 1
+            print(f"Error al leer el caché compartido: {err}")
+            return None
+
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        return row[0]
+
+    def set(self, digest: bytes, file_url: str) -> None:
+        self.set_many([(digest, file_url)])
+
+    def set_many(self, items: Iterable[Tuple[bytes, str]]) -> None:
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else None
+        rows = [(digest, file_url, expires_at) for digest, file_url in items]
+        if not rows:
+            return
+
+        connection = self._connection()
+        try:
+            connection.execute("BEGIN")
+            connection.executemany(
+                "INSERT OR REPLACE INTO audio_urls (digest, file_url, expires_at) VALUES (?, ?, ?)", rows
+            )
+            connection.execute("COMMIT")
+        except sqlite3.Error as err:
+            self._errors += 1
+            print(f"Error al escribir en el caché compartido: {err}")
+            if connection.in_transaction:
+                try:
+                    connection.execute("ROLLBACK")
+                except sqlite3.Error as rollback_err:
+                    print(f"Error al deshacer la escritura en el caché compartido: {rollback_err}")
+            return
+
+        with self._lock:
+            self._writes_since_prune += len(rows)
+            should_prune = self._writes_since_prune >= self.PRUNE_EVERY
+            if should_prune:
+                self._writes_since_prune = 0
+        if should_prune:
+            self._prune()
+
+    def _prune(self) -> None:
+        """Elimina las entradas expiradas y las más antiguas si se supera `max_entries`"""
+        connection = self._connection()
+        try:
+            deleted = connection.execute(
+                "DELETE FROM audio_urls WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),)
+            ).rowcount
+            total = connection.execute("SELECT COUNT(*) FROM audio_urls").fetchone()[0]
+            excess = total - self.max_entries
+            if excess > 0:
+                deleted += connection.execute(
+                    "DELETE FROM audio_urls WHERE rowid IN (SELECT rowid FROM audio_urls ORDER BY rowid LIMIT ?)",
+                    (excess,)
+                ).rowcount
+            self._evictions += max(deleted, 0)
+        except sqlite3.Error as err:
+            print(f"Error al depurar el caché compartido: {err}")
+
+    def clear(self) -> None:
+        self._connection().execute("DELETE FROM audio_urls")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'path': self.path,
+            'max_entries': self.max_entries,
+            'hits': self._hits,
+            'misses': self._misses,
+            'evictions': self._evictions,
+            'errors': self._errors,
+        }
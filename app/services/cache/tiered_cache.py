@@ -0,0 +1,185 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .base_cache import AudioCache
+from .hash_index import HashIndex, to_digest
+from .memory_cache import MemoryCache
+from .sqlite_cache import SQLiteCache
+
+class TieredCache:
+    """
+    Caché de dos niveles: un LRU en memoria por proceso y un nivel compartido opcional,
+    más un índice compacto (`HashIndex`) para la precarga masiva.
+
+    Las lecturas consultan primero la memoria, luego el índice y por último el nivel compartido,
+    promoviendo a memoria los aciertos de este último. Las escrituras van a la memoria y al nivel compartido.
+
+    Internamente las claves son los digests de 16 bytes. Como la URL de un audio se deriva de su hash
+    (`url_builder`), solo se guarda cuando difiere de la esperada; el índice guarda únicamente los hashes.
+    La interfaz pública sigue recibiendo y retornando hashes en hexadecimal.
+    """
+
+    def __init__(self, memory: MemoryCache, shared: Optional[AudioCache] = None,
+                 index: Optional[HashIndex] = None, url_builder: Optional[Callable[[str], str]] = None):
+        """
+        Args:
+            memory (MemoryCache): Nivel en memoria del proceso.
+            shared (Optional[AudioCache]): Nivel compartido entre workers, None para desactivarlo.
+            index (Optional[HashIndex]): Índice de hashes para la precarga, None para desactivarlo.
+            url_builder (Optional[Callable[[str], str]]): Construye la URL de un audio a partir de su hash.
+                Sin él se guardan todas las URLs y no se usa el índice.
+        """
+        self.memory = memory
+        self.shared = shared
+        self.index = index if url_builder is not None else None
+        self.url_builder = url_builder
+
+    @classmethod
+    def from_config(cls, cache_config: dict, url_builder: Optional[Callable[[str], str]] = None) -> "TieredCache":
+        """
+        Construye el caché a partir de la sección `db.cache` del archivo de configuración.
+        Args:
+            cache_config (dict): Configuración del caché.
+            url_builder (Optional[Callable[[str], str]]): Construye la URL de un audio a partir de su hash.
+        Returns:
+            TieredCache: Caché configurado.
+        """
+        memory_config = cache_config.get('memory', {})
+        memory = MemoryCache(
+            max_entries=memory_config.get('max_entries', 100000),
+            ttl_seconds=memory_config.get('ttl_seconds')
+        )
+
+        shared = None
+        shared_config = cache_config.get('shared', {})
+        if shared_config.get('enabled'):
+            shared = SQLiteCache(
+                path=shared_config['path'],
+                max_entries=shared_config.get('max_entries', 5000000),
+                ttl_seconds=shared_config.get('ttl_seconds'),
+                mmap_size=shared_config.get('mmap_size', 268435456)
+            )
+
+        index = None
+        index_config = cache_config.get('index', {})
+        if index_config.get('enabled', True):
+            index = HashIndex(
+                max_entries=index_config.get('max_entries', 2000000),
+                merge_threshold=index_config.get('merge_threshold', 50000),
+                ttl_seconds=index_config.get('ttl_seconds', memory_config.get('ttl_seconds'))
+            )
+
+        return cls(memory, shared, index, url_builder)
+
+    def _encode(self, audio_hash: str, file_url: str) -> str:
+        """Retorna la URL a guardar: vacía si coincide con la que se deriva del hash"""
+        if self.url_builder is not None and file_url == self.url_builder(audio_hash):
+            return ''
+        return file_url
+
+    def _decode(self, audio_hash: str, stored_url: str) -> str:
+        return stored_url or self.url_builder(audio_hash)
+
+    def get(self, audio_hash: str) -> Optional[str]:
+        digest = to_digest(audio_hash)
+        stored_url = self.memory.get(digest)
+        if stored_url is not None:
+            return self._decode(audio_hash, stored_url)
+
+        if self.index is not None and digest in self.index:
+            return self.url_builder(audio_hash)
+
+        if self.shared is None:
+            return None
+        stored_url = self.shared.get(digest)
+        if stored_url is None:
+            return None
+        self.memory.set(digest, stored_url)
+        return self._decode(audio_hash, stored_url)
+
+    def get_many(self, audio_hashes: List[str]) -> Dict[str, str]:
+        """
+        Resuelve varias URLs en una pasada, buscando en el índice con una sola búsqueda vectorizada.
+        Args:
+            audio_hashes (List[str]): Hashes a buscar.
+        Returns:
+            Dict[str, str]: Diccionario {hash: file_url} con los hashes encontrados.
+        """
+        found = {}
+        missing = []
+        for audio_hash in dict.fromkeys(audio_hashes):
+            digest = to_digest(audio_hash)
+            stored_url = self.memory.get(digest)
+            if stored_url is not None:
+                found[audio_hash] = self._decode(audio_hash, stored_url)
+            else:
+                missing.append((audio_hash, digest))
+
+        if self.index is not None and missing:
+            in_index = self.index.contains_many([digest for _, digest in missing])
+            for (audio_hash, _), present in zip(missing, in_index):
+                if present:
+                    found[audio_hash] = self.url_builder(audio_hash)
+            missing = [item for item, present in zip(missing, in_index) if not present]
+
+        if self.shared is not None:
+            for audio_hash, digest in missing:
+                stored_url = self.shared.get(digest)
+                if stored_url is not None:
+                    self.memory.set(digest, stored_url)
+                    found[audio_hash] = self._decode(audio_hash, stored_url)
+        return found
+
+    def set(self, audio_hash: str, file_url: str) -> None:
+        self.set_many([(audio_hash, file_url)])
+
+    def set_many(self, items: Iterable[Tuple[str, str]]) -> None:
+        """Guarda varias parejas (hash, URL) en la memoria y en el nivel compartido"""
+        encoded = [(to_digest(audio_hash), self._encode(audio_hash, file_url)) for audio_hash, file_url in items]
+        self.memory.set_many(encoded)
+        if self.shared is not None:
+            self.shared.set_many(encoded)
+
+    def warm(self, items: Iterable[Tuple[str, str]]) -> None:
+        """
+        Precarga el caché sin reescribir el nivel compartido.
+        Los audios cuya URL se deriva del hash van al índice; el resto, o todos si el índice
+        está lleno o desactivado, al LRU en memoria.
+        Args:
+            items (Iterable[Tuple[str, str]]): Parejas (hash, URL) a precargar.
+        """
+        derived = []
+        for audio_hash, file_url in items:
+            stored_url = self._encode(audio_hash, file_url)
+            if stored_url or self.index is None:
+                self.memory.set(to_digest(audio_hash), stored_url)
+            else:
+                derived.append(to_digest(audio_hash))
+
+        if derived:
+            accepted = self.index.add_many(derived)
+            self.memory.set_many((digest, '') for digest in derived[accepted:])
+
+    def is_full(self) -> bool:
+        """Indica si el nivel que recibe la precarga alcanzó su tamaño máximo"""
+        if self.index is not None:
+            return self.index.is_full()
+        return self.memory.is_full()
+
+    def compact(self) -> None:
+        """Fusiona las inserciones pendientes del índice, por ejemplo al terminar la precarga"""
+        if self.index is not None:
+            self.index.compact()
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.index is not None:
+            self.index.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'memory': self.memory.stats(),
+            'index': self.index.stats() if self.index is not None else None,
+            'shared': self.shared.stats() if self.shared is not None else None,
+        }
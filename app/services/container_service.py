@@ -1,6 +1,8 @@
 from app.services.storage.file_service import FileService
 from app.services.storage.s3_service import S3Service
+from app.services.database.change_feed import ChangeFeed
 from app.services.database.db_service import DBService
+from app.services.voices.voice_registry import VoiceRegistry
 
 class ServiceContainer:
     """
@@ -10,7 +12,7 @@ class ServiceContainer:
     a los servicios y facilitar la inyección de dependencias.
     """
     
-    def __init__(self, output_dir: str, aws_config: dict, db_config: dict):
+    def __init__(self, output_dir: str, aws_config: dict, db_config: dict, cache_config: dict = None, feed_config: dict = None):
         """
         Inicializa el contenedor y crea todas las instancias de los servicios.
         
@@ -18,10 +20,14 @@ class ServiceContainer:
             output_dir (str): Directorio para archivos de audio
             aws_config (dict): Configuración de AWS
             db_config (dict): Configuración de la base de datos
+            cache_config (dict): Configuración del caché de audios
+            feed_config (dict): Configuración de la propagación de cambios entre workers
         """
         self._file_service = FileService(output_dir)
         self._s3_service = S3Service(aws_config)
-        self._db_service = DBService(db_config)
+        self._db_service = DBService(db_config, cache_config, url_builder=self._s3_service.build_url)
+        self._voice_registry = VoiceRegistry(self._db_service)
+        self._change_feed = ChangeFeed(self._db_service, self._voice_registry, feed_config)
 
     @property
     def file_service(self) -> FileService:
@@ -36,4 +42,14 @@ class ServiceContainer:
     @property
     def db_service(self) -> DBService:
         """Acceso al servicio de base de datos"""
-        return self._db_service
\ No newline at end of file
+        return self._db_service
+
+    @property
+    def voice_registry(self) -> VoiceRegistry:
+        """Acceso al registro de modelos de voz"""
+        return self._voice_registry
+
+    @property
+    def change_feed(self) -> ChangeFeed:
+        """Acceso a la propagación de cambios entre workers"""
+        return self._change_feed
\ No newline at end of file
@@ -0,0 +1,109 @@
+import argparse
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+from app.services.database.db_service import DBService
+from app.services.tts.tts_service import TTSService
+from app.services.voices.voice_registry import VoiceRegistry
+from app.utils.text_canonicalizer import TextCanonicalizer
+from app.utils.yaml_loader import YamlLoaderMixin
+
+class AudioRekey:
+    """
+    Registra los audios existentes con el hash de su texto canónico.
+
+    Por cada fila de `generated_audios` cuyo hash canónico es distinto del guardado se inserta una fila
+    con el mismo audio (`file_url`) y el hash nuevo; las filas originales no se modifican, por lo que
+    las llaves anteriores siguen funcionando mientras se despliega la canonicalización. Cuando varias
+    variantes de un texto llevan al mismo hash canónico solo se registra la primera. Las filas nuevas
+    tienen ids mayores, de modo que el filtro de Bloom y la propagación entre workers las incorporan
+    sin reconstruirse.
+
+    Debe ejecutarse antes de activar `api.canonicalization.enabled`, y de nuevo si cambian sus reglas.
+    """
+
+    def __init__(self, db_service: DBService, voice_registry: VoiceRegistry, canonicalizer: TextCanonicalizer,
+                 page_size: int = 5000):
+        """
+        Args:
+            db_service (DBService): Servicio de base de datos.
+            voice_registry (VoiceRegistry): Registro de modelos de voz.
+            canonicalizer (TextCanonicalizer): Canonicalización con la que se calculan los hashes nuevos.
+            page_size (int): Filas leídas por consulta.
+        """
+        self.db_service = db_service
+        self.voice_registry = voice_registry
+        self.canonicalizer = canonicalizer
+        self.page_size = page_size
+
+    def run(self, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Recorre la tabla por páginas de id hasta el mayor id existente al iniciar.
+        Args:
+            dry_run (bool): Si es True solo cuenta las filas, sin insertar.
+        Returns:
+            Dict[str, Any]: Filas leídas, sin cambio de llave, sin modelo, llaves nuevas, insertadas y omitidas.
+        """
+        summary = {'rows': 0, 'unchanged': 0, 'missing_model': 0, 'new_keys': 0, 'inserted': 0, 'skipped': 0, 'failed': 0}
+        max_id = self.db_service.get_max_audio_id()
+        last_id = 0
+        started = time.perf_counter()
+        self.voice_registry.refresh()
+
+        while last_id < max_id:
+            rows = [row for row in self.db_service.get_audio_rows_since(last_id, self.page_size) if row[0] <= max_id]
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            summary['rows'] += len(rows)
+
+            aliases = self._aliases(rows, summary)
+            summary['new_keys'] += len(aliases)
+            if aliases and not dry_run:
+                result = self.db_service.save_generated_audios(aliases)
+                for key in ('inserted', 'skipped', 'failed'):
+                    summary[key] += result[key]
+
+            print(f"Rekey: {summary['rows']} filas, {summary['new_keys']} llaves nuevas "
+                  f"(id {last_id}/{max_id}, {time.perf_counter() - started:.1f}s)")
+
+        return summary
+
+    def _aliases(self, rows: List[tuple], summary: Dict[str, Any]) -> List[tuple]:
+        """
+        Calcula las filas a insertar de una página, una por cada hash canónico nuevo.
+        Returns:
+            List[tuple]: Filas (original_text, input_text, information_id, file_url, audio_hash).
+        """
+        aliases = {}
+        for _, original_text, input_text, information_id, file_url, audio_hash in rows:
+            model = self.voice_registry.get_by_id(information_id)
+            if model is None:
+                summary['missing_model'] += 1
+                continue
+            new_hash = TTSService.build_audio_hash(input_text, model, self.canonicalizer)
+            if new_hash == audio_hash:
+                summary['unchanged'] += 1
+                continue
+            aliases.setdefault(new_hash, (original_text, input_text, information_id, file_url, new_hash))
+        return list(aliases.values())
+
+def _build_canonicalizer(config: Dict[str, Any]) -> Optional[TextCanonicalizer]:
+    """Canonicalizador con las reglas configuradas, aunque aún no esté activado"""
+    canonicalization_config = dict(config['api'].get('canonicalization') or {}, enabled=True)
+    return TextCanonicalizer.from_config(canonicalization_config)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Registra los audios existentes con el hash de su texto canónico")
+    parser.add_argument('--dry-run', action='store_true', help="Solo cuenta las llaves nuevas, sin insertar")
+    parser.add_argument('--page-size', type=int, default=5000, help="Filas leídas por consulta")
+    args = parser.parse_args()
+
+    config = YamlLoaderMixin().load_yaml('config.yaml')
+    db_service = DBService(config['db']['mysql'])
+    try:
+        rekey = AudioRekey(db_service, VoiceRegistry(db_service), _build_canonicalizer(config), args.page_size)
+        print(json.dumps(rekey.run(args.dry_run), indent=2))
+    finally:
+        db_service.close()
@@ -0,0 +1,106 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import mysql.connector
+
+from app.services.database.db_service import DBService
+from app.services.voices.voice_registry import VoiceRegistry
+
+class ChangeFeed:
+    """
+    Propaga a este worker los audios y modelos de voz creados por otros workers.
+
+    Un hilo consulta periódicamente `generated_audios` usando como marca de agua el mayor id ya
+    visto y agrega las filas nuevas al caché. Cada consulta vuelve a leer las últimas `lookback_rows`
+    filas bajo la marca de agua, ya que una transacción puede confirmarse después de otra con un id mayor.
+    El registro de voces se sincroniza en cada consulta con `information_audios`, incluidas las filas editadas.
+    Un cambio hecho en cualquier worker es visible en todos en, como máximo, `interval_seconds`.
+    """
+
+    def __init__(self, db_service: DBService, voice_registry: VoiceRegistry, feed_config: Optional[dict] = None):
+        """
+        Args:
+            db_service (DBService): Servicio de base de datos.
+            voice_registry (VoiceRegistry): Registro de modelos de voz.
+            feed_config (Optional[dict]): Configuración `db.change_feed`.
+        """
+        feed_config = feed_config or {}
+        self.db_service = db_service
+        self.voice_registry = voice_registry
+        self.enabled = feed_config.get('enabled', True)
+        self.interval = feed_config.get('interval_seconds', 2)
+        self.batch_size = feed_config.get('batch_size', 1000)
+        self.lookback = feed_config.get('lookback_rows', 200)
+
+        self._audio_watermark: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._applied_audios = 0
+        self._applied_models = 0
+        self._last_poll: Optional[float] = None
+        self._errors = 0
+
+    def start(self) -> None:
+        """Inicia el hilo de consulta si la propagación está habilitada"""
+        if not self.enabled or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='change-feed', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Detiene el hilo de consulta"""
+        self._stop.set()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as err:
+                # Un error inesperado (por ejemplo una fila inválida) no debe detener la propagación
+                self._errors += 1
+                print(f"Error inesperado al aplicar los cambios de la base de datos: {err}")
+            self._stop.wait(self.interval)
+
+    def poll(self) -> None:
+        """Aplica los cambios ocurridos desde la última consulta"""
+        try:
+            if self._audio_watermark is None:
+                # Los audios anteriores al arranque los cubre la precarga del caché
+                self._audio_watermark = self.db_service.get_max_audio_id()
+
+            last_id = max(0, self._audio_watermark - self.lookback)
+            while True:
+                rows = self.db_service.get_audios_since(last_id, self.batch_size)
+                if not rows:
+                    break
+                self.db_service.cache_audios((audio_hash, file_url) for _, audio_hash, file_url in rows)
+                self._applied_audios += sum(1 for row_id, _, _ in rows if row_id > self._audio_watermark)
+                last_id = rows[-1][0]
+                self._audio_watermark = max(self._audio_watermark, last_id)
+                if len(rows) < self.batch_size:
+                    break
+
+            self._applied_models += self.voice_registry.refresh()
+            self._last_poll = time.time()
+        except mysql.connector.Error as err:
+            self._errors += 1
+            print(f"Error al consultar los cambios en la base de datos: {err}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna el estado de la propagación de cambios.
+        Returns:
+            Dict[str, Any]: Marca de agua, cambios aplicados, errores y hora de la última consulta.
+        """
+        return {
+            'enabled': self.enabled,
+            'interval_seconds': self.interval,
+            'audio_watermark': self._audio_watermark,
+            'applied_audios': self._applied_audios,
+            'applied_models': self._applied_models,
+            'errors': self._errors,
+            'last_poll': self._last_poll,
+        }
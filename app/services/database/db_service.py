@@ -1,56 +1,334 @@
+import fcntl
 import json
+import os
+import threading
+import time
+from contextlib import contextmanager
 import mysql.connector
+from mysql.connector import pooling
 from app.models.information_model import CreateVoiceModel, InformationModel
 from app.models.tts_model import TextToSpeechRequestById
+from app.services.cache.bloom_filter import BloomFilter
+from app.services.cache.tiered_cache import TieredCache
 from app.utils.yaml_loader import YamlLoaderMixin
-from datetime import datetime
-from typing import Dict, List, Optional, Set
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 class DBService(YamlLoaderMixin):
     """
     Servicio para manejar las conexiones y operaciones con la base de datos MySQL.
+
+    Las conexiones se obtienen de un pool de tamaño configurable, de modo que las consultas
+    de distintos hilos se ejecutan en paralelo en lugar de compartir un único socket.
     """
     
-    def __init__(self, db_config: dict):
+    def __init__(self, db_config: dict, cache_config: Optional[dict] = None,
+                 url_builder: Optional[Callable[[str], str]] = None):
         """
-        Inicializa la conexión a la base de datos usando la configuración del archivo YAML.
+        Inicializa el pool de conexiones a la base de datos usando la configuración del archivo YAML.
         Args:
             db_config (dict): Configuración de la base de datos.
+            cache_config (Optional[dict]): Configuración del caché hash → URL.
+            url_builder (Optional[Callable[[str], str]]): Construye la URL de un audio a partir de su hash,
+                lo que permite al caché guardar solo los hashes.
         """
-        self.connection = mysql.connector.connect(
+        pool_config = db_config.get('pool', {})
+        pool_size = pool_config.get('size', 10)
+
+        self._pool = pooling.MySQLConnectionPool(
+            pool_name=pool_config.get('name', 'tts_pool'),
+            pool_size=pool_size,
+            pool_reset_session=True,
             host=db_config['host'],
             user=db_config['user'],
             password=db_config['password'],
             database=db_config['database'],
+            connection_timeout=pool_config.get('connect_timeout', 10),
         )
-        # Caché ligero solo para verificación de existencia
-        self._hash_set: Set[str] = set()
-        # Caché de URLs para acceso rápido
-        self._url_cache: Dict[str, str] = {}  # {hash: file_url}
-        self._initialize_cache()
-
-    def _initialize_cache(self) -> None:
-        """Carga solo los hashes y URLs en memoria"""
-        cursor = self.connection.cursor(dictionary=True)
-        sql = "SELECT audio_hash, file_url FROM generated_audios"
-        
+        # El pool de mysql.connector falla si no hay conexiones libres; el semáforo hace esperar al hilo
+        self._pool_slots = threading.BoundedSemaphore(pool_size)
+        self._checkout_timeout = pool_config.get('checkout_timeout', 30)
+        self._reconnect_attempts = pool_config.get('reconnect_attempts', 3)
+        self._reconnect_delay = pool_config.get('reconnect_delay', 1)
+
+        # Tamaños de bloque para las consultas `IN` y las inserciones masivas
+        bulk_config = db_config.get('bulk', {})
+        self._in_chunk_size = bulk_config.get('in_chunk_size', 1000)
+        self._insert_batch_size = bulk_config.get('insert_batch_size', 500)
+
+        # Tiempos de ejecución por consulta {nombre: {count, errors, total_ms, max_ms}}
+        self._query_stats: Dict[str, Dict[str, float]] = {}
+        self._stats_lock = threading.Lock()
+
+        # Caché acotado hash → URL (LRU en memoria, índice compacto de hashes y nivel compartido opcional)
+        cache_config = cache_config or {}
+        self._cache = TieredCache.from_config(cache_config, url_builder)
+        self._warmup_page_size = cache_config.get('warmup', {}).get('page_size', 5000)
+        self._warmup_done = threading.Event()
+        self._warmup_stop = threading.Event()
+
+        # Filtro de Bloom compartido: descarta sin consultar la BD los hashes que con seguridad no existen.
+        # Solo se usa cuando contiene todos los hashes de la tabla
+        bloom_config = cache_config.get('bloom', {})
+        self._bloom_config = bloom_config if bloom_config.get('enabled') else None
+        self._bloom: Optional[BloomFilter] = None
+        self._bloom_negatives = 0
+        self._bloom_false_negatives = 0
+        # Las transacciones pueden confirmarse en distinto orden que sus ids: cada recorrido del filtro
+        # vuelve a leer estas filas por debajo de la marca de agua
+        self._bloom_lookback = bloom_config.get('lookback_rows', 1000)
+
+    def _get_connection(self) -> pooling.PooledMySQLConnection:
+        """
+        Obtiene una conexión del pool, esperando si todas están en uso.
+        Antes de entregarla verifica que siga viva y la reconecta si MySQL la cerró por inactividad.
+        Returns:
+            pooling.PooledMySQLConnection: Conexión lista para usarse.
+        Raises:
+            mysql.connector.errors.PoolError: Si no se libera ninguna conexión dentro del tiempo de espera.
+        """
+        if not self._pool_slots.acquire(timeout=self._checkout_timeout):
+            raise mysql.connector.errors.PoolError("No hay conexiones disponibles en el pool de la base de datos")
+
+        try:
+            connection = self._pool.get_connection()
+        except Exception:
+            self._pool_slots.release()
+            raise
+
         try:
-            cursor.execute(sql)
-            results = cursor.fetchall()
+            connection.ping(reconnect=True, attempts=self._reconnect_attempts, delay=self._reconnect_delay)
+        except Exception:
+            connection.close()
+            self._pool_slots.release()
+            raise
+        return connection
 
-            # Poblar ambos cachés
-            self._hash_set = {row['audio_hash'] for row in results}
-            self._url_cache = {row['audio_hash']: row['file_url'] for row in results}
+    @contextmanager
+    def _cursor(self, query_name: str, **cursor_options) -> Iterator[Tuple[pooling.PooledMySQLConnection, object]]:
+        """
+        Entrega una conexión del pool y un cursor, registrando el tiempo de la operación.
+        La conexión se devuelve al pool al salir del bloque.
+        Args:
+            query_name (str): Nombre con el que se registran los tiempos de la consulta.
+            **cursor_options: Opciones del cursor (por ejemplo `dictionary=True`).
+        Yields:
+            Tuple: Conexión y cursor.
+        """
+        connection = self._get_connection()
+        try:
+            cursor = connection.cursor(**cursor_options)
+        except Exception:
+            connection.close()
+            self._pool_slots.release()
+            raise
 
-            print(f"Cache inicializado con {len(self._hash_set)} registros")
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield connection, cursor
+        except Exception:
+            failed = True
+            try:
+                connection.rollback()
+            except mysql.connector.Error:
+                pass
+            raise
+        finally:
+            self._record_query(query_name, time.perf_counter() - started, failed)
+            cursor.close()
+            connection.close()
+            self._pool_slots.release()
+
+    def _record_query(self, query_name: str, elapsed: float, failed: bool) -> None:
+        """Acumula el tiempo de ejecución de una consulta"""
+        elapsed_ms = elapsed * 1000
+        with self._stats_lock:
+            stats = self._query_stats.setdefault(
+                query_name, {'count': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+            )
+            stats['count'] += 1
+            stats['errors'] += int(failed)
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+
+    def get_query_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Retorna los tiempos acumulados de cada consulta.
+        Returns:
+            Dict[str, Dict[str, float]]: Conteo, errores, tiempo promedio y máximo en milisegundos.
+        """
+        with self._stats_lock:
+            return {
+                name: {
+                    'count': stats['count'],
+                    'errors': stats['errors'],
+                    'avg_ms': round(stats['total_ms'] / stats['count'], 3) if stats['count'] else 0.0,
+                    'max_ms': round(stats['max_ms'], 3),
+                }
+                for name, stats in self._query_stats.items()
+            }
+
+    def health_check(self) -> bool:
+        """
+        Verifica que la base de datos responda.
+        Returns:
+            bool: True si la consulta de prueba se ejecutó correctamente.
+        """
+        try:
+            with self._cursor('health_check') as (_, cursor):
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+            return True
+        except mysql.connector.Error as err:
+            print(f"Error en el health check de la BD: {err}")
+            return False
+
+    def start_cache_warmup(self) -> threading.Thread:
+        """
+        Inicia en segundo plano la precarga del caché.
+        Mientras no termina, las búsquedas que fallan en caché se resuelven consultando la BD.
+        Returns:
+            threading.Thread: Hilo que realiza la precarga.
+        """
+        self._warmup_done.clear()
+        self._warmup_stop.clear()
+        thread = threading.Thread(target=self._run_warmup, name='cache-warmup', daemon=True)
+        thread.start()
+        return thread
+
+    def stop_cache_warmup(self) -> None:
+        """Detiene la precarga del caché si aún está en curso"""
+        self._warmup_stop.set()
+
+    @property
+    def is_cache_warm(self) -> bool:
+        """Indica si la precarga del caché terminó"""
+        return self._warmup_done.is_set()
+
+    def _run_warmup(self) -> None:
+        """Precarga el caché en memoria y luego sincroniza el filtro de Bloom"""
+        self._warm_cache()
+        if self._bloom_config and not self._warmup_stop.is_set():
+            self._sync_bloom()
+
+    def _sync_bloom(self) -> None:
+        """
+        Abre el filtro de Bloom compartido y le agrega los audios registrados después de su marca de agua.
+        El primer worker que lo abre lo construye recorriendo la tabla completa por páginas; los demás
+        esperan el bloqueo del archivo y solo agregan los audios más recientes.
+        """
+        path = self._bloom_config['path']
+        started = time.perf_counter()
+
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(f"{path}.lock", 'w') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+                bloom = self._open_bloom(path)
+                self._catch_up_bloom(bloom)
+                bloom.flush()
+
+            if self._warmup_stop.is_set():
+                bloom.close()
+                return
+
+            # A partir de aquí cada inserción se agrega al filtro; una última pasada cubre las intermedias
+            self._bloom = bloom
+            self._catch_up_bloom(bloom)
+            print(f"Filtro de Bloom sincronizado con {bloom.insertions} hashes en {time.perf_counter() - started:.2f}s")
+        except (mysql.connector.Error, OSError, ValueError) as err:
+            print(f"Error al sincronizar el filtro de Bloom: {err}")
+
+    def _open_bloom(self, path: str) -> BloomFilter:
+        """
+        Abre el filtro de Bloom y lo reconstruye si su marca de agua es mayor que el último id de la tabla
+        (por ejemplo, si la tabla fue truncada), ya que en ese caso le faltarían hashes.
+        """
+        capacity = self._bloom_config.get('capacity', 10000000)
+        error_rate = self._bloom_config.get('error_rate', 0.01)
+
+        bloom = BloomFilter(path, capacity, error_rate)
+        if bloom.watermark > self.get_max_audio_id():
+            bloom.close()
+            os.remove(path)
+            bloom = BloomFilter(path, capacity, error_rate)
+        return bloom
+
+    def _catch_up_bloom(self, bloom: BloomFilter) -> None:
+        """
+        Agrega al filtro los audios con id mayor a su marca de agua menos `lookback_rows`, para incluir
+        las filas con ids menores que se confirmaron después de las que movieron la marca.
+        """
+        last_id = max(0, bloom.watermark - self._bloom_lookback)
+        while not self._warmup_stop.is_set():
+            rows = self.get_audios_since(last_id, self._warmup_page_size)
+            if not rows:
+                break
+            bloom.add_many(audio_hash for _, audio_hash, _ in rows)
+            last_id = rows[-1][0]
+            bloom.watermark = last_id
+
+    def _might_exist(self, audio_hash: str) -> bool:
+        """
+        Consulta el filtro de Bloom. Retorna False solo si el hash con seguridad no está registrado.
+        """
+        if self._bloom is None or self._bloom.might_contain(audio_hash):
+            return True
+        self._bloom_negatives += 1
+        return False
+
+    def _add_to_bloom(self, audio_hashes: Iterable[str]) -> None:
+        """Agrega hashes recién registrados al filtro de Bloom"""
+        if self._bloom is not None:
+            self._bloom.add_many(audio_hashes)
+
+    def _warm_cache(self) -> None:
+        """
+        Precarga en memoria los audios más recientes hasta llenar el índice del caché.
+        Lee la tabla en páginas por clave (`id`) en lugar de cargar todo el resultado de una vez,
+        liberando la conexión entre página y página para no bloquear las solicitudes.
+        """
+        started = time.perf_counter()
+        last_id = None
+        loaded = 0
+
+        try:
+            while not self._warmup_stop.is_set() and not self._cache.is_full():
+                rows = self._fetch_cache_page(last_id)
+                if not rows:
+                    break
+
+                self._cache.warm((audio_hash, file_url) for _, audio_hash, file_url in rows)
+                loaded += len(rows)
+                last_id = rows[-1][0]
         except mysql.connector.Error as err:
             print(f"Error inicializando cache: {err}")
-            self._hash_set = set()
-            self._url_cache = {}
         finally:
-            cursor.close()
+            self._cache.compact()
+            self._warmup_done.set()
+            print(f"Cache inicializado con {loaded} registros en {time.perf_counter() - started:.2f}s")
+
+    def _fetch_cache_page(self, before_id: Optional[int]) -> List[tuple]:
+        """
+        Obtiene una página de audios ordenada por id descendente.
+        Args:
+            before_id (Optional[int]): Id a partir del cual continuar, None para la primera página.
+        Returns:
+            List[tuple]: Filas (id, audio_hash, file_url).
+        """
+        if before_id is None:
+            sql = "SELECT id, audio_hash, file_url FROM generated_audios ORDER BY id DESC LIMIT %s"
+            values = (self._warmup_page_size,)
+        else:
+            sql = "SELECT id, audio_hash, file_url FROM generated_audios WHERE id < %s ORDER BY id DESC LIMIT %s"
+            values = (before_id, self._warmup_page_size)
 
-    def save_voice_model(self, voice_model:CreateVoiceModel) -> CreateVoiceModel:
+        with self._cursor('fetch_cache_page') as (_, cursor):
+            cursor.execute(sql, values)
+            return cursor.fetchall()
+
+    def save_voice_model(self, voice_model:CreateVoiceModel) -> InformationModel:
         """
         Guarda un nuevo modelo de voz en la base de datos.
         Args:
@@ -58,7 +336,6 @@ class DBService(YamlLoaderMixin):
         Returns:
             InformationModel: Modelo creado con su ID si fue exitoso, None si hubo error
         """
-        cursor = self.connection.cursor(dictionary=True)
         sql = """INSERT INTO information_audios 
                  (voice_name, language, gender, type, platform, model) 
                  VALUES (%s, %s, %s, %s, %s, %s)"""
@@ -72,21 +349,20 @@ class DBService(YamlLoaderMixin):
         )
         
         try:
-            cursor.execute(sql, values)
-            self.connection.commit()
+            with self._cursor('save_voice_model', dictionary=True) as (connection, cursor):
+                cursor.execute(sql, values)
+                connection.commit()
             
-            # Obtener el modelo recién creado
-            new_id = cursor.lastrowid
-            cursor.execute("SELECT * FROM information_audios WHERE id = %s", (new_id,))
-            result = cursor.fetchone()
+                # Obtener el modelo recién creado
+                new_id = cursor.lastrowid
+                cursor.execute("SELECT * FROM information_audios WHERE id = %s", (new_id,))
+                result = cursor.fetchone()
             
-            return CreateVoiceModel(**result) if result else None
+            return self._to_model(result) if result else None
             
         except mysql.connector.Error as err:
             print(f"Error al guardar el modelo en la base de datos: {err}")
             return None
-        finally:
-            cursor.close()
     
     def save_generated_audio(self, request:TextToSpeechRequestById, 
                              model:InformationModel, 
@@ -102,64 +378,269 @@ class DBService(YamlLoaderMixin):
         Returns:
             bool: True si se guardó correctamente, False en caso contrario
         """
-        cursor = self.connection.cursor()
         sql = """INSERT INTO generated_audios 
                  (original_text, input_text, information_id, file_url, audio_hash) 
-                 VALUES (%s, %s, %s, %s, %s)"""
+                 VALUES (%s, %s, %s, %s, %s)
+                 ON DUPLICATE KEY UPDATE audio_hash = audio_hash"""
         values = (request.text.lower(), request.read.lower(), model.id, file_url, audio_hash)
         
         try:
-            cursor.execute(sql, values)
-            self.connection.commit()
+            with self._cursor('save_generated_audio') as (connection, cursor):
+                cursor.execute(sql, values)
+                connection.commit()
+                # Si otro worker ya registró el hash se conserva su fila y se usa su URL
+                cursor.execute("SELECT file_url FROM generated_audios WHERE audio_hash = %s", (audio_hash,))
+                row = cursor.fetchone()
+                if row:
+                    file_url = row[0]
 
-            # Actualizar ambos cachés
-            self._hash_set.add(audio_hash)
-            self._url_cache[audio_hash] = file_url
-            
+            self._cache.set(audio_hash, file_url)
+            self._add_to_bloom([audio_hash])
             return True
         except mysql.connector.Error as err:
             print(f"Error al guardar en la base de datos: {err}")
             return False
-        finally:
-            cursor.close()
 
-    def get_audio_by_hash(self, audio_hash: str) -> Optional[dict]:
+    def save_generated_audios(self, rows: List[Tuple[str, str, int, str, str]]) -> Dict[str, int]:
+        """
+        Guarda varios registros de audio con inserciones de múltiples filas.
+        Cada bloque de `bulk.insert_batch_size` filas se inserta y confirma en una sola transacción;
+        los hashes que ya existen se ignoran mediante `ON DUPLICATE KEY UPDATE`.
+        Args:
+            rows (List[Tuple]): Filas (original_text, input_text, information_id, file_url, audio_hash).
+        Returns:
+            Dict[str, int]: Cantidad de filas insertadas, omitidas por duplicadas y fallidas.
+        """
+        summary = {'inserted': 0, 'skipped': 0, 'failed': 0}
+
+        for start in range(0, len(rows), self._insert_batch_size):
+            batch = rows[start:start + self._insert_batch_size]
+            placeholders = ', '.join(['(%s, %s, %s, %s, %s)'] * len(batch))
+            sql = f"""INSERT INTO generated_audios 
+                      (original_text, input_text, information_id, file_url, audio_hash) 
+                      VALUES {placeholders}
+                      ON DUPLICATE KEY UPDATE audio_hash = audio_hash"""
+            values = [value for row in batch for value in row]
+
+            try:
+                with self._cursor('save_generated_audios') as (connection, cursor):
+                    cursor.execute(sql, values)
+                    inserted = cursor.rowcount
+                    connection.commit()
+            except mysql.connector.Error as err:
+                print(f"Error al guardar el bloque en la base de datos: {err}")
+                summary['failed'] += len(batch)
+                continue
+
+            summary['inserted'] += inserted
+            summary['skipped'] += len(batch) - inserted
+            self._cache.set_many((row[4], row[3]) for row in batch)
+            self._add_to_bloom(row[4] for row in batch)
+
+        return summary
+
+    def get_audio_by_hash(self, audio_hash: str, verify: bool = False) -> Optional[dict]:
         """
         Busca un registro de audio por su hash, primero en caché y luego en BD si no existe.
         Args:
             audio_hash (str): Hash único del audio a buscar
+            verify (bool): Si es True, un descarte del filtro de Bloom se confirma consultando la BD.
+                Se usa antes de sintetizar, donde un falso negativo (por ejemplo, una fila que el filtro
+                aún no incorporó) costaría una llamada al proveedor.
         Returns:
             Optional[dict]: Diccionario con los datos del audio si existe, None si no se encuentra
         """
-        # Verificar si existe el hash
-        if audio_hash not in self._hash_set:
-            return None
-
-        # Si solo necesitamos la URL, la retornamos del caché
-        cached_url = self._url_cache.get(audio_hash)
+        cached_url = self._cache.get(audio_hash)
         if cached_url:
             return {'file_url': cached_url, 'audio_hash': audio_hash}
 
-        # Solo si se necesitan más detalles, consultamos la BD
-        return self._fetch_full_details(audio_hash)
+        # El caché es acotado, por lo que un fallo no implica que el audio no exista,
+        # salvo que el filtro de Bloom lo descarte
+        if self._might_exist(audio_hash):
+            return self._fetch_full_details(audio_hash)
+        if not verify:
+            return None
+
+        result = self._fetch_full_details(audio_hash)
+        if result:
+            self._bloom_false_negatives += 1
+            self._add_to_bloom([audio_hash])
+        return result
     
+    def get_cached_url(self, audio_hash: str) -> Optional[str]:
+        """
+        Busca la URL de un audio únicamente en el caché, sin consultar la BD.
+        Pensado para resolver aciertos de caché desde el event loop sin bloquearlo.
+        Args:
+            audio_hash (str): Hash único del audio a buscar
+        Returns:
+            Optional[str]: URL del audio si está en caché, None en caso contrario
+        """
+        return self._cache.get(audio_hash)
+
+    def get_cached_urls(self, audio_hashes: List[str]) -> Dict[str, str]:
+        """
+        Resuelve en una sola pasada las URLs en caché de un conjunto de hashes.
+        Args:
+            audio_hashes (List[str]): Hashes a buscar
+        Returns:
+            Dict[str, str]: Diccionario {hash: file_url} con los hashes encontrados
+        """
+        return self._cache.get_many(audio_hashes)
+
+    def get_urls_by_hashes(self, audio_hashes: List[str]) -> Dict[str, str]:
+        """
+        Resuelve las URLs de un conjunto de hashes: primero en caché y los restantes
+        con una consulta `IN` por cada bloque de `bulk.in_chunk_size` hashes.
+        Args:
+            audio_hashes (List[str]): Hashes a buscar
+        Returns:
+            Dict[str, str]: Diccionario {hash: file_url} con los hashes encontrados
+        """
+        found = self.get_cached_urls(audio_hashes)
+        missing = list(dict.fromkeys(h for h in audio_hashes if h not in found and self._might_exist(h)))
+
+        for start in range(0, len(missing), self._in_chunk_size):
+            chunk = missing[start:start + self._in_chunk_size]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            sql = f"SELECT audio_hash, file_url FROM generated_audios WHERE audio_hash IN ({placeholders})"
+
+            try:
+                with self._cursor('get_urls_by_hashes') as (_, cursor):
+                    cursor.execute(sql, chunk)
+                    rows = cursor.fetchall()
+            except mysql.connector.Error as err:
+                print(f"Error en BD: {err}")
+                rows = []
+
+            self._cache.set_many(rows)
+            found.update(rows)
+
+        return found
+
+    def get_existing_hashes(self, audio_hashes: List[str]) -> Set[str]:
+        """
+        Determina cuáles de los hashes ya están registrados.
+        Args:
+            audio_hashes (List[str]): Hashes a verificar
+        Returns:
+            Set[str]: Hashes que ya existen en caché o en la base de datos
+        """
+        return set(self.get_urls_by_hashes(audio_hashes))
+
     def _fetch_full_details(self, audio_hash: str) -> Optional[dict]:
         """Obtiene todos los detalles de un audio de la BD"""
-        cursor = self.connection.cursor(dictionary=True)
         sql = "SELECT * FROM generated_audios WHERE audio_hash = %s LIMIT 1"
         
         try:
-            cursor.execute(sql, (audio_hash,))
-            result = cursor.fetchone()
+            with self._cursor('fetch_full_details', dictionary=True) as (_, cursor):
+                cursor.execute(sql, (audio_hash,))
+                result = cursor.fetchone()
             if result:
                 # Actualizar caché de URL si no existe
-                self._url_cache[audio_hash] = result['file_url']
+                self._cache.set(audio_hash, result['file_url'])
             return result
         except mysql.connector.Error as err:
             print(f"Error en BD: {err}")
             return None
-        finally:
-            cursor.close()
+
+    def get_max_audio_id(self) -> int:
+        """
+        Obtiene el mayor id de `generated_audios`.
+        Returns:
+            int: Mayor id registrado, 0 si la tabla está vacía.
+        """
+        with self._cursor('get_max_audio_id') as (_, cursor):
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM generated_audios")
+            return cursor.fetchone()[0]
+
+    def get_audios_since(self, last_id: int, limit: int) -> List[tuple]:
+        """
+        Obtiene los audios registrados con id mayor al indicado, ordenados por id.
+        Args:
+            last_id (int): Mayor id ya conocido.
+            limit (int): Cantidad máxima de filas.
+        Returns:
+            List[tuple]: Filas (id, audio_hash, file_url).
+        """
+        sql = "SELECT id, audio_hash, file_url FROM generated_audios WHERE id > %s ORDER BY id LIMIT %s"
+        with self._cursor('get_audios_since') as (_, cursor):
+            cursor.execute(sql, (last_id, limit))
+            return cursor.fetchall()
+
+    def get_audio_rows_since(self, last_id: int, limit: int) -> List[tuple]:
+        """
+        Obtiene los registros completos de audio con id mayor al indicado, ordenados por id.
+        Args:
+            last_id (int): Mayor id ya procesado.
+            limit (int): Cantidad máxima de filas.
+        Returns:
+            List[tuple]: Filas (id, original_text, input_text, information_id, file_url, audio_hash).
+        """
+        sql = """SELECT id, original_text, input_text, information_id, file_url, audio_hash
+                 FROM generated_audios WHERE id > %s ORDER BY id LIMIT %s"""
+        with self._cursor('get_audio_rows_since') as (_, cursor):
+            cursor.execute(sql, (last_id, limit))
+            return cursor.fetchall()
+
+    def iter_audios_by_model(self, information_id: int, after_id: int = 0, limit: Optional[int] = None,
+                             fetch_size: int = 1000) -> Iterator[tuple]:
+        """
+        Recorre los audios de un modelo de voz en orden de id con un cursor sin buffer,
+        de modo que MySQL entrega las filas a medida que se leen en lugar de cargarlas todas en memoria.
+        La conexión queda ocupada mientras dura el recorrido.
+        Args:
+            information_id (int): Id del modelo de voz.
+            after_id (int): Mayor id ya procesado, para continuar un recorrido anterior.
+            limit (Optional[int]): Máximo de filas, None para recorrer todas.
+            fetch_size (int): Filas leídas del servidor por cada lectura.
+        Yields:
+            tuple: Filas (id, original_text, input_text).
+        """
+        sql = """SELECT id, original_text, input_text FROM generated_audios
+                 WHERE information_id = %s AND id > %s ORDER BY id"""
+        values = (information_id, after_id)
+        if limit is not None:
+            sql += " LIMIT %s"
+            values += (limit,)
+        with self._cursor('iter_audios_by_model', buffered=False) as (connection, cursor):
+            cursor.execute(sql, values)
+            try:
+                while True:
+                    rows = cursor.fetchmany(fetch_size)
+                    if not rows:
+                        break
+                    yield from rows
+            finally:
+                # Si el recorrido se interrumpe, descartar las filas pendientes para poder devolver la conexión
+                if connection.unread_result:
+                    connection.consume_results()
+
+    def cache_audios(self, items: Iterable[Tuple[str, str]]) -> None:
+        """
+        Agrega al caché en memoria audios registrados por otros workers.
+        Args:
+            items (Iterable[Tuple[str, str]]): Parejas (hash, URL).
+        """
+        items = list(items)
+        self._cache.warm(items)
+        self._add_to_bloom(audio_hash for audio_hash, _ in items)
+
+    def get_cache_stats(self) -> dict:
+        """
+        Retorna las estadísticas del caché hash → URL.
+        Returns:
+            dict: Aciertos, fallos y desalojos de cada nivel del caché y estado del filtro de Bloom.
+        """
+        stats = self._cache.stats()
+        if self._bloom_config:
+            stats['bloom'] = dict(
+                self._bloom.stats() if self._bloom is not None else {},
+                ready=self._bloom is not None,
+                negatives=self._bloom_negatives,
+                false_negatives=self._bloom_false_negatives
+            )
+        return stats
 
     def get_models(self) -> List[InformationModel]:
         """
@@ -167,42 +648,65 @@ class DBService(YamlLoaderMixin):
         Returns:
             List[InformationModel]: Lista de modelos de información, None si hay error
         """
-        cursor = self.connection.cursor(dictionary=True)
+        return self.get_models_since(0)
+
+    def get_models_since(self, last_id: int) -> List[InformationModel]:
+        """
+        Obtiene los modelos de información de audio con id mayor al indicado, ordenados por id.
+        Args:
+            last_id (int): Mayor id ya conocido
+        Returns:
+            List[InformationModel]: Lista de modelos de información, None si hay error
+        """
         sql = """
-                SELECT * FROM information_audios 
+                SELECT * FROM information_audios WHERE id > %s ORDER BY id
             """           
         try:
-            cursor.execute(sql)
-            result = cursor.fetchall()
-
-            # Process metadata field for each row
-            processed_rows = []
-            for row in result:
-                if row.get('metadata') and isinstance(row['metadata'], str):
-                    try:
-                        row['metadata'] = json.loads(row['metadata'])
-                    except json.JSONDecodeError:
-                        pass
-                processed_rows.append(row)
-                
-            return [InformationModel(**row) for row in processed_rows]
+            with self._cursor('get_models', dictionary=True) as (_, cursor):
+                cursor.execute(sql, (last_id,))
+                result = cursor.fetchall()
+
+            return [self._to_model(row) for row in result]
     
         except mysql.connector.Error as err:
             print(f"Error al buscar en la base de datos: {err}")
             return None
-        finally:
-            cursor.close()
+
+    @staticmethod
+    def _to_model(row: dict) -> InformationModel:
+        """Convierte una fila de `information_audios` en un modelo, decodificando su metadata"""
+        if row.get('metadata') and isinstance(row['metadata'], str):
+            try:
+                row['metadata'] = json.loads(row['metadata'])
+            except json.JSONDecodeError:
+                pass
+        return InformationModel(**row)
     
     def refresh_cache(self) -> None:
         """
         Actualiza completamente el caché desde la base de datos.
         Útil cuando se sospecha que el caché puede estar desactualizado.
         """
-        self._initialize_cache()
+        self._cache.clear()
+        self.start_cache_warmup()
+
+    def close(self) -> None:
+        """
+        Cierra las conexiones inactivas del pool.
+        `MySQLConnectionPool` no tiene un método público para esto: se usa `_remove_connections` solo si
+        existe, de modo que el cierre no falle si una versión del conector lo cambia.
+        """
+        remove_connections = getattr(getattr(self, '_pool', None), '_remove_connections', None)
+        if callable(remove_connections):
+            try:
+                remove_connections()
+            except (mysql.connector.Error, AttributeError) as err:
+                print(f"Advertencia: No se pudieron cerrar las conexiones del pool: {err}")
+        if getattr(self, '_bloom', None) is not None:
+            self._bloom.flush()
 
     def __del__(self):
         """
-        Cierra la conexión a la base de datos cuando se destruye la instancia.
+        Cierra las conexiones de la base de datos cuando se destruye la instancia.
         """
-        if hasattr(self, 'connection') and self.connection.is_connected():
-            self.connection.close() 
\ No newline at end of file
+        self.close() 
\ No newline at end of file
@@ -0,0 +1,305 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Estados de un trabajo y de sus elementos
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+PENDING = 'pending'
+
+class JobStore:
+    """
+    Cola persistente de trabajos de síntesis respaldada por un archivo SQLite local.
+
+    Cada trabajo guarda sus elementos (textos) en `job_items`. Los procesos worker reservan
+    elementos pendientes con una concesión (lease) de duración limitada; si un worker se cae,
+    sus elementos quedan disponibles de nuevo al vencer la concesión, por lo que el trabajo se
+    reanuda sin perder ni repetir los elementos ya terminados. Varios procesos de la misma máquina
+    comparten el archivo en modo WAL.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 300, max_attempts: int = 3):
+        """
+        Args:
+            path (str): Ruta del archivo SQLite.
+            lease_seconds (float): Segundos que un worker conserva un elemento sin renovar su concesión.
+            max_attempts (int): Intentos de un elemento antes de marcarlo como fallido.
+        """
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        connection = self._connection()
+        connection.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                   id TEXT PRIMARY KEY,
+                   model_id INTEGER NOT NULL,
+                   status TEXT NOT NULL,
+                   total INTEGER NOT NULL,
+                   completed INTEGER NOT NULL DEFAULT 0,
+                   failed INTEGER NOT NULL DEFAULT 0,
+                   created_at REAL NOT NULL,
+                   started_at REAL,
+                   finished_at REAL
+               )"""
+        )
+        connection.execute(
+            """CREATE TABLE IF NOT EXISTS job_items (
+                   job_id TEXT NOT NULL,
+                   idx INTEGER NOT NULL,
+                   read_text TEXT NOT NULL,
+                   original_text TEXT NOT NULL,
+                   status TEXT NOT NULL,
+                   attempts INTEGER NOT NULL DEFAULT 0,
+                   lease_owner TEXT,
+                   lease_expires REAL,
+                   audio_path TEXT,
+                   error TEXT,
+                   finished_seq INTEGER,
+                   PRIMARY KEY (job_id, idx)
+               )"""
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS job_items_status ON job_items (status, lease_expires)")
+        connection.execute("CREATE INDEX IF NOT EXISTS job_items_finished ON job_items (job_id, finished_seq)")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Retorna la conexión del hilo actual, creándola si no existe"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Transacción de escritura: `BEGIN IMMEDIATE` toma el bloqueo de escritura de inmediato"""
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def create_job(self, model_id: int, items: List[Tuple[str, str]]) -> str:
+        """
+        Registra un trabajo con sus elementos.
+        Args:
+            model_id (int): Id del modelo de voz.
+            items (List[Tuple[str, str]]): Parejas (texto de lectura, texto original).
+        Returns:
+            str: Id del trabajo.
+        """
+        job_id = uuid.uuid4().hex
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT INTO jobs (id, model_id, status, total, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, model_id, QUEUED, len(items), time.time())
+            )
+            connection.executemany(
+                "INSERT INTO job_items (job_id, idx, read_text, original_text, status) VALUES (?, ?, ?, ?, ?)",
+                ((job_id, index, read_text, original_text, PENDING) for index, (read_text, original_text) in enumerate(items))
+            )
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene el estado y el progreso de un trabajo.
+        Args:
+            job_id (str): Id del trabajo.
+        Returns:
+            Optional[Dict[str, Any]]: Datos del trabajo, None si no existe.
+        """
+        connection = self._connection()
+        connection.row_factory = sqlite3.Row
+        try:
+            row = connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            connection.row_factory = None
+        if row is None:
+            return None
+
+        job = dict(row)
+        finished = job['completed'] + job['failed']
+        job['pending'] = job['total'] - finished
+        job['progress'] = round(finished / job['total'], 4) if job['total'] else 1.0
+        return job
+
+    def claim_items(self, worker_id: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Reserva elementos pendientes (o cuya concesión venció) para un worker. Los elementos con la
+        concesión vencida que ya agotaron `max_attempts` (por ejemplo, porque el worker se cae siempre
+        con ellos) se marcan como fallidos en lugar de reclamarse.
+        Args:
+            worker_id (str): Identificador del worker.
+            limit (int): Máximo de elementos a reservar.
+        Returns:
+            List[Dict[str, Any]]: Elementos reservados con `job_id`, `idx`, `model_id`, `read` y `text`.
+        """
+        now = time.time()
+        with self._transaction() as connection:
+            exhausted = connection.execute(
+                "SELECT job_id, idx FROM job_items WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+                (RUNNING, now, self.max_attempts)
+            ).fetchall()
+            for job_id, index in exhausted:
+                self._close_item(connection, job_id, index, FAILED, now,
+                                 error=f"La concesión venció en los {self.max_attempts} intentos")
+
+            rows = connection.execute(
+                """SELECT i.job_id, i.idx, j.model_id, i.read_text, i.original_text
+                   FROM job_items i JOIN jobs j ON j.id = i.job_id
+                   WHERE (i.status = ? OR (i.status = ? AND i.lease_expires < ? AND i.attempts < ?)) AND j.status != ?
+                   ORDER BY j.created_at, i.idx
+                   LIMIT ?""",
+                (PENDING, RUNNING, now, self.max_attempts, CANCELLED, limit)
+            ).fetchall()
+            if not rows:
+                return []
+
+            connection.executemany(
+                """UPDATE job_items SET status = ?, lease_owner = ?, lease_expires = ?, attempts = attempts + 1
+                   WHERE job_id = ? AND idx = ?""",
+                ((RUNNING, worker_id, now + self.lease_seconds, job_id, index) for job_id, index, _, _, _ in rows)
+            )
+            connection.executemany(
+                "UPDATE jobs SET status = ?, started_at = COALESCE(started_at, ?) WHERE id = ? AND status = ?",
+                ((RUNNING, now, job_id, QUEUED) for job_id in {row[0] for row in rows})
+            )
+
+        return [
+            {'job_id': job_id, 'idx': index, 'model_id': model_id, 'read': read_text, 'text': original_text}
+            for job_id, index, model_id, read_text, original_text in rows
+        ]
+
+    def renew_leases(self, worker_id: str) -> None:
+        """Extiende la concesión de todos los elementos en curso de un worker"""
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE job_items SET lease_expires = ? WHERE lease_owner = ? AND status = ?",
+                (time.time() + self.lease_seconds, worker_id, RUNNING)
+            )
+
+    def complete_item(self, job_id: str, index: int, worker_id: str, audio_path: str) -> None:
+        """Registra el audio de un elemento terminado"""
+        self._finish_item(job_id, index, worker_id, COMPLETED, audio_path=audio_path)
+
+    def fail_item(self, job_id: str, index: int, worker_id: str, error: str, retry: bool = True) -> None:
+        """
+        Registra el error de un elemento. Si aún le quedan intentos y `retry` es True vuelve a la cola.
+        Args:
+            job_id (str): Id del trabajo.
+            index (int): Posición del elemento.
+            worker_id (str): Worker que procesó el elemento.
+            error (str): Descripción del error.
+            retry (bool): Si el error es transitorio y el elemento puede reintentarse.
+        """
+        if retry:
+            with self._transaction() as connection:
+                requeued = connection.execute(
+                    """UPDATE job_items SET status = ?, lease_owner = NULL, lease_expires = NULL, error = ?
+                       WHERE job_id = ? AND idx = ? AND lease_owner = ? AND status = ? AND attempts < ?""",
+                    (PENDING, error, job_id, index, worker_id, RUNNING, self.max_attempts)
+                ).rowcount
+            if requeued:
+                return
+        self._finish_item(job_id, index, worker_id, FAILED, error=error)
+
+    def _finish_item(self, job_id: str, index: int, worker_id: str, status: str,
+                     audio_path: Optional[str] = None, error: Optional[str] = None) -> None:
+        """Marca un elemento como terminado y actualiza los contadores del trabajo"""
+        with self._transaction() as connection:
+            # Solo el dueño de la concesión puede cerrar el elemento (otro worker pudo reclamarlo al vencer)
+            self._close_item(connection, job_id, index, status, time.time(), worker_id, audio_path, error)
+
+    def _close_item(self, connection: sqlite3.Connection, job_id: str, index: int, status: str, now: float,
+                    worker_id: Optional[str] = None, audio_path: Optional[str] = None, error: Optional[str] = None) -> None:
+        """Cierra un elemento en curso dentro de una transacción; con `worker_id` solo si es el dueño de la concesión"""
+        counter = 'completed' if status == COMPLETED else 'failed'
+        job = connection.execute("SELECT completed + failed, total FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        updated = connection.execute(
+            """UPDATE job_items SET status = ?, audio_path = ?, error = ?, finished_seq = ?,
+                      lease_owner = NULL, lease_expires = NULL
+               WHERE job_id = ? AND idx = ? AND status = ? AND (? IS NULL OR lease_owner = ?)""",
+            (status, audio_path, error, job[0] + 1, job_id, index, RUNNING, worker_id, worker_id)
+        ).rowcount
+        if not updated:
+            return
+
+        finished = job[0] + 1
+        connection.execute(
+            f"""UPDATE jobs SET {counter} = {counter} + 1,
+                      status = CASE WHEN ? >= total AND status != ? THEN ? ELSE status END,
+                      finished_at = CASE WHEN ? >= total THEN ? ELSE finished_at END
+               WHERE id = ?""",
+            (finished, CANCELLED, COMPLETED, finished, now, job_id)
+        )
+
+    def cancel_job(self, job_id: str) -> bool:
+        """
+        Cancela un trabajo: sus elementos pendientes ya no se procesan.
+        Args:
+            job_id (str): Id del trabajo.
+        Returns:
+            bool: True si el trabajo existía y no había terminado.
+        """
+        with self._transaction() as connection:
+            updated = connection.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status IN (?, ?)",
+                (CANCELLED, time.time(), job_id, QUEUED, RUNNING)
+            ).rowcount
+            connection.execute(
+                "UPDATE job_items SET status = ? WHERE job_id = ? AND status = ?",
+                (CANCELLED, job_id, PENDING)
+            )
+        return bool(updated)
+
+    def get_results(self, job_id: str, after_seq: int = 0, limit: int = 1000) -> List[Dict[str, Any]]:
+        """
+        Obtiene los elementos terminados de un trabajo en el orden en que terminaron.
+        Args:
+            job_id (str): Id del trabajo.
+            after_seq (int): Último número de secuencia ya entregado.
+            limit (int): Máximo de elementos.
+        Returns:
+            List[Dict[str, Any]]: Elementos con `seq`, `index` y `audio_path` o `error`.
+        """
+        rows = self._connection().execute(
+            """SELECT finished_seq, idx, status, audio_path, error FROM job_items
+               WHERE job_id = ? AND finished_seq > ? ORDER BY finished_seq LIMIT ?""",
+            (job_id, after_seq, limit)
+        ).fetchall()
+
+        results = []
+        for seq, index, status, audio_path, error in rows:
+            result = {'seq': seq, 'index': index}
+            if status == COMPLETED:
+                result['audio_path'] = audio_path
+            else:
+                result['error'] = error
+            results.append(result)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna la cantidad de trabajos y de elementos por estado.
+        Returns:
+            Dict[str, Any]: Conteos por estado.
+        """
+        connection = self._connection()
+        return {
+            'jobs': dict(connection.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()),
+            'items': dict(connection.execute("SELECT status, COUNT(*) FROM job_items GROUP BY status").fetchall()),
+        }
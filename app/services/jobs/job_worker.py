@@ -0,0 +1,208 @@
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+from typing import Any, Dict, List, Optional
+
+from app.models.tts_model import TextToSpeechRequestById
+from app.services.container_service import ServiceContainer
+from app.services.jobs.job_store import JobStore
+from app.services.tts.provider_governor import PRIORITY_BATCH
+from app.services.tts.tts_service import TTSService
+from app.utils.yaml_loader import YamlLoaderMixin
+
+OUTPUT_DIR = "app/resources/audios"
+
+class JobWorker:
+    """
+    Procesa los elementos de la cola de trabajos dentro de un proceso.
+
+    Mantiene hasta `concurrency` elementos en curso, cada uno sintetizado con prioridad de lote
+    por el `TTSService` del proceso (caché, voces de respaldo y límites del proveedor incluidos),
+    y renueva periódicamente la concesión de los elementos que tiene reservados. El rendimiento
+    escala agregando procesos worker, que se reparten los elementos a través de la cola.
+    """
+
+    def __init__(self, store: JobStore, tts_service: TTSService, concurrency: int = 16,
+                 poll_interval: float = 1.0, worker_id: Optional[str] = None):
+        """
+        Args:
+            store (JobStore): Cola persistente de trabajos.
+            tts_service (TTSService): Servicio de síntesis del proceso.
+            concurrency (int): Elementos en curso simultáneamente.
+            poll_interval (float): Segundos de espera cuando la cola está vacía.
+            worker_id (Optional[str]): Identificador del worker, por defecto `host:pid`.
+        """
+        self.store = store
+        self.tts_service = tts_service
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = asyncio.Event()
+
+    def stop(self) -> None:
+        """Deja de reservar elementos; los que están en curso terminan normalmente"""
+        self._stop.set()
+
+    async def run(self) -> None:
+        """Procesa elementos hasta que se llame a `stop`"""
+        in_flight = set()
+        heartbeat = asyncio.ensure_future(self._heartbeat())
+        try:
+            while not self._stop.is_set():
+                free_slots = self.concurrency - len(in_flight)
+                items = await self.tts_service.run_blocking(self.store.claim_items, self.worker_id, free_slots) if free_slots else []
+                for item in items:
+                    in_flight.add(asyncio.ensure_future(self._process(item)))
+
+                if not in_flight:
+                    await self._wait_stop(self.poll_interval)
+                    continue
+                # Si la cola no alcanzó a llenar los espacios libres se vuelve a consultar tras `poll_interval`
+                _, in_flight = await asyncio.wait(
+                    in_flight,
+                    timeout=self.poll_interval if len(items) < free_slots else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+            if in_flight:
+                await asyncio.wait(in_flight)
+        finally:
+            heartbeat.cancel()
+
+    async def _wait_stop(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._stop.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _heartbeat(self) -> None:
+        """Renueva las concesiones a un tercio de su duración para que no venzan mientras el elemento sigue en curso"""
+        while True:
+            await asyncio.sleep(self.store.lease_seconds / 3)
+            try:
+                await self.tts_service.run_blocking(self.store.renew_leases, self.worker_id)
+            except Exception as e:
+                print(f"Error al renovar las concesiones del worker {self.worker_id}: {e}")
+
+    async def _process(self, item: Dict[str, Any]) -> None:
+        """
+        Sintetiza un elemento y registra su resultado. Los errores de la solicitud (ValueError)
+        son definitivos; los demás (plazos, proveedor caído) devuelven el elemento a la cola.
+        """
+        store = self.store
+        try:
+            model = self.tts_service.services.voice_registry.get_by_id(item['model_id'])
+            if model is None and await self.tts_service.run_blocking(self.tts_service.services.voice_registry.refresh, False):
+                model = self.tts_service.services.voice_registry.get_by_id(item['model_id'])
+            if model is None:
+                raise ValueError(f"Modelo con el id:{item['model_id']} no encontrado")
+
+            request = TextToSpeechRequestById(read=item['read'], text=item['text'])
+            audio_path = await self.tts_service.generate_audio_from_text_async(request, model, PRIORITY_BATCH)
+            await self.tts_service.run_blocking(store.complete_item, item['job_id'], item['idx'], self.worker_id, audio_path)
+        except ValueError as ve:
+            await self.tts_service.run_blocking(store.fail_item, item['job_id'], item['idx'], self.worker_id, str(ve), False)
+        except Exception as e:
+            print(f"Error al procesar el elemento {item['idx']} del trabajo {item['job_id']}: {e}")
+            await self.tts_service.run_blocking(store.fail_item, item['job_id'], item['idx'], self.worker_id, str(e))
+
+def build_job_store(jobs_config: Dict[str, Any]) -> JobStore:
+    """
+    Crea la cola de trabajos a partir de la sección `api.jobs` del archivo de configuración.
+    Args:
+        jobs_config (Dict[str, Any]): Configuración de los trabajos.
+    Returns:
+        JobStore: Cola de trabajos.
+    """
+    return JobStore(
+        jobs_config.get('path', 'app/resources/jobs/jobs.sqlite3'),
+        lease_seconds=jobs_config.get('lease_seconds', 300),
+        max_attempts=jobs_config.get('max_attempts', 3)
+    )
+
+async def _serve(config: Dict[str, Any]) -> None:
+    """Crea los servicios del proceso y procesa la cola hasta recibir SIGTERM o SIGINT"""
+    jobs_config = config['api'].get('jobs', {})
+    service_container = ServiceContainer(
+        output_dir=OUTPUT_DIR,
+        aws_config=config['aws'],
+        db_config=config['db']['mysql'],
+        cache_config=config['db']['cache'],
+        feed_config=config['db']['change_feed']
+    )
+    service_container.voice_registry.refresh()
+    tts_service = TTSService(service_container)
+    service_container.db_service.start_cache_warmup()
+    service_container.change_feed.start()
+
+    worker = JobWorker(
+        build_job_store(jobs_config),
+        tts_service,
+        concurrency=jobs_config.get('concurrency', 16),
+        poll_interval=jobs_config.get('poll_interval_seconds', 1)
+    )
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signal_number, worker.stop)
+
+    print(f"Worker de trabajos {worker.worker_id} iniciado")
+    try:
+        await worker.run()
+    finally:
+        service_container.change_feed.stop()
+        service_container.db_service.stop_cache_warmup()
+        tts_service.executor.shutdown(wait=False)
+        for provider in tts_service.providers.values():
+            provider.close()
+        service_container.db_service.close()
+        print(f"Worker de trabajos {worker.worker_id} detenido")
+
+def run_worker_process() -> None:
+    """Punto de entrada de un proceso worker"""
+    asyncio.run(_serve(YamlLoaderMixin().load_yaml('config.yaml')))
+
+def start_worker_processes(count: int) -> List[multiprocessing.Process]:
+    """
+    Inicia procesos worker independientes del proceso actual.
+    Args:
+        count (int): Número de procesos.
+    Returns:
+        List[multiprocessing.Process]: Procesos iniciados.
+    """
+    context = multiprocessing.get_context('spawn')
+    processes = []
+    for index in range(count):
+        process = context.Process(target=run_worker_process, name=f'job-worker-{index}', daemon=True)
+        process.start()
+        processes.append(process)
+    return processes
+
+def stop_worker_processes(processes: List[multiprocessing.Process], timeout: float = 30) -> None:
+    """
+    Detiene los procesos worker esperando a que terminen los elementos en curso.
+    Los que no terminan a tiempo se matan; sus elementos se reanudan al vencer la concesión.
+    """
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    for process in processes:
+        process.join(timeout)
+        if process.is_alive():
+            process.kill()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Procesa la cola de trabajos de síntesis")
+    parser.add_argument('--processes', type=int, default=1, help="Número de procesos worker")
+    args = parser.parse_args()
+
+    if args.processes == 1:
+        run_worker_process()
+    else:
+        workers = start_worker_processes(args.processes)
+        try:
+            for worker_process in workers:
+                worker_process.join()
+        except KeyboardInterrupt:
+            stop_worker_processes(workers)
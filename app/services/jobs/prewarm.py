@@ -0,0 +1,147 @@
+import argparse
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.services.database.db_service import DBService
+from app.services.jobs.job_store import JobStore
+from app.services.jobs.job_worker import build_job_store
+from app.services.tts.tts_service import TTSService
+from app.services.voices.voice_registry import VoiceRegistry
+from app.utils.text_canonicalizer import TextCanonicalizer
+from app.utils.yaml_loader import YamlLoaderMixin
+
+def read_corpus(lines: Iterable[str]) -> List[Tuple[str, str]]:
+    """
+    Lee un corpus JSONL. Cada línea es un objeto con `read` (texto que se leerá) y opcionalmente `text`
+    (texto original); si no tiene `read` se usa `text` o `body`. También se aceptan líneas con un string JSON.
+    Args:
+        lines (Iterable[str]): Líneas del archivo.
+    Returns:
+        List[Tuple[str, str]]: Parejas (texto de lectura, texto original) sin repetir, en orden.
+    Raises:
+        ValueError: Si una línea no es JSON válido o no contiene texto.
+    """
+    items = {}
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Línea {number}: JSON inválido ({e})")
+
+        if isinstance(entry, str):
+            read_text, original_text = entry, entry
+        elif isinstance(entry, dict):
+            read_text = entry.get('read') or entry.get('text') or entry.get('body')
+            original_text = entry.get('text') or read_text
+        else:
+            read_text = None
+        if not read_text or not isinstance(read_text, str) or not read_text.strip():
+            raise ValueError(f"Línea {number}: no contiene texto")
+        items.setdefault(read_text, (read_text, original_text))
+    return list(items.values())
+
+class Prewarmer:
+    """
+    Genera por adelantado los audios de un corpus de textos para un conjunto de modelos de voz.
+
+    Calcula el hash de cada texto como lo hace la síntesis (incluida la canonicalización), consulta
+    de forma masiva cuáles ya existen y registra en la cola de trabajos solo los faltantes, en trabajos
+    de a lo sumo `max_items` textos por modelo. Los workers de la cola los sintetizan en segundo plano con prioridad de lote y con su
+    propia concurrencia, de modo que la primera solicitud de cada texto ya es un acierto de caché.
+    """
+
+    def __init__(self, db_service: DBService, voice_registry: VoiceRegistry, job_store: JobStore,
+                 canonicalizer: Optional[TextCanonicalizer] = None, max_items: Optional[int] = None):
+        """
+        Args:
+            db_service (DBService): Servicio de base de datos.
+            voice_registry (VoiceRegistry): Registro de modelos de voz.
+            job_store (JobStore): Cola de trabajos.
+            canonicalizer (Optional[TextCanonicalizer]): Canonicalización configurada en el servicio de síntesis.
+            max_items (Optional[int]): Máximo de textos por trabajo; los faltantes se reparten en varios trabajos.
+        """
+        self.db_service = db_service
+        self.voice_registry = voice_registry
+        self.job_store = job_store
+        self.canonicalizer = canonicalizer
+        self.max_items = max_items
+
+    def missing(self, items: List[Tuple[str, str]], model_id: int) -> List[Tuple[str, str]]:
+        """
+        Retorna los textos del corpus que aún no tienen audio con el modelo.
+        Args:
+            items (List[Tuple[str, str]]): Parejas (texto de lectura, texto original).
+            model_id (int): Id del modelo de voz.
+        Returns:
+            List[Tuple[str, str]]: Parejas sin audio, sin repetir hashes.
+        Raises:
+            ValueError: Si el modelo no existe.
+        """
+        model = self.voice_registry.get_by_id(model_id)
+        if model is None and self.voice_registry.refresh(False):
+            model = self.voice_registry.get_by_id(model_id)
+        if model is None:
+            raise ValueError(f"Modelo con el id:{model_id} no encontrado")
+
+        hashed = {}
+        for read_text, original_text in items:
+            hashed.setdefault(TTSService.build_audio_hash(read_text, model, self.canonicalizer), (read_text, original_text))
+
+        existing = self.db_service.get_urls_by_hashes(list(hashed))
+        return [item for audio_hash, item in hashed.items() if audio_hash not in existing]
+
+    def submit(self, items: List[Tuple[str, str]], model_ids: List[int], dry_run: bool = False) -> Dict[int, Dict[str, Any]]:
+        """
+        Registra en la cola los textos faltantes de cada modelo.
+        Args:
+            items (List[Tuple[str, str]]): Parejas (texto de lectura, texto original).
+            model_ids (List[int]): Ids de los modelos de voz.
+            dry_run (bool): Si es True solo calcula los faltantes, sin registrar trabajos.
+        Returns:
+            Dict[int, Dict[str, Any]]: Por modelo, textos del corpus, los que no requieren síntesis (ya existentes
+                o equivalentes a otro), faltantes, caracteres a sintetizar e ids de los trabajos.
+        """
+        summary = {}
+        for model_id in dict.fromkeys(model_ids):
+            pending = self.missing(items, model_id)
+            job_ids = []
+            if not dry_run:
+                size = self.max_items or len(pending) or 1
+                job_ids = [self.job_store.create_job(model_id, pending[start:start + size]) for start in range(0, len(pending), size)]
+            summary[model_id] = {
+                'texts': len(items),
+                'cached': len(items) - len(pending),
+                'missing': len(pending),
+                'characters': sum(len(read_text) for read_text, _ in pending),
+                'job_ids': job_ids,
+            }
+        return summary
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Genera por adelantado los audios faltantes de un corpus JSONL")
+    parser.add_argument('corpus', help="Archivo JSONL con un texto por línea")
+    parser.add_argument('--models', type=int, nargs='+', required=True, help="Ids de los modelos de voz")
+    parser.add_argument('--dry-run', action='store_true', help="Solo cuenta los textos faltantes")
+    args = parser.parse_args()
+
+    config = YamlLoaderMixin().load_yaml('config.yaml')
+    db_service = DBService(config['db']['mysql'], config['db']['cache'])
+    try:
+        with open(args.corpus, 'r', encoding='utf-8') as corpus_file:
+            corpus = read_corpus(corpus_file)
+        jobs_config = config['api'].get('jobs', {})
+        voice_registry = VoiceRegistry(db_service)
+        voice_registry.refresh()
+        prewarmer = Prewarmer(
+            db_service,
+            voice_registry,
+            build_job_store(jobs_config),
+            TextCanonicalizer.from_config(config['api'].get('canonicalization')),
+            jobs_config.get('max_items')
+        )
+        print(json.dumps(prewarmer.submit(corpus, args.models, args.dry_run), indent=2))
+    finally:
+        db_service.close()
@@ -21,7 +21,7 @@ class FileService:
         self.output_dir.mkdir(parents=True, exist_ok=True)  # Crear directorio si no existe
 
     @staticmethod
-    def generate_hash(text: str) -> str:
+    def generate_hash(text: str, clean: bool = True) -> str:
         """
         Genera un hash único basado en el texto proporcionado.
 
@@ -29,11 +29,13 @@ class FileService:
         y luego se utiliza el algoritmo MD5 para generar un hash único.
         Args:
             text (str): El texto que se usará para generar el hash.
+            clean (bool): Si es False el texto se usa tal cual (por ejemplo, si ya está canonicalizado).
         Returns:
             str: El hash MD5 del texto limpio.
         """
-        clean_text = ''.join(e for e in text if e.isalnum() or e.isspace())  # Limpiar el texto
-        return hashlib.md5(clean_text.encode('utf-8')).hexdigest()
+        if clean:
+            text = ''.join(e for e in text if e.isalnum() or e.isspace())  # Limpiar el texto
+        return hashlib.md5(text.encode('utf-8')).hexdigest()
 
     def get_audio_path(self, text: str) -> Path:
         """
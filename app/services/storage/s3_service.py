@@ -1,31 +1,199 @@
+import io
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Tuple, Union
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import NoCredentialsError
+from app.utils.chunk_stream import ChunkStream
+
+MB = 1024 * 1024
 
 class S3Service:
     def __init__(self, aws_config: dict):
         """
         Inicializa el cliente S3 con la configuración proporcionada.
+        El cliente es único y compartido por todos los hilos; su pool de conexiones se dimensiona
+        para la concurrencia total de subidas (`upload_workers` × `transfer.max_concurrency`).
         :param aws_config: Diccionario con la configuración de AWS (credentials, bucket, region, etc.)
         """
+        transfer_config = aws_config.get('transfer', {})
+        upload_workers = aws_config.get('upload_workers', 8)
+        max_concurrency = transfer_config.get('max_concurrency', 4)
+
+        self.transfer_config = TransferConfig(
+            multipart_threshold=int(transfer_config.get('multipart_threshold_mb', 8) * MB),
+            multipart_chunksize=int(transfer_config.get('multipart_chunksize_mb', 8) * MB),
+            max_concurrency=max_concurrency,
+            use_threads=max_concurrency > 1
+        )
+
         self.s3_client = boto3.client(
             's3',
             aws_access_key_id=aws_config['access_key_id'],
             aws_secret_access_key=aws_config['secret_access_key'],
             region_name=aws_config['region'],
-            endpoint_url=aws_config['url']
+            endpoint_url=aws_config['url'],
+            config=Config(
+                max_pool_connections=transfer_config.get('max_pool_connections', upload_workers * max_concurrency),
+                retries={'max_attempts': transfer_config.get('max_attempts', 5), 'mode': 'adaptive'},
+                s3={'addressing_style': 'path' if aws_config.get('use_path_style_endpoint') else 'auto'}
+            )
         )
         self.bucket_name = aws_config['bucket']
+        # Las URLs se derivan del hash: prefijo común + nombre del objeto
+        self.url_prefix = f"{self.s3_client.meta.endpoint_url}/{self.bucket_name}/"
+        self.extra_args = {'ContentType': 'audio/mpeg'}
+        # Pool de hilos para subir (y descargar) varios archivos en paralelo
+        self.upload_workers = upload_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=upload_workers,
+            thread_name_prefix='s3-upload'
+        )
+
+    @staticmethod
+    def object_key(object_name: str) -> str:
+        """
+        Retorna la llave del objeto en el bucket para un audio.
+        :param object_name: Nombre del objeto (hash del audio)
+        :return: Llave del objeto
+        """
+        return f"audios/{object_name}.mp3"
+
+    def build_url(self, object_name: str) -> str:
+        """
+        Construye la URL pública de un audio a partir de su nombre.
+        :param object_name: Nombre del objeto (hash del audio)
+        :return: URL del archivo
+        """
+        return self.url_prefix + self.object_key(object_name)
+
+    def object_name_from_url(self, file_url: str) -> str:
+        """
+        Obtiene el nombre del objeto (hash del audio) a partir de una URL construida con `build_url`.
+        :param file_url: URL del audio
+        :return: Nombre del objeto
+        :raises ValueError: Si la URL no pertenece al bucket configurado
+        """
+        prefix = self.url_prefix + self.object_key('')[:-len('.mp3')]
+        if not file_url.startswith(prefix) or not file_url.endswith('.mp3'):
+            raise ValueError(f"La URL {file_url} no pertenece al bucket {self.bucket_name}")
+        return file_url[len(prefix):-len('.mp3')]
+
+    def download_audio(self, object_name: str) -> bytes:
+        """
+        Descarga el contenido de un audio del bucket.
+        :param object_name: Nombre del objeto (hash del audio)
+        :return: Contenido del archivo MP3
+        """
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=self.object_key(object_name))
+            return response['Body'].read()
+        except Exception as e:
+            raise Exception(f"Error al descargar el audio {object_name}: {e}")
+
+    def iter_downloads(self, object_names: List[str]) -> Iterator[bytes]:
+        """
+        Descarga varios audios en paralelo y los entrega en el orden recibido.
+        Como máximo se mantienen `upload_workers` descargas adelantadas.
+        :param object_names: Nombres de los objetos (hashes de los audios)
+        :return: Iterador con el contenido de cada audio
+        """
+        window = self.upload_workers
+        pending = deque()
+        names = iter(object_names)
+        for object_name in itertools.islice(names, window):
+            pending.append(self._executor.submit(self.download_audio, object_name))
+        while pending:
+            data = pending.popleft().result()
+            for object_name in itertools.islice(names, 1):
+                pending.append(self._executor.submit(self.download_audio, object_name))
+            yield data
 
     def upload_audio(self, file_path, object_name):
         """Sube un archivo de audio a un bucket de S3."""
         try:
-            destination_path = f"audios/{object_name}.mp3"
-            self.s3_client.upload_file(file_path, self.bucket_name, destination_path)
+            destination_path = self.object_key(object_name)
+            self.s3_client.upload_file(
+                file_path, self.bucket_name, destination_path,
+                ExtraArgs=self.extra_args, Config=self.transfer_config
+            )
             
-            return(f"{self.s3_client.meta.endpoint_url}/{self.bucket_name}/{destination_path}")  # Retorna la URL del archivo subido
+            return self.build_url(object_name)  # Retorna la URL del archivo subido
         except FileNotFoundError:
             raise Exception(f"El archivo {file_path} no fue encontrado.")
         except NoCredentialsError:
             raise Exception("No se encontraron las credenciales de AWS.")
         except Exception as e:
-            raise Exception(f"Error al subir el archivo a S3: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error al subir el archivo a S3: {str(e)}")
+
+    def upload_audio_fileobj(self, fileobj: BinaryIO, object_name: str) -> str:
+        """
+        Sube un audio a S3 leyendo por bloques desde un objeto tipo archivo.
+        Los archivos que superan `multipart_threshold_mb` se envían como carga multiparte sin cargarse completos en memoria.
+        :param fileobj: Objeto tipo archivo abierto en modo binario
+        :param object_name: Nombre del objeto (hash del audio)
+        :return: URL del archivo subido
+        """
+        try:
+            self.s3_client.upload_fileobj(
+                fileobj, self.bucket_name, self.object_key(object_name),
+                ExtraArgs=self.extra_args, Config=self.transfer_config
+            )
+
+            return self.build_url(object_name)
+        except NoCredentialsError:
+            raise Exception("No se encontraron las credenciales de AWS.")
+        except Exception as e:
+            raise Exception(f"Error al subir el archivo a S3: {str(e)}")
+
+    def upload_audio_bytes(self, data: bytes, object_name: str) -> str:
+        """
+        Sube a S3 un audio que está en memoria, sin crear un archivo temporal.
+        :param data: Contenido del audio
+        :param object_name: Nombre del objeto (hash del audio)
+        :return: URL del archivo subido
+        """
+        return self.upload_audio_fileobj(io.BytesIO(data), object_name)
+
+    def upload_audio_stream(self, chunks: Iterable[bytes], object_name: str) -> str:
+        """
+        Sube a S3 un audio a medida que se reciben sus bloques, sin archivo temporal.
+        Si el audio es menor a `multipart_threshold_mb` se envía desde un buffer en memoria en una sola
+        solicitud; si es mayor, se envía como carga multiparte mientras se sigue recibiendo.
+        :param chunks: Bloques de bytes del audio (por ejemplo `response.iter_content`)
+        :param object_name: Nombre del objeto (hash del audio)
+        :return: URL del archivo subido
+        """
+        return self.upload_audio_fileobj(io.BufferedReader(ChunkStream(chunks), buffer_size=1024 * 1024), object_name)
+
+    def _upload_source(self, source: Union[str, bytes, Callable[[], BinaryIO]], object_name: str) -> str:
+        """Sube un audio dado por su ruta, su contenido en memoria o una función que abre el objeto tipo archivo"""
+        if isinstance(source, (bytes, bytearray)):
+            return self.upload_audio_bytes(source, object_name)
+        if callable(source):
+            with source() as fileobj:
+                return self.upload_audio_fileobj(fileobj, object_name)
+        return self.upload_audio(source, object_name)
+
+    def upload_many(self, files: List[Tuple[Union[str, bytes, Callable[[], BinaryIO]], str]]) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """
+        Sube varios archivos de audio en paralelo con el pool de `upload_workers` hilos.
+        :param files: Lista de parejas (ruta, contenido en memoria o función que abre el archivo; nombre del objeto)
+        :return: Diccionario {nombre: URL} de los archivos subidos y {nombre: error} de los que fallaron
+        """
+        futures = {
+            self._executor.submit(self._upload_source, source, object_name): object_name
+            for source, object_name in files
+        }
+
+        uploaded, failed = {}, {}
+        for future in as_completed(futures):
+            object_name = futures[future]
+            try:
+                uploaded[object_name] = future.result()
+            except Exception as e:
+                failed[object_name] = str(e)
+        return uploaded, failed
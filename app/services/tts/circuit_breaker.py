@@ -0,0 +1,92 @@
+import threading
+import time
+from typing import Any, Dict
+
+class CircuitOpenError(TimeoutError):
+    """El proveedor está marcado como no disponible por su circuit breaker"""
+    pass
+
+class CircuitBreaker:
+    """
+    Circuit breaker de un proveedor.
+
+    Tras `failure_threshold` fallos consecutivos el circuito se abre y las solicitudes dejan de
+    enviarse al proveedor durante `reset_timeout` segundos. Luego pasa a semiabierto y deja pasar
+    una sola solicitud de prueba: si tiene éxito se cierra, si falla vuelve a abrirse.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Args:
+            name (str): Nombre del proveedor.
+            failure_threshold (int): Fallos consecutivos que abren el circuito.
+            reset_timeout (float): Segundos que el circuito permanece abierto antes de la prueba.
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_progress = False
+        self._lock = threading.Lock()
+        self._times_opened = 0
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Indica si se puede enviar una solicitud al proveedor.
+        En estado semiabierto solo se permite una solicitud de prueba a la vez.
+        Returns:
+            bool: True si la solicitud puede enviarse.
+        """
+        state = self.state
+        with self._lock:
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_progress:
+                self._trial_in_progress = True
+                return True
+            self._rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_progress = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_progress = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._times_opened += 1
+                    print(f"Circuit breaker abierto para el proveedor {self.name} tras {self._failures} fallos")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def record_skipped(self) -> None:
+        """Registra una solicitud que no llegó al proveedor (por ejemplo, venció en la cola)"""
+        with self._lock:
+            self._trial_in_progress = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'state': self.state,
+            'consecutive_failures': self._failures,
+            'times_opened': self._times_opened,
+            'rejected': self._rejected,
+        }
@@ -0,0 +1,173 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.utils.latency_histogram import LatencyHistogram
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+class ProviderGovernor:
+    """
+    Controla el acceso a un proveedor de texto a voz combinando un límite de solicitudes por
+    segundo (token bucket) y un máximo de solicitudes en curso.
+
+    Las solicitudes que no pueden iniciar de inmediato esperan en una cola por prioridad
+    (las interactivas antes que las de lotes, y en orden de llegada dentro de la misma prioridad)
+    hasta su plazo máximo, en lugar de llegar al proveedor y fallar por exceder su cuota.
+    Funciona dentro del event loop: la espera no ocupa hilos del pool.
+    """
+
+    def __init__(self, name: str, max_in_flight: int, rate_per_second: Optional[float] = None,
+                 burst: Optional[int] = None, max_queue: int = 10000):
+        """
+        Args:
+            name (str): Nombre del proveedor.
+            max_in_flight (int): Máximo de solicitudes simultáneas al proveedor.
+            rate_per_second (Optional[float]): Solicitudes por segundo permitidas, None para no limitar.
+            burst (Optional[int]): Solicitudes que se pueden iniciar de golpe; por defecto `max_in_flight`.
+            max_queue (int): Máximo de solicitudes en espera; las siguientes se rechazan.
+        """
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.rate_per_second = rate_per_second
+        self.burst = burst or max_in_flight
+        self.max_queue = max_queue
+
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._in_flight = 0
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        self.wait_time = LatencyHistogram()
+        self._admitted = 0
+        self._timed_out = 0
+        self._rejected = 0
+        self._max_depth = 0
+
+    @classmethod
+    def from_config(cls, name: str, provider_config: dict) -> "ProviderGovernor":
+        """
+        Construye el controlador a partir de la configuración del proveedor en `config.yaml`.
+        Args:
+            name (str): Nombre del proveedor.
+            provider_config (dict): Configuración del proveedor.
+        Returns:
+            ProviderGovernor: Controlador configurado.
+        """
+        rate_config = provider_config.get('rate_limit', {})
+        queue_config = provider_config.get('queue', {})
+        return cls(
+            name=name,
+            max_in_flight=provider_config.get('max_concurrency', 4),
+            rate_per_second=rate_config.get('requests_per_second'),
+            burst=rate_config.get('burst'),
+            max_queue=queue_config.get('max_size', 10000),
+        )
+
+    def _refill(self) -> None:
+        if self.rate_per_second is None:
+            return
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate_per_second)
+        self._refilled_at = now
+
+    def _dispatch(self) -> None:
+        """Despierta a las solicitudes de mayor prioridad mientras haya cupo y tokens disponibles"""
+        self._refill()
+        while self._queue and self._in_flight < self.max_in_flight:
+            _, _, waiter = self._queue[0]
+            if waiter.done():
+                # Solicitud cancelada o vencida mientras esperaba
+                heapq.heappop(self._queue)
+                continue
+            if self.rate_per_second is not None and self._tokens < 1:
+                self._schedule_refill()
+                return
+            heapq.heappop(self._queue)
+            if self.rate_per_second is not None:
+                self._tokens -= 1
+            self._in_flight += 1
+            waiter.set_result(None)
+
+    def _schedule_refill(self) -> None:
+        """Programa un nuevo despacho para cuando se genere el siguiente token"""
+        if self._timer is not None:
+            return
+        delay = (1 - self._tokens) / self.rate_per_second
+
+        def on_timer():
+            self._timer = None
+            self._dispatch()
+
+        self._timer = asyncio.get_running_loop().call_later(delay, on_timer)
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_INTERACTIVE, timeout: Optional[float] = None) -> AsyncIterator[None]:
+        """
+        Espera un turno para llamar al proveedor y lo libera al salir del bloque.
+        Args:
+            priority (int): Prioridad de la solicitud; un valor menor se atiende antes.
+            timeout (Optional[float]): Segundos máximos de espera en la cola, None para esperar sin límite.
+        Raises:
+            TimeoutError: Si la cola está llena o el turno no llega antes del plazo.
+        """
+        if len(self._queue) >= self.max_queue:
+            self._rejected += 1
+            raise TimeoutError(f"El proveedor {self.name} tiene demasiadas solicitudes en espera")
+
+        started = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), waiter))
+        self._max_depth = max(self._max_depth, len(self._queue))
+        self._dispatch()
+
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as err:
+            if waiter.done() and not waiter.cancelled():
+                # El turno llegó justo al vencer el plazo: se devuelve para no perder el cupo
+                self._release()
+            if isinstance(err, asyncio.TimeoutError):
+                self._timed_out += 1
+                raise TimeoutError(
+                    f"El proveedor {self.name} no pudo atender la solicitud en {timeout} segundos"
+                ) from None
+            raise
+
+        self._admitted += 1
+        self.wait_time.observe((time.perf_counter() - started) * 1000)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna las métricas de la cola del proveedor.
+        Returns:
+            Dict[str, Any]: Profundidad de la cola, solicitudes en curso, admitidas, vencidas y rechazadas,
+            y el histograma del tiempo de espera.
+        """
+        self._refill()
+        return {
+            'queue_depth': sum(1 for _, _, waiter in self._queue if not waiter.done()),
+            'max_queue_depth': self._max_depth,
+            'in_flight': self._in_flight,
+            'max_in_flight': self.max_in_flight,
+            'rate_per_second': self.rate_per_second,
+            'tokens': round(self._tokens, 2) if self.rate_per_second is not None else None,
+            'admitted': self._admitted,
+            'timed_out': self._timed_out,
+            'rejected': self._rejected,
+            'wait_ms': self.wait_time.stats(),
+        }
@@ -0,0 +1,113 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.models.information_model import InformationModel
+from app.providers.base_provider import FALLBACK_VOICES_KEY
+from app.services.tts.circuit_breaker import CircuitBreaker
+from app.services.voices.voice_registry import VoiceRegistry
+from app.utils.latency_histogram import LatencyHistogram
+
+class ProviderRouter:
+    """
+    Política de enrutamiento entre proveedores de voces equivalentes.
+
+    Un modelo puede declarar voces de respaldo en `metadata['fallback_voices']` (ids de otros
+    modelos, normalmente de otras plataformas). El router entrega los candidatos en orden,
+    mantiene un circuit breaker por proveedor y calcula, a partir de la latencia p95 de cada
+    proveedor, cuánto esperar antes de enviar una solicitud de respaldo (hedging).
+    """
+
+    def __init__(self, voice_registry: VoiceRegistry, platforms: Iterable[str], routing_config: Optional[dict] = None):
+        """
+        Args:
+            voice_registry (VoiceRegistry): Registro para resolver los modelos de respaldo.
+            platforms (Iterable[str]): Nombres de los proveedores.
+            routing_config (Optional[dict]): Sección `api.routing` del archivo de configuración.
+        """
+        routing_config = routing_config or {}
+        breaker_config = routing_config.get('circuit_breaker', {})
+        hedging_config = routing_config.get('hedging', {})
+
+        self.voice_registry = voice_registry
+        self.failover = routing_config.get('failover', True)
+        self.hedging = hedging_config.get('enabled', False)
+        self.hedge_percentile = hedging_config.get('percentile', 95)
+        self.hedge_min_samples = hedging_config.get('min_samples', 20)
+        self.hedge_default_delay = hedging_config.get('default_delay_ms', 5000) / 1000
+
+        self.breakers = {
+            platform: CircuitBreaker(
+                platform,
+                failure_threshold=breaker_config.get('failure_threshold', 5),
+                reset_timeout=breaker_config.get('reset_timeout_seconds', 30)
+            )
+            for platform in platforms
+        }
+        # Latencia completa de una síntesis (proveedor + subida + registro) por proveedor
+        self.latency = {platform: LatencyHistogram() for platform in platforms}
+        self._hedged = 0
+        self._failovers = 0
+
+    def candidates(self, model: InformationModel) -> List[InformationModel]:
+        """
+        Retorna el modelo principal seguido de sus voces de respaldo disponibles.
+        Args:
+            model (InformationModel): Modelo solicitado.
+        Returns:
+            List[InformationModel]: Modelos en orden de preferencia.
+        """
+        models = [model]
+        fallback_ids = (model.metadata or {}).get(FALLBACK_VOICES_KEY) or []
+        if not self.failover or not isinstance(fallback_ids, list):
+            return models
+
+        for fallback_id in fallback_ids:
+            try:
+                fallback = self.voice_registry.get_by_id(int(fallback_id))
+            except (TypeError, ValueError):
+                fallback = None
+            if fallback is not None and all(fallback.id != candidate.id for candidate in models):
+                models.append(fallback)
+        return models
+
+    def breaker(self, platform: str) -> CircuitBreaker:
+        return self.breakers[platform]
+
+    def observe(self, platform: str, elapsed_ms: float) -> None:
+        """Registra la latencia de una síntesis exitosa"""
+        self.latency[platform].observe(elapsed_ms)
+
+    def hedge_delay(self, platform: str) -> Optional[float]:
+        """
+        Calcula cuántos segundos esperar al proveedor antes de enviar una solicitud de respaldo.
+        Args:
+            platform (str): Proveedor de la solicitud en curso.
+        Returns:
+            Optional[float]: Segundos de espera, None si el hedging está desactivado.
+        """
+        if not self.hedging:
+            return None
+        histogram = self.latency[platform]
+        if len(histogram) < self.hedge_min_samples:
+            return self.hedge_default_delay
+        return histogram.percentile(self.hedge_percentile) / 1000
+
+    def record_hedge(self) -> None:
+        self._hedged += 1
+
+    def record_failover(self) -> None:
+        self._failovers += 1
+
+    def stats(self) -> Dict[str, Any]:
+        providers = {}
+        for platform, breaker in self.breakers.items():
+            delay = self.hedge_delay(platform)
+            providers[platform] = dict(
+                breaker.stats(),
+                p95_ms=self.latency[platform].percentile(95),
+                hedge_delay_ms=round(delay * 1000, 1) if delay is not None else None
+            )
+        return {
+            'hedged_requests': self._hedged,
+            'failovers': self._failovers,
+            'providers': providers,
+        }
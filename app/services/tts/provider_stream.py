@@ -0,0 +1,57 @@
+from contextlib import AsyncExitStack
+from typing import AsyncIterator, Callable
+
+from starlette.responses import StreamingResponse
+
+class ProviderStream:
+    """
+    Audio que un proveedor está transmitiendo, junto con los recursos que lo respaldan: la respuesta
+    HTTP del proveedor y el turno de su `ProviderGovernor`.
+
+    Los recursos se obtienen antes de responder al cliente (para reportar los errores con su código HTTP),
+    pero un generador que nunca se inicia no ejecuta su `finally`, por ejemplo si el cliente se desconecta
+    antes de leer el primer bloque. Por eso la liberación está en `release`, que es idempotente y la llaman
+    tanto el generador al terminar como la respuesta HTTP al cerrarse.
+    """
+
+    def __init__(self, response, slot: AsyncExitStack,
+                 chunks_factory: Callable[["ProviderStream"], AsyncIterator[bytes]]):
+        """
+        Args:
+            response: Respuesta del proveedor (`requests.Response` o equivalente con `iter_content` y `close`).
+            slot (AsyncExitStack): Turno del proveedor, liberado con `aclose`.
+            chunks_factory (Callable[[ProviderStream], AsyncIterator[bytes]]): Crea el iterador de bloques del audio.
+        """
+        self.response = response
+        self._slot = slot
+        self._released = False
+        self._chunks = chunks_factory(self)
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return self._chunks
+
+    async def release(self) -> None:
+        """Cierra la respuesta del proveedor y libera su turno; las llamadas siguientes no hacen nada"""
+        if self._released:
+            return
+        self._released = True
+        try:
+            self.response.close()
+        finally:
+            await self._slot.aclose()
+
+class ProviderStreamingResponse(StreamingResponse):
+    """
+    Respuesta en streaming de un `ProviderStream` que lo libera al terminar, incluso si el cliente
+    se desconecta antes de leer el primer bloque y el generador nunca llega a iniciarse.
+    """
+
+    def __init__(self, stream: ProviderStream, **kwargs):
+        super().__init__(stream, **kwargs)
+        self.stream = stream
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.stream.release()
@@ -0,0 +1,48 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+class SingleFlight:
+    """
+    Agrupa las llamadas concurrentes que comparten una misma clave para que el trabajo
+    se ejecute una sola vez y todas reciban el mismo resultado.
+
+    El trabajo se ejecuta en una tarea independiente, de modo que si el primer solicitante
+    se cancela (por ejemplo, el cliente cierra la conexión) los demás siguen esperando el resultado.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._leaders = 0
+        self._coalesced = 0
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Ejecuta `func` para la clave indicada o espera el resultado de la ejecución en curso.
+        Args:
+            key (str): Clave que identifica el trabajo (por ejemplo, el hash del audio).
+            func (Callable[[], Awaitable[Any]]): Función asíncrona que realiza el trabajo.
+        Returns:
+            Any: Resultado del trabajo.
+        """
+        task = self._in_flight.get(key)
+        if task is not None:
+            self._coalesced += 1
+            return await asyncio.shield(task)
+
+        self._leaders += 1
+        task = asyncio.ensure_future(func())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Retorna los contadores del agrupamiento de solicitudes.
+        Returns:
+            Dict[str, int]: Ejecuciones reales, solicitudes agrupadas y trabajos en curso.
+        """
+        return {
+            'executed': self._leaders,
+            'coalesced': self._coalesced,
+            'in_flight': len(self._in_flight),
+        }
@@ -1,12 +1,29 @@
+import asyncio
+import functools
 import os
-from typing import Dict
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack
+from typing import Any, AsyncIterator, BinaryIO, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
 import requests
+from starlette.concurrency import iterate_in_threadpool
 from app.models.information_model import InformationModel
 from app.models.tts_model import TextToSpeechRequestById
 from app.providers.playht_provider import PlayHTProvider
-from app.providers.polly_provider import PollyProvider
+from app.providers.polly_provider import PollyProvider, is_ssml
 from app.providers.voicemaker_provider import VoicemakerProvider
 from app.services.container_service import ServiceContainer
+from app.services.storage.file_service import FileService
+from app.services.tts.circuit_breaker import CircuitOpenError
+from app.services.tts.provider_governor import PRIORITY_BATCH, PRIORITY_INTERACTIVE, ProviderGovernor
+from app.services.tts.provider_router import ProviderRouter
+from app.services.tts.provider_stream import ProviderStream
+from app.services.tts.single_flight import SingleFlight
+from app.utils.mp3 import audio_frames
+from app.utils.text_canonicalizer import TextCanonicalizer
+from app.utils.text_splitter import split_chunks
 from app.utils.yaml_loader import YamlLoaderMixin
 
 class TTSService(YamlLoaderMixin):
@@ -17,13 +34,12 @@ class TTSService(YamlLoaderMixin):
         YamlLoaderMixin: Clase base para cargar configuraciones desde archivos YAML.
     """
 
-    def __init__(self, services: ServiceContainer, voices: dict):
+    def __init__(self, services: ServiceContainer):
         """
         Inicializa la instancia de TTSService.
         Args:
-            services (ServiceContainer): Contenedor de servicios que incluye la base de datos y el servicio de archivos.
+            services (ServiceContainer): Contenedor de servicios que incluye la base de datos, el servicio de archivos y el registro de voces.
         """
-        self.voices = voices
         self.services = services
 
         # Inicializar proveedores
@@ -35,6 +51,498 @@ class TTSService(YamlLoaderMixin):
             'voicemaker': VoicemakerProvider(config['api']['tts_providers']['voicemaker'])
         }
 
+        # Pool de hilos para las operaciones bloqueantes (proveedores, MySQL y S3)
+        executor_config = config['api'].get('executor', {})
+        self.executor = ThreadPoolExecutor(
+            max_workers=executor_config.get('max_workers', 32),
+            thread_name_prefix='tts-worker'
+        )
+        # Agrupa las síntesis concurrentes del mismo audio en una sola llamada al proveedor
+        self.single_flight = SingleFlight()
+
+        # Límite de solicitudes por segundo y de solicitudes simultáneas de cada proveedor, con cola por prioridad
+        self.governors = {
+            name: ProviderGovernor.from_config(name, provider_config)
+            for name, provider_config in config['api']['tts_providers'].items()
+        }
+        # Voces de respaldo, hedging y circuit breaker por proveedor
+        self.router = ProviderRouter(services.voice_registry, self.providers, config['api'].get('routing'))
+
+        # "stream": el audio del proveedor se sube a S3 sin tocar el disco
+        # "file": se guarda en un archivo temporal antes de subirlo (útil para depurar)
+        synthesis_config = config['api'].get('synthesis', {})
+        self.storage_mode = synthesis_config.get('storage_mode', 'stream')
+        self.chunk_size = synthesis_config.get('chunk_size_kb', 8) * 1024
+        # Bytes del audio transmitido que se guardan en memoria antes de pasar a un archivo temporal
+        self.stream_buffer_size = synthesis_config.get('stream_buffer_kb', 2048) * 1024
+        # Segundos máximos de espera en la cola del proveedor según la prioridad (None: sin límite)
+        queue_timeout = synthesis_config.get('queue_timeout_seconds', {})
+        self.queue_timeouts = {
+            PRIORITY_INTERACTIVE: queue_timeout.get('interactive', 30),
+            PRIORITY_BATCH: queue_timeout.get('batch'),
+        }
+        self._background_tasks: Set[asyncio.Task] = set()
+
+        # Forma canónica del texto para el hash y para el proveedor (None: llaves y texto anteriores)
+        self.canonicalizer = TextCanonicalizer.from_config(config['api'].get('canonicalization'))
+
+        # Textos largos: se dividen en fragmentos que se sintetizan en paralelo y se unen en un solo MP3.
+        # El tamaño máximo de fragmento se limita al `max_text_length` de cada proveedor
+        chunking_config = synthesis_config.get('chunking', {})
+        self.chunking_enabled = chunking_config.get('enabled', False)
+        self.chunk_min_chars = chunking_config.get('min_chars', 200)
+        self.chunk_fetch_timeout = chunking_config.get('fetch_timeout_seconds', 30)
+        self.chunk_max_chars = {
+            name: min(chunking_config.get('max_chars', 600), provider_config.get('max_text_length', float('inf')))
+            for name, provider_config in config['api']['tts_providers'].items()
+        }
+
+    @staticmethod
+    def build_audio_hash(read_text: str, model: InformationModel, canonicalizer: Optional[TextCanonicalizer] = None) -> str:
+        """
+        Construye el hash que identifica un audio para un texto y un modelo de voz.
+        Args:
+            read_text (str): Texto que se leerá.
+            model (InformationModel): Modelo de voz a utilizar.
+            canonicalizer (Optional[TextCanonicalizer]): Si se indica, el hash se calcula sobre el texto canónico,
+                incluida la puntuación que conserva; si no, sobre el texto sin puntuación (llaves anteriores).
+        Returns:
+            str: Hash MD5 del audio.
+        """
+        voice = model.language[:2] + str(model.id) + model.voice_name + model.gender
+        if canonicalizer is None:
+            return FileService.generate_hash((read_text + voice).lower())
+        return FileService.generate_hash(f"{canonicalizer.canonicalize(read_text, model.language)}|{voice.lower()}", clean=False)
+
+    def hash_text(self, read_text: str, model: InformationModel) -> str:
+        """Hash del audio de un texto con la canonicalización configurada"""
+        return self.build_audio_hash(read_text, model, self.canonicalizer)
+
+    async def run_blocking(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Ejecuta una función bloqueante en el pool de hilos sin detener el event loop.
+        Args:
+            func (Callable): Función a ejecutar.
+        Returns:
+            Any: Resultado de la función.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    def _get_governor(self, platform: str) -> ProviderGovernor:
+        """
+        Obtiene el controlador de acceso de un proveedor.
+        Args:
+            platform (str): Nombre del proveedor.
+        Returns:
+            ProviderGovernor: Controlador del proveedor.
+        Raises:
+            ValueError: Si el proveedor no está soportado.
+        """
+        governor = self.governors.get(platform)
+        if governor is None or platform not in self.providers:
+            raise ValueError(f"Plataforma no soportada: {platform}")
+        return governor
+
+    async def generate_audio_from_text_async(self, request: TextToSpeechRequestById, model: InformationModel,
+                                             priority: int = PRIORITY_INTERACTIVE) -> str:
+        """
+        Versión asíncrona de `generate_audio_from_text`.
+        Los aciertos de caché se resuelven en memoria sin salir del event loop; solo los
+        fallos se delegan al pool de hilos para llamar al proveedor, subir a S3 y guardar en MySQL.
+        Las solicitudes concurrentes de un mismo hash esperan el resultado de la primera.
+        Args:
+            request (TextToSpeechRequestById): Objeto de solicitud que contiene el texto a procesar.
+            model (InformationModel): Modelo de información con los detalles de la voz a utilizar.
+            priority (int): Prioridad en la cola del proveedor (`PRIORITY_INTERACTIVE` o `PRIORITY_BATCH`).
+        Returns:
+            str: La URL del archivo de audio generado.
+        Raises:
+            TimeoutError: Si el proveedor no puede atender la solicitud dentro del plazo de la cola.
+        """
+        audio_hash = self.hash_text(request.read, model)
+        cached_url = self.services.db_service.get_cached_url(audio_hash)
+        if cached_url:
+            return cached_url
+
+        return await self.single_flight.do(
+            audio_hash,
+            lambda: self._generate_async(request, model, audio_hash, priority)
+        )
+
+    async def _generate_async(self, request: TextToSpeechRequestById, model: InformationModel, audio_hash: str, priority: int) -> str:
+        """
+        Busca el audio en la BD y, si no existe, lo sintetiza con el modelo o sus voces de respaldo.
+        """
+        existing_audio = await self.run_blocking(self.services.db_service.get_audio_by_hash, audio_hash, verify=True)
+        if existing_audio and 'file_url' in existing_audio:
+            return existing_audio['file_url']
+
+        self._get_governor(model.platform)
+        if self._should_chunk(request.read, model):
+            return await self._synthesize_chunked(request, model, audio_hash, priority)
+        return await self._synthesize_routed(request, model, priority)
+
+    def _should_chunk(self, read_text: str, model: InformationModel) -> bool:
+        """Indica si el texto es lo bastante largo para sintetizarse por fragmentos"""
+        return (
+            self.chunking_enabled
+            and not is_ssml(read_text)
+            and len(read_text) > self.chunk_max_chars.get(model.platform, float('inf'))
+        )
+
+    async def _synthesize_chunked(self, request: TextToSpeechRequestById, model: InformationModel, audio_hash: str, priority: int) -> str:
+        """
+        Sintetiza un texto largo por fragmentos de oraciones completas.
+        Cada fragmento se procesa en paralelo como una solicitud independiente, por lo que queda en caché
+        con su propio hash y se reutiliza en otros documentos que lo contengan. Los fragmentos se sintetizan
+        solo con el modelo solicitado (sin voces de respaldo ni hedging), de modo que el audio completo no
+        mezcla voces ni frecuencias de muestreo. Al final se concatenan las tramas MP3 de los fragmentos en
+        un solo audio, sin volver a codificar, y se registra con el hash del texto completo.
+        Args:
+            request (TextToSpeechRequestById): Solicitud con el texto completo.
+            model (InformationModel): Modelo de voz a utilizar.
+            audio_hash (str): Hash del texto completo.
+            priority (int): Prioridad en la cola del proveedor.
+        Returns:
+            str: URL del audio completo.
+        """
+        max_chars = int(self.chunk_max_chars[model.platform])
+        chunks = split_chunks(request.read, max_chars, min(self.chunk_min_chars, max_chars))
+        if len(chunks) < 2:
+            return await self._synthesize_routed(request, model, priority)
+
+        chunk_urls = await asyncio.gather(*(
+            self._generate_chunk_async(TextToSpeechRequestById(read=chunk, text=chunk), model, priority)
+            for chunk in chunks
+        ))
+        return await self.run_blocking(self._stitch_chunks, request, model, list(chunk_urls), audio_hash)
+
+    async def _generate_chunk_async(self, request: TextToSpeechRequestById, model: InformationModel, priority: int) -> str:
+        """
+        Obtiene el audio de un fragmento con el modelo solicitado, sin pasar por las voces de respaldo.
+        Usa su propia llave de single-flight: una síntesis enrutada del mismo texto puede terminar con
+        el audio de otra voz.
+        Raises:
+            CircuitOpenError: Si el circuit breaker del proveedor del modelo está abierto.
+        """
+        audio_hash = self.hash_text(request.read, model)
+        cached_url = self.services.db_service.get_cached_url(audio_hash)
+        if cached_url:
+            return cached_url
+
+        async def generate() -> str:
+            existing_audio = await self.run_blocking(self.services.db_service.get_audio_by_hash, audio_hash, verify=True)
+            if existing_audio and 'file_url' in existing_audio:
+                return existing_audio['file_url']
+            if not self.router.breaker(model.platform).allow_request():
+                raise CircuitOpenError(f"El proveedor {model.platform} no está disponible")
+            return await self._synthesize_candidate(request, model, priority, False)
+
+        return await self.single_flight.do(f"{audio_hash}:chunk", generate)
+
+    def _stitch_chunks(self, request: TextToSpeechRequestById, model: InformationModel, chunk_urls: List[str], audio_hash: str) -> str:
+        """
+        Descarga los audios de los fragmentos, concatena sus tramas MP3 (sin etiquetas ID3 ni trama
+        Xing/Info) y sube el resultado a S3 sin pasar por disco. Los fragmentos cuya URL no pertenece
+        al bucket configurado (registros anteriores o con otra URL base) se descargan por su URL.
+        """
+        s3_service = self.services.s3_service
+        object_names: List[Optional[str]] = []
+        for chunk_url in chunk_urls:
+            try:
+                object_names.append(s3_service.object_name_from_url(chunk_url))
+            except ValueError:
+                object_names.append(None)
+
+        def chunk_audios() -> Iterator[bytes]:
+            downloads = s3_service.iter_downloads([name for name in object_names if name is not None])
+            for chunk_url, object_name in zip(chunk_urls, object_names):
+                yield next(downloads) if object_name is not None else self._fetch_audio_url(chunk_url)
+
+        frames = (audio_frames(data) for data in chunk_audios())
+        audio_file_url = s3_service.upload_audio_stream(frames, audio_hash)
+        return self._save_record(request, model, audio_file_url, audio_hash)
+
+    def _fetch_audio_url(self, file_url: str) -> bytes:
+        """
+        Descarga un audio por su URL.
+        Raises:
+            ValueError: Si la descarga falla.
+        """
+        try:
+            response = requests.get(file_url, timeout=self.chunk_fetch_timeout)
+            response.raise_for_status()
+            return response.content
+        except requests.exceptions.RequestException as e:
+            raise ValueError(f"Error al descargar el fragmento {file_url}: {e}")
+
+    async def _synthesize_routed(self, request: TextToSpeechRequestById, model: InformationModel, priority: int) -> str:
+        """
+        Sintetiza el audio probando en orden el modelo solicitado y sus voces de respaldo.
+        Si una voz falla se pasa a la siguiente (failover). En las solicitudes interactivas con hedging
+        activo, si la voz en curso no termina dentro de la latencia p95 de su proveedor se envía también
+        a la siguiente y se usa la primera que termine. Cada audio se guarda con el hash de su propio modelo.
+        Args:
+            request (TextToSpeechRequestById): Solicitud a procesar.
+            model (InformationModel): Modelo solicitado.
+            priority (int): Prioridad en la cola del proveedor.
+        Returns:
+            str: URL del audio generado.
+        Raises:
+            CircuitOpenError: Si ningún proveedor candidato está disponible.
+            TimeoutError: Si la solicitud venció en la cola del proveedor.
+            ValueError: Si el proveedor rechaza la solicitud.
+        """
+        remaining = self.router.candidates(model)
+        running: Dict[asyncio.Future, InformationModel] = {}
+        errors: List[BaseException] = []
+
+        def launch_next() -> Optional[InformationModel]:
+            while remaining:
+                candidate = remaining.pop(0)
+                if candidate.platform not in self.providers:
+                    continue
+                if not self.router.breaker(candidate.platform).allow_request():
+                    errors.append(CircuitOpenError(f"El proveedor {candidate.platform} no está disponible"))
+                    continue
+                task = asyncio.ensure_future(self._synthesize_candidate(request, candidate, priority, candidate is not model))
+                running[task] = candidate
+                return candidate
+            return None
+
+        current = launch_next()
+        try:
+            while running:
+                hedge_after = None
+                if priority == PRIORITY_INTERACTIVE and remaining:
+                    hedge_after = self.router.hedge_delay(current.platform)
+
+                done, _ = await asyncio.wait(running, timeout=hedge_after, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # La voz en curso superó su p95: se envía la misma solicitud a la siguiente
+                    hedge = launch_next()
+                    if hedge is not None:
+                        current = hedge
+                        self.router.record_hedge()
+                    continue
+
+                for task in done:
+                    del running[task]
+                    if task.exception() is None:
+                        return task.result()
+                    errors.append(task.exception())
+
+                if not running:
+                    next_candidate = launch_next()
+                    if next_candidate is not None:
+                        current = next_candidate
+                        self.router.record_failover()
+        finally:
+            # Las síntesis que siguen en curso terminan en segundo plano y su audio queda guardado
+            for task in running:
+                self._background_tasks.add(task)
+                task.add_done_callback(self._discard_background_task)
+
+        raise errors[0] if errors else ValueError(f"Plataforma no soportada: {model.platform}")
+
+    def _discard_background_task(self, task: asyncio.Future) -> None:
+        """Retira una tarea en segundo plano terminada, registrando su error si lo hubo"""
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Error en una síntesis en segundo plano: {task.exception()}")
+
+    async def _synthesize_candidate(self, request: TextToSpeechRequestById, model: InformationModel, priority: int,
+                                    check_existing: bool) -> str:
+        """
+        Sintetiza el audio con un modelo candidato, esperando un turno de su proveedor, y
+        registra el resultado en el circuit breaker y en la latencia del proveedor.
+        La espera en la cola ocurre en el event loop, sin ocupar hilos del pool.
+        """
+        audio_hash = self.hash_text(request.read, model)
+        breaker = self.router.breaker(model.platform)
+
+        if check_existing:
+            existing_audio = await self.run_blocking(self.services.db_service.get_audio_by_hash, audio_hash, verify=True)
+            if existing_audio and 'file_url' in existing_audio:
+                breaker.record_skipped()
+                return existing_audio['file_url']
+
+        try:
+            async with self.governors[model.platform].slot(priority, self.queue_timeouts.get(priority)):
+                started = time.perf_counter()
+                audio_file_url = await self.run_blocking(
+                    self.synthesize_audio, request, model, request.read, audio_hash
+                )
+        except (TimeoutError, asyncio.CancelledError):
+            # La solicitud no llegó al proveedor: no cuenta como fallo
+            breaker.record_skipped()
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+
+        breaker.record_success()
+        self.router.observe(model.platform, (time.perf_counter() - started) * 1000)
+        return audio_file_url
+
+    async def stream_audio(self, request: TextToSpeechRequestById, model: InformationModel) -> Tuple[Optional[str], Optional[ProviderStream]]:
+        """
+        Obtiene el audio de un texto como flujo de bytes directamente desde el proveedor.
+        Si el audio ya está en caché se retorna su URL. Si no, se retorna un `ProviderStream` que entrega
+        los bloques del proveedor a medida que llegan y, al completarse, guarda el audio en S3 y
+        en la base de datos en segundo plano. Quien lo reciba debe llamar a su `release` al terminar,
+        se haya leído o no.
+        Args:
+            request (TextToSpeechRequestById): Objeto de solicitud que contiene el texto a procesar.
+            model (InformationModel): Modelo de información con los detalles de la voz a utilizar.
+        Returns:
+            Tuple[Optional[str], Optional[ProviderStream]]: URL en caché o flujo de bloques del audio.
+        Raises:
+            ValueError: Si el proveedor no está soportado o rechaza la solicitud.
+        """
+        audio_hash = self.hash_text(request.read, model)
+        cached_url = self.services.db_service.get_cached_url(audio_hash)
+        if cached_url:
+            return cached_url, None
+
+        existing_audio = await self.run_blocking(self.services.db_service.get_audio_by_hash, audio_hash, verify=True)
+        if existing_audio and 'file_url' in existing_audio:
+            return existing_audio['file_url'], None
+
+        governor = self._get_governor(model.platform)
+        provider = self.providers[model.platform]
+        read_text = self._prepare_text(request.read, model)
+        api_request = provider.build_request(read_text, model)
+
+        # El turno del proveedor se conserva mientras dura la transmisión
+        slot = AsyncExitStack()
+        await slot.enter_async_context(
+            governor.slot(PRIORITY_INTERACTIVE, self.queue_timeouts.get(PRIORITY_INTERACTIVE))
+        )
+        try:
+            response = await self.run_blocking(provider.execute_request, api_request)
+        except requests.exceptions.RequestException as e:
+            await slot.aclose()
+            raise ValueError(f"Error al llamar a la API: {e}")
+        except BaseException:
+            await slot.aclose()
+            raise
+
+        return None, ProviderStream(
+            response, slot, lambda stream: self._tee_stream(stream, request, model, audio_hash)
+        )
+
+    async def _tee_stream(self, stream: ProviderStream, request: TextToSpeechRequestById, model: InformationModel,
+                          audio_hash: str) -> AsyncIterator[bytes]:
+        """
+        Entrega los bloques de la respuesta del proveedor y los copia en un buffer.
+        Si el flujo se completa, el buffer se guarda en segundo plano; si el cliente se desconecta
+        antes, el audio parcial se descarta. Al terminar se libera el turno del proveedor.
+        """
+        buffer = tempfile.SpooledTemporaryFile(max_size=self.stream_buffer_size)
+        completed = False
+        try:
+            async for chunk in iterate_in_threadpool(stream.response.iter_content(chunk_size=self.chunk_size)):
+                if chunk:
+                    buffer.write(chunk)
+                    yield chunk
+            completed = True
+        finally:
+            await stream.release()
+            if completed:
+                task = asyncio.ensure_future(
+                    self.run_blocking(self._persist_stream, buffer, request, model, audio_hash)
+                )
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+            else:
+                buffer.close()
+
+    def _persist_stream(self, buffer, request: TextToSpeechRequestById, model: InformationModel, audio_hash: str) -> None:
+        """
+        Sube a S3 y registra en la base de datos un audio transmitido al cliente.
+        Args:
+            buffer: Buffer con el audio completo.
+            request (TextToSpeechRequestById): Objeto de solicitud que contiene el texto a procesar.
+            model (InformationModel): Modelo de voz utilizado.
+            audio_hash (str): Hash único del audio.
+        """
+        try:
+            buffer.seek(0)
+            audio_file_url = self.services.s3_service.upload_audio_fileobj(buffer, audio_hash)
+            self._save_record(request, model, audio_file_url, audio_hash)
+        except Exception as e:
+            print(f"Error al guardar el audio transmitido {audio_hash}: {e}")
+        finally:
+            buffer.close()
+
+    async def generate_batch_async(self, requests: List[TextToSpeechRequestById], model: InformationModel) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Genera los audios de un lote de solicitudes para un mismo modelo.
+        Los aciertos de caché se resuelven en una sola pasada y se emiten de inmediato; los fallos
+        se sintetizan en paralelo con prioridad de lote en la cola del proveedor, de modo que las
+        solicitudes interactivas se atienden antes, y se emiten a medida que terminan.
+        Args:
+            requests (List[TextToSpeechRequestById]): Solicitudes a procesar.
+            model (InformationModel): Modelo de información con los detalles de la voz a utilizar.
+        Yields:
+            Dict[str, Any]: Resultado de cada solicitud con su índice dentro del lote.
+        """
+        audio_hashes = [self.hash_text(request.read, model) for request in requests]
+        cached_urls = await self.run_blocking(self.services.db_service.get_urls_by_hashes, audio_hashes)
+
+        pending = []
+        for index, (request, audio_hash) in enumerate(zip(requests, audio_hashes)):
+            if audio_hash in cached_urls:
+                yield {'index': index, 'audio_path': cached_urls[audio_hash], 'cached': True}
+            else:
+                pending.append(asyncio.ensure_future(self._generate_batch_item(index, request, model, audio_hash)))
+
+        try:
+            for next_result in asyncio.as_completed(pending):
+                yield await next_result
+        finally:
+            # Si el cliente se desconecta se cancelan las síntesis que aún no han iniciado
+            for task in pending:
+                task.cancel()
+
+    async def _generate_batch_item(self, index: int, request: TextToSpeechRequestById, model: InformationModel, audio_hash: str) -> Dict[str, Any]:
+        """
+        Sintetiza un elemento del lote con prioridad de lote en la cola del proveedor.
+        Args:
+            index (int): Posición del elemento dentro del lote.
+            request (TextToSpeechRequestById): Solicitud a procesar.
+            model (InformationModel): Modelo de voz a utilizar.
+            audio_hash (str): Hash único del audio.
+        Returns:
+            Dict[str, Any]: Resultado del elemento, con la URL o el error producido.
+        """
+        try:
+            audio_path = await self.single_flight.do(
+                audio_hash,
+                lambda: self._generate_async(request, model, audio_hash, PRIORITY_BATCH)
+            )
+            return {'index': index, 'audio_path': audio_path, 'cached': False}
+        except Exception as e:
+            return {'index': index, 'error': str(e)}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna las métricas internas del servicio.
+        Returns:
+            Dict[str, Any]: Métricas agrupadas por componente.
+        """
+        return {
+            'single_flight': self.single_flight.stats(),
+            'cache': self.services.db_service.get_cache_stats(),
+            'db': self.services.db_service.get_query_stats(),
+            'change_feed': self.services.change_feed.stats(),
+            'providers': {name: provider.stats() for name, provider in self.providers.items()},
+            'scheduler': {name: governor.stats() for name, governor in self.governors.items()},
+            'routing': self.router.stats(),
+        }
+
     def generate_audio_from_text(self, request:TextToSpeechRequestById , model:InformationModel) -> str:
         """
         Genera un archivo de audio a partir de un texto utilizando un modelo de texto a voz.
@@ -49,16 +557,15 @@ class TTSService(YamlLoaderMixin):
             ValueError: Si ocurre un error durante la generación del audio.
         """
         read_text = request.read
-        audio_name = read_text + model.language[:2] + str(model.id) + model.voice_name + model.gender
-        audio_hash = self.services.file_service.generate_hash(audio_name.lower())
+        audio_hash = self.hash_text(read_text, model)
 
         # Verificar si el audio ya existe en la base de datos
-        existing_audio = self.services.db_service.get_audio_by_hash(audio_hash)
+        existing_audio = self.services.db_service.get_audio_by_hash(audio_hash, verify=True)
         if existing_audio and 'file_url' in existing_audio:
             return existing_audio['file_url']
         
         # Generar el audio con la voz seleccionada
-        audio_file_url = self.synthesize_audio(request, model, read_text.lower(), audio_hash)
+        audio_file_url = self.synthesize_audio(request, model, read_text, audio_hash)
         return audio_file_url
                 
     def synthesize_audio(self, request: TextToSpeechRequestById, model: InformationModel, read_text: str, audio_hash: str) -> str:
@@ -72,14 +579,7 @@ class TTSService(YamlLoaderMixin):
         Returns:
             str: La URL del archivo de audio generado.
         """
-        # Limpiar espacios al inicio y al final
-        read_text = read_text.strip()
-        if not read_text.endswith('.'):
-            read_text += '.'
-
-        # Generar el nombre del archivo de audio, 
-        audio_name = read_text + model.model
-        audio_path = self.services.file_service.get_audio_path(audio_name)
+        read_text = self._prepare_text(read_text, model)
 
         # Obtener el proveedor correspondiente
         provider = self.providers.get(model.platform)
@@ -90,20 +590,51 @@ class TTSService(YamlLoaderMixin):
             api_request = provider.build_request(read_text, model)
             response = provider.execute_request(api_request)
 
-            self.save_audio_from_response(response, audio_path)
+            if self.storage_mode == 'file':
+                # Generar el nombre del archivo de audio, 
+                audio_name = read_text + model.model
+                audio_path = self.services.file_service.get_audio_path(audio_name)
+                self.save_audio_from_response(response, audio_path)
 
-            return self._upload_and_save(
-                request=request,
-                model=model,
-                file_path=audio_path,
-                audio_hash=audio_hash
+                return self._upload_and_save(
+                    request=request,
+                    model=model,
+                    file_path=audio_path,
+                    audio_hash=audio_hash
+                )
+
+            audio_file_url = self.services.s3_service.upload_audio_stream(
+                response.iter_content(chunk_size=self.chunk_size), audio_hash
             )
+            return self._save_record(request, model, audio_file_url, audio_hash)
             
         except requests.exceptions.RequestException as e:
             raise ValueError(f"Error al llamar a la API: {e}")
+        except ValueError:
+            # Errores del proveedor (por ejemplo, cuota excedida) con su propio mensaje
+            raise
         except Exception as e:
             raise ValueError(f"Error al procesar el texto a audio: Tokens agotados, suscripción o parametros no validos. Detalles:{e}")
         
+    def _prepare_text(self, read_text: str, model: InformationModel) -> str:
+        """
+        Prepara el texto que se envía al proveedor.
+        Args:
+            read_text (str): Texto a convertir en audio.
+            model (InformationModel): Modelo de voz, cuyo idioma define las reglas de canonicalización.
+        Returns:
+            str: Texto canónico o, sin canonicalización, en minúsculas, sin espacios al inicio y al final
+                y terminado en punto (salvo si es SSML).
+        """
+        if self.canonicalizer is not None:
+            return self.canonicalizer.canonicalize(read_text, model.language)
+
+        # Limpiar espacios al inicio y al final
+        read_text = read_text.lower().strip()
+        if not read_text.endswith('.') and not is_ssml(read_text):
+            read_text += '.'
+        return read_text
+
     @staticmethod
     def save_audio_from_response(response, audio_path: str):
         """
@@ -122,30 +653,87 @@ class TTSService(YamlLoaderMixin):
         except Exception as e:
             raise ValueError(f"Error al guardar el archivo de audio: {e}")
         
-    def save_files(self, files: Dict[str, str], model:InformationModel, path: str) -> bool:
+    def save_files(self, files: Dict[str, str], model:InformationModel, path: str) -> Dict[str, Any]:
         """
-        Guarda una lista de archivos en el sistema de archivos y los registra en la base de datos.
+        Sube a S3 los archivos extraídos de un ZIP y los registra en la base de datos.
+        La existencia se verifica con consultas masivas, las subidas se hacen en paralelo y
+        los registros se insertan por bloques en lugar de una fila y un commit por archivo.
 
         Args:
             files (Dict[str, str]): Diccionario con clave como texto y valor como ruta del archivo generado.
             model (InformationModel): Modelo con los detalles de la voz a utilizar.
             path (str): Ruta del directorio donde se guardarán los archivos temporales.
         Returns:
-            bool: True si se guardaron todos correctamente.
+            Dict[str, Any]: Resumen con la cantidad de archivos insertados, omitidos y fallidos.
         """
+        texts = {}
         for key, name in files.items():
             filename, ext = os.path.splitext(name)
             text, _ = os.path.splitext(key)
+            texts[filename] = (text, os.path.join(path, f"{filename}{ext}"))
+
+        existing = self.services.db_service.get_existing_hashes(list(texts))
+        for audio_hash in existing:
+            self._delete_temp_file(texts[audio_hash][1])
+
+        pending = [(audio_path, audio_hash) for audio_hash, (_, audio_path) in texts.items() if audio_hash not in existing]
+        uploaded, errors = self.services.s3_service.upload_many(pending)
+        for audio_path, _ in pending:
+            self._delete_temp_file(audio_path)
+
+        rows = [
+            (texts[audio_hash][0].lower(), texts[audio_hash][0].lower(), model.id, file_url, audio_hash)
+            for audio_hash, file_url in uploaded.items()
+        ]
+        summary = self.services.db_service.save_generated_audios(rows)
+
+        return {
+            'inserted': summary['inserted'],
+            'skipped': len(existing) + summary['skipped'],
+            'failed': len(errors) + summary['failed'],
+            'errors': errors,
+        }
+
+    def save_zip_members(self, zip_file: Union[str, BinaryIO], files: Dict[str, str], model: InformationModel) -> Dict[str, Any]:
+        """
+        Sube a S3 los archivos de un ZIP directamente desde el archivo comprimido y los registra en la base de datos.
+        Cada archivo se descomprime por bloques hacia una carga (multiparte si es grande) sin escribirse en disco,
+        por lo que la memoria usada no crece con el tamaño del ZIP.
+
+        Args:
+            zip_file (Union[str, BinaryIO]): Ruta del ZIP o el archivo abierto (por ejemplo el que retorna `ZipService.check_upload`).
+            files (Dict[str, str]): Diccionario con {nombre_original: nuevo_nombre}.
+            model (InformationModel): Modelo con los detalles de la voz a utilizar.
+        Returns:
+            Dict[str, Any]: Resumen con la cantidad de archivos insertados, omitidos y fallidos.
+        """
+        members = {}
+        for key, name in files.items():
+            filename, _ = os.path.splitext(name)
+            text, _ = os.path.splitext(key)
+            members[filename] = (text, key)
+
+        existing = self.services.db_service.get_existing_hashes(list(members))
 
-            audio_path = os.path.join(path, f"{filename}{ext}")
-            if self._audio_exists(filename):
-                self._delete_temp_file(audio_path)
-                continue
+        with zipfile.ZipFile(zip_file) as zip_ref:
+            pending = [
+                (functools.partial(zip_ref.open, member_name), audio_hash)
+                for audio_hash, (_, member_name) in members.items() if audio_hash not in existing
+            ]
+            uploaded, errors = self.services.s3_service.upload_many(pending)
 
-            request = TextToSpeechRequestById(read=text, text=text)
-            self._upload_and_save(request, model, audio_path, filename)
+        rows = [
+            (members[audio_hash][0].lower(), members[audio_hash][0].lower(), model.id, file_url, audio_hash)
+            for audio_hash, file_url in uploaded.items()
+        ]
+        summary = self.services.db_service.save_generated_audios(rows)
 
-        return True
+        return {
+            'inserted': summary['inserted'],
+            'skipped': len(existing) + summary['skipped'],
+            'failed': len(errors) + summary['failed'],
+            'errors': errors,
+        }
 
     def _delete_temp_file(self, file_path: str) -> None:
         """
@@ -161,17 +749,6 @@ class TTSService(YamlLoaderMixin):
         except Exception as e:
             print(f"Advertencia: No se pudo eliminar el archivo temporal {file_path}: {e}")
 
-    def _audio_exists(self, audio_hash: str) -> bool:
-        """
-        Verifica si un archivo de audio ya existe en la base de datos.
-
-        Args:
-            audio_hash (str): Hash único del audio a verificar.
-        Returns:
-            bool: True si el audio existe, False en caso contrario.
-        """
-        return self.services.db_service.get_audio_by_hash(audio_hash) is not None
-    
     # Guarda un archivo de audio y lo registra en la base de datos.
     def _upload_and_save(self, request: TextToSpeechRequestById, model: InformationModel, file_path: str, audio_hash: str) -> str:
         """
@@ -190,6 +767,22 @@ class TTSService(YamlLoaderMixin):
         audio_file_url = self.services.s3_service.upload_audio(str(file_path), audio_hash)
         self._delete_temp_file(file_path)
 
+        return self._save_record(request, model, audio_file_url, audio_hash)
+
+    def _save_record(self, request: TextToSpeechRequestById, model: InformationModel, audio_file_url: str, audio_hash: str) -> str:
+        """
+        Registra en la base de datos un audio ya subido a S3.
+        
+        Args:
+            request (TextToSpeechRequestById): Objeto de solicitud que contiene el texto a procesar.
+            model (InformationModel): Modelo de información con los detalles de la voz a utilizar.
+            audio_file_url (str): URL del audio en S3.
+            audio_hash (str): Hash único del audio.
+        Returns:
+            str: La URL del archivo de audio generado.
+        Raises:
+            ValueError: Si ocurre un error al guardar el registro en la base de datos.
+        """
         if not self.services.db_service.save_generated_audio(
             request, model, file_url=audio_file_url, audio_hash=audio_hash
         ):
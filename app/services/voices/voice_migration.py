@@ -0,0 +1,255 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from app.models.information_model import InformationModel
+from app.models.tts_model import TextToSpeechRequestById
+from app.services.container_service import ServiceContainer
+from app.services.tts.provider_governor import PRIORITY_BATCH
+from app.services.tts.tts_service import TTSService
+from app.utils.text_canonicalizer import TextCanonicalizer
+from app.utils.yaml_loader import YamlLoaderMixin
+
+OUTPUT_DIR = "app/resources/audios"
+
+class VoiceMigration:
+    """
+    Vuelve a sintetizar con un modelo de voz nuevo todos los audios generados con otro modelo.
+
+    Las filas del modelo de origen se leen en orden de id con cursores sin buffer (la estimación
+    recorre todo con uno solo; la migración abre uno por bloque) y se procesan por bloques: los textos
+    repetidos se descartan, los que ya tienen audio con el modelo destino (por su hash) se omiten, y el
+    resto se sintetiza con prioridad de lote y a lo sumo `concurrency` solicitudes simultáneas. Tras cada
+    bloque se guarda el último id procesado en el archivo de checkpoint, de modo que una migración
+    interrumpida continúa donde quedó.
+
+    Los textos de `generated_audios` se guardan en minúsculas, por lo que se sintetizan así.
+    """
+
+    def __init__(self, services: ServiceContainer, source: InformationModel, target: InformationModel,
+                 tts_service: Optional[TTSService] = None, batch_size: int = 1000, concurrency: int = 8,
+                 checkpoint_path: Optional[str] = None, canonicalizer: Optional[TextCanonicalizer] = None):
+        """
+        Args:
+            services (ServiceContainer): Contenedor de servicios.
+            source (InformationModel): Modelo de voz que se retira.
+            target (InformationModel): Modelo de voz con el que se vuelven a generar los audios.
+            tts_service (Optional[TTSService]): Servicio de síntesis; no se necesita para estimar el costo.
+            batch_size (int): Filas por bloque (consulta de existencia y checkpoint).
+            concurrency (int): Síntesis simultáneas.
+            checkpoint_path (Optional[str]): Archivo JSON con el avance, None para no guardarlo.
+            canonicalizer (Optional[TextCanonicalizer]): Canonicalización con que se calculan los hashes destino;
+                por defecto la del servicio de síntesis.
+        """
+        self.services = services
+        self.source = source
+        self.target = target
+        self.tts_service = tts_service
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.checkpoint_path = checkpoint_path
+        self.canonicalizer = canonicalizer or (tts_service.canonicalizer if tts_service else None)
+        # Hashes destino ya vistos en esta ejecución (textos repetidos dentro del modelo de origen)
+        self._seen: Set[str] = set()
+
+    def _batches(self, after_id: int) -> Iterator[List[Tuple[int, str, str]]]:
+        """Agrupa las filas del modelo de origen, leídas con un solo cursor, en bloques de `batch_size`"""
+        batch = []
+        for row in self.services.db_service.iter_audios_by_model(self.source.id, after_id):
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _next_batch(self, after_id: int) -> List[Tuple[int, str, str]]:
+        """
+        Lee el siguiente bloque con una consulta propia. Mientras se sintetiza un bloque pueden pasar
+        minutos sin leer filas, más que el `net_write_timeout` con que MySQL cierra un resultado abierto.
+        """
+        return list(self.services.db_service.iter_audios_by_model(self.source.id, after_id, limit=self.batch_size))
+
+    def _pending(self, batch: List[Tuple[int, str, str]], summary: Dict[str, Any]) -> List[Tuple[int, str, str, str]]:
+        """
+        Filtra un bloque dejando solo los textos únicos que aún no tienen audio con el modelo destino.
+        Returns:
+            List[Tuple[int, str, str, str]]: Filas (id, original_text, input_text, hash destino).
+        """
+        unique = []
+        for row_id, original_text, input_text in batch:
+            audio_hash = TTSService.build_audio_hash(input_text, self.target, self.canonicalizer)
+            if audio_hash in self._seen:
+                summary['duplicates'] += 1
+                continue
+            self._seen.add(audio_hash)
+            unique.append((row_id, original_text, input_text, audio_hash))
+
+        existing = self.services.db_service.get_existing_hashes([row[3] for row in unique])
+        summary['existing'] += len(existing)
+        return [row for row in unique if row[3] not in existing]
+
+    def _load_checkpoint(self) -> Dict[str, Any]:
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, 'r') as file:
+                checkpoint = json.load(file)
+            if checkpoint.get('source_id') == self.source.id and checkpoint.get('target_id') == self.target.id:
+                return checkpoint
+            print(f"El checkpoint {self.checkpoint_path} corresponde a otra migración, se ignora")
+        return {}
+
+    def _save_checkpoint(self, last_id: int, summary: Dict[str, Any]) -> None:
+        """Guarda el avance reemplazando el archivo de forma atómica"""
+        if not self.checkpoint_path:
+            return
+        os.makedirs(os.path.dirname(self.checkpoint_path) or '.', exist_ok=True)
+        temp_path = f"{self.checkpoint_path}.tmp"
+        with open(temp_path, 'w') as file:
+            json.dump({'source_id': self.source.id, 'target_id': self.target.id, 'last_id': last_id, 'summary': summary}, file)
+        os.replace(temp_path, self.checkpoint_path)
+
+    @staticmethod
+    def _new_summary() -> Dict[str, Any]:
+        return {'rows': 0, 'duplicates': 0, 'existing': 0, 'pending': 0, 'characters': 0,
+                'synthesized': 0, 'failed': 0, 'failed_ids': []}
+
+    def estimate(self, cost_per_million_chars: Optional[float]) -> Dict[str, Any]:
+        """
+        Recorre la migración sin sintetizar nada y estima su costo.
+        Args:
+            cost_per_million_chars (Optional[float]): Precio del proveedor destino por millón de caracteres.
+        Returns:
+            Dict[str, Any]: Filas, duplicados, existentes, textos y caracteres a sintetizar, y costo estimado.
+        """
+        summary = self._new_summary()
+        for batch in self._batches(self._load_checkpoint().get('last_id', 0)):
+            summary['rows'] += len(batch)
+            pending = self._pending(batch, summary)
+            summary['pending'] += len(pending)
+            summary['characters'] += sum(len(row[2]) for row in pending)
+
+        return {
+            'source_id': self.source.id,
+            'target_id': self.target.id,
+            'provider': self.target.platform,
+            'rows': summary['rows'],
+            'duplicates': summary['duplicates'],
+            'existing': summary['existing'],
+            'to_synthesize': summary['pending'],
+            'characters': summary['characters'],
+            'cost_per_million_chars': cost_per_million_chars,
+            'estimated_cost': round(summary['characters'] * cost_per_million_chars / 1_000_000, 2)
+                              if cost_per_million_chars is not None else None,
+        }
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Ejecuta la migración, continuando desde el checkpoint si existe.
+        Returns:
+            Dict[str, Any]: Resumen con filas leídas, duplicados, existentes, sintetizados y fallidos.
+        """
+        if self.tts_service is None:
+            raise ValueError("La migración requiere un servicio de síntesis")
+
+        checkpoint = self._load_checkpoint()
+        last_id = checkpoint.get('last_id', 0)
+        summary = dict(self._new_summary(), **checkpoint.get('summary', {}))
+        if last_id:
+            print(f"Continuando la migración desde el id {last_id}")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        started = time.perf_counter()
+        while True:
+            # La lectura de las filas y la consulta de existencia se hacen fuera del event loop
+            batch = await self.tts_service.run_blocking(self._next_batch, last_id)
+            if not batch:
+                break
+            summary['rows'] += len(batch)
+            pending = await self.tts_service.run_blocking(self._pending, batch, summary)
+            summary['pending'] += len(pending)
+            summary['characters'] += sum(len(row[2]) for row in pending)
+
+            results = await asyncio.gather(*(self._synthesize(row, semaphore) for row in pending))
+            for (row_id, _, _, _), ok in zip(pending, results):
+                if ok:
+                    summary['synthesized'] += 1
+                else:
+                    summary['failed'] += 1
+                    summary['failed_ids'].append(row_id)
+
+            last_id = batch[-1][0]
+            self._save_checkpoint(last_id, summary)
+            print(f"Migración {self.source.id} -> {self.target.id}: {summary['rows']} filas, "
+                  f"{summary['synthesized']} sintetizados, {summary['failed']} fallidos "
+                  f"({time.perf_counter() - started:.1f}s)")
+
+        return summary
+
+    async def _synthesize(self, row: Tuple[int, str, str, str], semaphore: asyncio.Semaphore) -> bool:
+        """Sintetiza un texto con el modelo destino; retorna False si falla"""
+        row_id, original_text, input_text, _ = row
+        async with semaphore:
+            try:
+                request = TextToSpeechRequestById(read=input_text, text=original_text)
+                await self.tts_service.generate_audio_from_text_async(request, self.target, PRIORITY_BATCH)
+                return True
+            except Exception as e:
+                print(f"Error al sintetizar la fila {row_id}: {e}")
+                return False
+
+def _resolve_models(services: ServiceContainer, source_id: int, target_id: int) -> Tuple[InformationModel, InformationModel]:
+    services.voice_registry.refresh()
+    source = services.voice_registry.get_by_id(source_id)
+    target = services.voice_registry.get_by_id(target_id)
+    if source is None or target is None:
+        raise ValueError(f"Modelo con el id:{source_id if source is None else target_id} no encontrado")
+    if source.id == target.id:
+        raise ValueError("El modelo de origen y el de destino deben ser distintos")
+    return source, target
+
+async def _migrate(config: Dict[str, Any], args: argparse.Namespace) -> Dict[str, Any]:
+    services = ServiceContainer(
+        output_dir=OUTPUT_DIR,
+        aws_config=config['aws'],
+        db_config=config['db']['mysql'],
+        cache_config=config['db']['cache']
+    )
+    try:
+        source, target = _resolve_models(services, args.source, args.target)
+        if args.dry_run:
+            provider_config = config['api']['tts_providers'].get(target.platform, {})
+            migration = VoiceMigration(
+                services, source, target, batch_size=args.batch_size, checkpoint_path=args.checkpoint,
+                canonicalizer=TextCanonicalizer.from_config(config['api'].get('canonicalization'))
+            )
+            return await asyncio.get_running_loop().run_in_executor(
+                None, migration.estimate, provider_config.get('cost_per_million_chars')
+            )
+
+        tts_service = TTSService(services)
+        try:
+            migration = VoiceMigration(services, source, target, tts_service, args.batch_size, args.concurrency, args.checkpoint)
+            return await migration.run()
+        finally:
+            tts_service.executor.shutdown(wait=False)
+            for provider in tts_service.providers.values():
+                provider.close()
+    finally:
+        services.db_service.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Vuelve a generar los audios de un modelo de voz con otro modelo")
+    parser.add_argument('--source', type=int, required=True, help="Id del modelo de voz que se retira")
+    parser.add_argument('--target', type=int, required=True, help="Id del modelo de voz nuevo")
+    parser.add_argument('--dry-run', action='store_true', help="Solo estima los textos, caracteres y costo")
+    parser.add_argument('--concurrency', type=int, default=8, help="Síntesis simultáneas")
+    parser.add_argument('--batch-size', type=int, default=1000, help="Filas por bloque")
+    parser.add_argument('--checkpoint', default=None, help="Archivo de avance (por defecto app/resources/jobs/migration_<origen>_<destino>.json)")
+    args = parser.parse_args()
+    args.checkpoint = args.checkpoint or f"app/resources/jobs/migration_{args.source}_{args.target}.json"
+
+    result = asyncio.run(_migrate(YamlLoaderMixin().load_yaml('config.yaml'), args))
+    print(json.dumps(result, indent=2, ensure_ascii=False))
@@ -0,0 +1,140 @@
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.models.information_model import InformationModel
+from app.services.database.db_service import DBService
+
+def _key(value) -> str:
+    """Normaliza un valor (incluidos los Enum de los requests) para usarlo como llave de índice"""
+    return str(getattr(value, 'value', value))
+
+class VoiceRegistry:
+    """
+    Registro en memoria de los modelos de voz con índices para cada forma de búsqueda.
+
+    Las búsquedas por id, por (idioma, nombre) y por (idioma, género, tipo) son O(1). Cada recarga lee
+    `information_audios` (una tabla pequeña) y compara cada fila con el modelo en memoria: se agregan los
+    nuevos, se reemplazan los editados (modelo, plataforma, metadata, etc.) y se quitan los eliminados,
+    por lo que los cambios hechos desde otro worker aparecen sin reiniciar el servicio.
+    """
+
+    def __init__(self, db_service: DBService, min_refresh_interval: float = 5.0):
+        """
+        Args:
+            db_service (DBService): Servicio de base de datos.
+            min_refresh_interval (float): Segundos mínimos entre recargas disparadas por búsquedas fallidas.
+        """
+        self.db_service = db_service
+        self.min_refresh_interval = min_refresh_interval
+        self._lock = threading.RLock()
+        self._by_id: Dict[int, InformationModel] = {}
+        self._by_name: Dict[Tuple[str, str], InformationModel] = {}
+        self._by_traits: Dict[Tuple[str, str, str], InformationModel] = {}
+        self._by_voice_name: Dict[str, InformationModel] = {}
+        self._last_refresh = 0.0
+
+    def add(self, model: InformationModel) -> None:
+        """
+        Agrega o reemplaza un modelo en todos los índices.
+        Args:
+            model (InformationModel): Modelo a agregar.
+        """
+        with self._lock:
+            previous = self._by_id.get(model.id)
+            if previous is not None:
+                self._remove(previous)
+
+            self._by_id[model.id] = model
+            self._by_name[(_key(model.language), _key(model.voice_name))] = model
+            # Para (idioma, género, tipo) se conserva el modelo de menor id, como en la búsqueda lineal anterior
+            self._set_first(self._by_traits, (_key(model.language), _key(model.gender), _key(model.type)), model)
+            self._set_first(self._by_voice_name, _key(model.voice_name), model)
+
+    @staticmethod
+    def _set_first(index: dict, key, model: InformationModel) -> None:
+        """Registra el modelo en el índice si la llave está libre o si su id es menor que el registrado"""
+        current = index.get(key)
+        if current is None or model.id < current.id:
+            index[key] = model
+
+    def remove(self, model_id: int) -> None:
+        """
+        Quita un modelo de todos los índices.
+        Args:
+            model_id (int): Id del modelo a quitar.
+        """
+        with self._lock:
+            model = self._by_id.pop(model_id, None)
+            if model is not None:
+                self._remove(model)
+
+    def _remove(self, model: InformationModel) -> None:
+        """Elimina un modelo de los índices secundarios"""
+        self._by_name.pop((_key(model.language), _key(model.voice_name)), None)
+        traits = (_key(model.language), _key(model.gender), _key(model.type))
+        if self._by_traits.get(traits) is model:
+            del self._by_traits[traits]
+            replacement = min((m for m in self._by_id.values() if m is not model and
+                               (_key(m.language), _key(m.gender), _key(m.type)) == traits),
+                              key=lambda m: m.id, default=None)
+            if replacement is not None:
+                self._by_traits[traits] = replacement
+        if self._by_voice_name.get(_key(model.voice_name)) is model:
+            del self._by_voice_name[_key(model.voice_name)]
+
+    def refresh(self, force: bool = True) -> int:
+        """
+        Sincroniza el registro con la base de datos: agrega los modelos nuevos, reemplaza los que
+        cambiaron y quita los eliminados.
+        Args:
+            force (bool): Si es False, no recarga si la última recarga fue hace menos de `min_refresh_interval`.
+        Returns:
+            int: Cantidad de modelos agregados, modificados o eliminados.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_refresh < self.min_refresh_interval:
+                return 0
+            self._last_refresh = now
+
+        models = self.db_service.get_models()
+        if models is None:
+            # Error de base de datos: se conserva el registro actual
+            return 0
+
+        changes = 0
+        with self._lock:
+            loaded = {model.id: model for model in models}
+            for model_id in [model_id for model_id in self._by_id if model_id not in loaded]:
+                self.remove(model_id)
+                changes += 1
+            for model in models:
+                if self._by_id.get(model.id) != model:
+                    self.add(model)
+                    changes += 1
+        return changes
+
+    def get_by_id(self, model_id: int) -> Optional[InformationModel]:
+        """Busca un modelo por su id"""
+        return self._by_id.get(model_id)
+
+    def get_by_name(self, language: str, voice_name: str) -> Optional[InformationModel]:
+        """Busca un modelo por idioma y nombre de la voz"""
+        return self._by_name.get((_key(language), _key(voice_name)))
+
+    def get_by_traits(self, language: str, gender: str, voice_type: str) -> Optional[InformationModel]:
+        """Busca el primer modelo registrado para un idioma, género y tipo"""
+        return self._by_traits.get((_key(language), _key(gender), _key(voice_type)))
+
+    def exists_voice_name(self, voice_name: str) -> bool:
+        """Indica si ya existe un modelo con el nombre de voz indicado"""
+        return _key(voice_name) in self._by_voice_name
+
+    def all(self) -> List[InformationModel]:
+        """Retorna todos los modelos ordenados por id"""
+        with self._lock:
+            return [self._by_id[model_id] for model_id in sorted(self._by_id)]
+
+    def __len__(self) -> int:
+        return len(self._by_id)
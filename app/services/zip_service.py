@@ -1,8 +1,8 @@
 import os
-import io
+import shutil
+import tempfile
 import zipfile
-from fastapi import UploadFile
-from typing import Dict, List
+from typing import BinaryIO, Callable, Dict, List, Optional, Union
 
 from app.models.information_model import InformationModel
 from app.services.storage.file_service import FileService
@@ -10,25 +10,58 @@ from app.services.storage.file_service import FileService
 class ZipService:
     UPLOAD_DIR = "app/resources/uploads"
     ALLOWED_EXTENSIONS = {'.mp3'}
+    CHUNK_SIZE = 1024 * 1024
 
-    async def validate_zip_file(self, zip: UploadFile) -> bool:
+    def __init__(self, zip_config: Optional[dict] = None):
+        """
+        Inicializa el servicio de archivos ZIP.
+
+        Args:
+            zip_config (Optional[dict]): Configuración de la carga de ZIP (`api.zip`).
+        """
+        zip_config = zip_config or {}
+        self.max_size = zip_config.get('max_size_mb', 4096) * 1024 * 1024
+        self.chunk_size = zip_config.get('chunk_size_kb', self.CHUNK_SIZE // 1024) * 1024
+
+    def check_upload(self, source: BinaryIO) -> BinaryIO:
+        """
+        Verifica el tamaño del archivo recibido sin copiarlo y retorna un archivo que `zipfile` pueda leer.
+        `UploadFile.file` es un `SpooledTemporaryFile`: se pasa a disco con `rollover` (solo copia lo que
+        aún estaba en memoria) y se usa el archivo temporal subyacente, ya que antes de Python 3.11
+        `SpooledTemporaryFile` no implementa `seekable`, que `zipfile` necesita para abrir cada archivo.
+
+        Args:
+            source (BinaryIO): Archivo recibido (por ejemplo `UploadFile.file`).
+        Returns:
+            BinaryIO: Archivo en disco (o el mismo archivo si no es un `SpooledTemporaryFile`), posicionado al inicio.
+        Raises:
+            ValueError: Si el archivo supera el tamaño máximo permitido.
+        """
+        if isinstance(source, tempfile.SpooledTemporaryFile):
+            source.rollover()
+            source = source._file
+
+        source.seek(0, os.SEEK_END)
+        size = source.tell()
+        source.seek(0)
+        if size > self.max_size:
+            raise ValueError(f"El archivo ZIP supera el tamaño máximo de {self.max_size // (1024 * 1024)} MB")
+        return source
+
+    def validate_zip_file(self, zip_file: Union[str, BinaryIO]) -> List[str]:
         """
         Valida que el archivo ZIP no este vacio y que su contenido sean audios con extensiones permitidas.
+        Solo se lee el directorio central del ZIP; los archivos no se descomprimen.
 
         Args:
-            zip (UploadFile): Archivo zip.
+            zip_file (Union[str, BinaryIO]): Ruta del archivo zip o el archivo abierto.
         Returns:
-            bool: True si el archivo es un ZIP válido, en caso contrario lanza una excepción ValueError
+            List[str]: Nombres de los archivos contenidos en el ZIP.
         Raises:
             ValueError: Si el archivo no es un ZIP válido o si contiene archivos con extensiones no permitidas.
         """
         try:
-            # Leer el contenido del archivo
-            content = await zip.read()
-            # Crear un objeto BytesIO para trabajar con el contenido en memoria
-            zip_bytes = io.BytesIO(content)
-
-            with zipfile.ZipFile(zip_bytes) as zip_ref:
+            with zipfile.ZipFile(zip_file) as zip_ref:
                 file_list = zip_ref.namelist()
                 
                 # Verificar que el ZIP no esté vacío
@@ -41,64 +74,59 @@ class ZipService:
                     if ext not in self.ALLOWED_EXTENSIONS:
                         raise ValueError(f"Extensión no permitida: {ext}")
 
-            # Resetear el archivo para futuras lecturas
-            await zip.seek(0) 
-            return True
+            return file_list
                 
         except zipfile.BadZipFile:
             raise ValueError("El archivo no es un ZIP válido")
         
-    async def extract_zip(self, zip:UploadFile, model:InformationModel) -> List[str]:
+    def extract_zip(self, zip_file: Union[str, BinaryIO], renamed_files: Dict[str, str]) -> Dict[str, str]:
         """
-        Extrae los archivos de un ZIP y los renombra según el modelo de voz.
+        Extrae los archivos de un ZIP en `UPLOAD_DIR` con sus nuevos nombres.
+        Cada archivo se copia por bloques, por lo que la memoria usada no depende de su tamaño.
 
         Args:
-            zip (UploadFile): Archivo ZIP a extraer.
-            model (InformationModel): Modelo de voz para renombrar los archivos.
+            zip_file (Union[str, BinaryIO]): Ruta del archivo ZIP o el archivo abierto.
+            renamed_files (Dict[str, str]): Diccionario con {nombre_original: nuevo_nombre}.
         Returns:
-            List[str]: Lista de nombres de archivos extraídos.
+            Dict[str, str]: Diccionario con {nombre_original: nuevo_nombre} de los archivos extraídos.
         Raises:
-            ValueError: Si hay un error al extraer el ZIP o si no se encuentra el modelo.
+            ValueError: Si hay un error al extraer el ZIP.
         """
         try:
             os.makedirs(self.UPLOAD_DIR, exist_ok=True)
 
-            content = await zip.read()
-            zip_bytes = io.BytesIO(content)
-
-            with zipfile.ZipFile(zip_bytes) as zip_ref:
-                # Obtener la lista de archivos y generar nuevos nombres
-                file_list = zip_ref.namelist()
-                renamed_files = self._rename_files(file_list, model)
-                
-                # Extraer los archivos con los nuevos nombres
+            with zipfile.ZipFile(zip_file) as zip_ref:
                 for old_name, new_name in renamed_files.items():
-                    with zip_ref.open(old_name) as source:
-                        content = source.read()
-                        target_path = os.path.join(self.UPLOAD_DIR, new_name)
-                        with open(target_path, 'wb') as target:
-                            target.write(content)
+                    target_path = os.path.join(self.UPLOAD_DIR, new_name)
+                    with zip_ref.open(old_name) as source, open(target_path, 'wb') as target:
+                        shutil.copyfileobj(source, target, self.chunk_size)
 
-                return renamed_files
+            return renamed_files
 
         except Exception as e:
             raise ValueError(f"Error al extraer el ZIP: {str(e)}")
         
-    def _rename_files(self, file_list: List[str], model:InformationModel) -> Dict[str, str]:
+    def rename_files(self, file_list: List[str], model:InformationModel,
+                     hash_builder: Optional[Callable[[str, InformationModel], str]] = None) -> Dict[str, str]:
         """
         Genera nuevos nombres para los archivos del ZIP.
         
         Args:
             file_list (List[str]): Lista de nombres originales
             model (InformationModel): Modelo para nombrar los archivos
+            hash_builder (Optional[Callable[[str, InformationModel], str]]): Calcula el hash del audio de un texto,
+                para que coincida con el de las síntesis (por ejemplo `TTSService.hash_text`)
         Returns:
             Dict[str, str]: Diccionario con {nombre_original: nuevo_nombre}
         """
         renamed_files = {}
         for original_name in file_list:
             filename, ext = os.path.splitext(original_name)
-            audio_name = filename + model.language[:2] + str(model.id) + model.voice_name + model.gender
-            new_name = f"{FileService.generate_hash(audio_name.lower())}{ext}";
+            if hash_builder is not None:
+                new_name = f"{hash_builder(filename, model)}{ext}"
+            else:
+                audio_name = filename + model.language[:2] + str(model.id) + model.voice_name + model.gender
+                new_name = f"{FileService.generate_hash(audio_name.lower())}{ext}";
             renamed_files[original_name] = new_name
             
-        return renamed_files
\ No newline at end of file
+        return renamed_files
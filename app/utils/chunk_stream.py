@@ -0,0 +1,35 @@
+import io
+from typing import Iterable, Iterator
+
+class ChunkStream(io.RawIOBase):
+    """
+    Objeto tipo archivo de solo lectura sobre un iterador de bloques de bytes.
+
+    Permite entregar la respuesta de un proveedor (`response.iter_content`) a funciones que
+    esperan un archivo, como `upload_fileobj` de boto3, sin escribirla en disco.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        """
+        Args:
+            chunks (Iterable[bytes]): Bloques de bytes a leer en orden.
+        """
+        self._chunks: Iterator[bytes] = iter(chunks)
+        self._pending = b''
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            try:
+                self._pending = next(self._chunks)
+            except StopIteration:
+                return 0
+
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        self.bytes_read += size
+        return size
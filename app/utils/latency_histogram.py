@@ -0,0 +1,73 @@
+import bisect
+import threading
+from collections import deque
+from typing import Any, Dict, Optional, Sequence
+
+DEFAULT_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+class LatencyHistogram:
+    """
+    Histograma de latencias con cubetas fijas y una ventana de las últimas muestras.
+
+    Las cubetas acumulan todas las observaciones con memoria constante; los percentiles
+    se calculan sobre la ventana, de modo que reflejan el comportamiento reciente.
+    """
+
+    def __init__(self, buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS, window: int = 1024):
+        """
+        Args:
+            buckets_ms (Sequence[float]): Límites superiores de las cubetas en milisegundos.
+            window (int): Cantidad de muestras recientes usadas para los percentiles.
+        """
+        self.buckets_ms = tuple(sorted(buckets_ms))
+        self._counts = [0] * (len(self.buckets_ms) + 1)
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._count = 0
+        self._total_ms = 0.0
+        self._max_ms = 0.0
+
+    def observe(self, elapsed_ms: float) -> None:
+        """Registra una latencia en milisegundos"""
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets_ms, elapsed_ms)] += 1
+            self._recent.append(elapsed_ms)
+            self._count += 1
+            self._total_ms += elapsed_ms
+            self._max_ms = max(self._max_ms, elapsed_ms)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """
+        Calcula un percentil sobre las muestras recientes.
+        Args:
+            percent (float): Percentil entre 0 y 100.
+        Returns:
+            Optional[float]: Latencia en milisegundos, None si no hay muestras.
+        """
+        with self._lock:
+            samples = sorted(self._recent)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(percent / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = list(self._counts)
+            count = self._count
+            total_ms = self._total_ms
+            max_ms = self._max_ms
+
+        labels = [f"le_{bound}" for bound in self.buckets_ms] + ['inf']
+        return {
+            'count': count,
+            'avg_ms': round(total_ms / count, 2) if count else None,
+            'max_ms': round(max_ms, 2),
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'buckets': dict(zip(labels, counts)),
+        }
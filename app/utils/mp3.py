@@ -0,0 +1,81 @@
+from typing import Optional
+
+# Bitrates (kbps) de MPEG Layer III por índice: MPEG-1 y MPEG-2/2.5
+BITRATES_V1 = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+BITRATES_V2 = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+# Frecuencias de muestreo por versión (bits de versión del encabezado)
+SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+ID3V1_SIZE = 128
+
+def strip_id3(data: bytes) -> bytes:
+    """
+    Elimina las etiquetas ID3v2 del inicio y ID3v1 del final de un MP3.
+    Args:
+        data (bytes): Contenido del archivo MP3.
+    Returns:
+        bytes: Solo las tramas de audio.
+    """
+    start = 0
+    # ID3v2 puede repetirse (por ejemplo, al concatenar archivos ya etiquetados)
+    while data[start:start + 3] == b'ID3' and len(data) >= start + 10:
+        header = data[start:start + 10]
+        size = (header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9]
+        has_footer = header[5] & 0x10
+        start += 10 + size + (10 if has_footer else 0)
+
+    end = len(data)
+    if end - start >= ID3V1_SIZE and data[end - ID3V1_SIZE:end - ID3V1_SIZE + 3] == b'TAG':
+        end -= ID3V1_SIZE
+    return data[start:end]
+
+def frame_length(header: bytes) -> Optional[int]:
+    """
+    Calcula el tamaño de una trama MPEG Layer III a partir de sus 4 bytes de encabezado.
+    Args:
+        header (bytes): Encabezado de la trama.
+    Returns:
+        Optional[int]: Tamaño en bytes, None si el encabezado no es válido.
+    """
+    if len(header) < 4 or header[0] != 0xFF or (header[1] & 0xE0) != 0xE0:
+        return None
+    version = (header[1] >> 3) & 0x03
+    layer = (header[1] >> 1) & 0x03
+    bitrate_index = header[2] >> 4
+    sample_rate_index = (header[2] >> 2) & 0x03
+    padding = (header[2] >> 1) & 0x01
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    bitrate = (BITRATES_V1 if version == 3 else BITRATES_V2)[bitrate_index] * 1000
+    sample_rate = SAMPLE_RATES[version][sample_rate_index]
+    coefficient = 144 if version == 3 else 72
+    return coefficient * bitrate // sample_rate + padding
+
+def strip_info_frame(data: bytes) -> bytes:
+    """
+    Elimina la trama inicial Xing/Info/VBRI que declara la duración del archivo, ya que al
+    concatenar varios MP3 haría que los reproductores calcularan mal la duración total.
+    Args:
+        data (bytes): Tramas de audio (sin etiquetas ID3).
+    Returns:
+        bytes: Tramas de audio sin la trama informativa.
+    """
+    length = frame_length(data[:4])
+    if length is None:
+        return data
+    first_frame = data[:length]
+    if b'Xing' in first_frame[:64] or b'Info' in first_frame[:64] or b'VBRI' in first_frame[:64]:
+        return data[length:]
+    return data
+
+def audio_frames(data: bytes) -> bytes:
+    """
+    Retorna solo las tramas de audio de un MP3, listas para concatenarse con las de otros
+    archivos del mismo formato sin volver a codificar.
+    Args:
+        data (bytes): Contenido del archivo MP3.
+    Returns:
+        bytes: Tramas de audio.
+    """
+    return strip_info_frame(strip_id3(data))
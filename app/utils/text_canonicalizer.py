@@ -0,0 +1,140 @@
+import re
+import unicodedata
+from typing import Any, Dict, Optional
+
+# Variantes tipográficas que se leen igual que su forma simple
+TYPOGRAPHIC = str.maketrans({
+    '‘': "'", '’': "'", '‚': "'", '‛': "'", '´': "'",
+    '“': '"', '”': '"', '„': '"', '‟': '"', '«': '"', '»': '"',
+    '–': '-', '—': '-', '―': '-', '‐': '-', '‑': '-',
+    '…': '...',
+})
+# Caracteres de ancho cero que no se pronuncian
+INVISIBLE = re.compile(r'[\u200b\u200c\u200d\u2060\ufeff]')
+WHITESPACE = re.compile(r'\s+')
+# Signos de cierre que no llevan espacio antes y de apertura que no lo llevan después
+SPACE_BEFORE_CLOSING = re.compile(r'\s+([.,;:!?)])')
+SPACE_AFTER_OPENING = re.compile(r'([¿¡(])\s+')
+REPEATED_MARKS = re.compile(r'([,;:!?¡¿])\1+')
+ELLIPSIS = re.compile(r'\.{3,}')
+DOUBLE_PERIOD = re.compile(r'(?<!\.)\.\.(?!\.)')
+TRAILING_PAUSE = re.compile(r'[,;:\s]+$')
+
+TERMINAL_MARKS = ('.', '!', '?')
+PUNCTUATION_MODES = ('keep', 'prosodic', 'drop')
+
+DEFAULT_RULES = {
+    'lowercase': True,
+    # "prosodic": conserva solo los signos que cambian la entonación; "keep": todos; "drop": ninguno
+    'punctuation': 'prosodic',
+    'prosodic_marks': ".,;:!?¡¿",
+    # Signos que se conservan dentro de las palabras (e-mail, l'amour) en el modo "prosodic"
+    'word_marks': "-'",
+    'terminal': '.',
+}
+
+class TextCanonicalizer:
+    """
+    Lleva los textos a una forma canónica antes de calcular su hash y de enviarlos al proveedor,
+    de modo que variantes que producen el mismo audio ("Hola", "hola." y "  hola ") comparten la
+    misma llave de caché y una sola llamada pagada al proveedor.
+
+    Aplica normalización Unicode NFC, unifica comillas, guiones y puntos suspensivos tipográficos,
+    colapsa los espacios y, según las reglas del idioma, pasa a minúsculas y filtra la puntuación.
+    Los documentos SSML solo se normalizan (NFC y espacios), ya que sus etiquetas deben conservarse.
+    La transformación es idempotente.
+    """
+
+    def __init__(self, default_rules: Optional[Dict[str, Any]] = None, language_rules: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Args:
+            default_rules (Optional[Dict[str, Any]]): Reglas para todos los idiomas.
+            language_rules (Optional[Dict[str, Dict[str, Any]]]): Reglas por código de idioma de dos letras,
+                que reemplazan a las generales.
+        Raises:
+            ValueError: Si un modo de puntuación no es válido.
+        """
+        self.default_rules = dict(DEFAULT_RULES, **(default_rules or {}))
+        self.language_rules = {
+            language.lower(): dict(self.default_rules, **(rules or {}))
+            for language, rules in (language_rules or {}).items()
+        }
+        for rules in [self.default_rules, *self.language_rules.values()]:
+            if rules['punctuation'] not in PUNCTUATION_MODES:
+                raise ValueError(f"Modo de puntuación no válido: {rules['punctuation']}")
+
+    @classmethod
+    def from_config(cls, config: Optional[dict]) -> Optional["TextCanonicalizer"]:
+        """
+        Crea el canonicalizador a partir de la sección `api.canonicalization`.
+        Args:
+            config (Optional[dict]): Configuración de la canonicalización.
+        Returns:
+            Optional[TextCanonicalizer]: Canonicalizador, None si está desactivado.
+        """
+        if not config or not config.get('enabled'):
+            return None
+        return cls(config.get('default'), config.get('languages'))
+
+    def rules_for(self, language: str) -> Dict[str, Any]:
+        """Reglas del idioma (por ejemplo `es-ES` usa las de `es`)"""
+        return self.language_rules.get(str(language)[:2].lower(), self.default_rules)
+
+    def canonicalize(self, text: str, language: str) -> str:
+        """
+        Retorna la forma canónica de un texto.
+        Args:
+            text (str): Texto a normalizar.
+            language (str): Idioma del modelo de voz.
+        Returns:
+            str: Texto canónico.
+        """
+        text = INVISIBLE.sub('', unicodedata.normalize('NFC', text))
+        if text.lstrip().startswith('<speak'):
+            return WHITESPACE.sub(' ', text).strip()
+
+        rules = self.rules_for(language)
+        text = text.translate(TYPOGRAPHIC)
+        if rules['lowercase']:
+            text = text.lower()
+
+        mode = rules['punctuation']
+        if mode == 'drop':
+            text = ''.join(char for char in text if char.isalnum() or char.isspace())
+        elif mode == 'prosodic':
+            text = self._keep_prosodic(text, rules)
+        text = WHITESPACE.sub(' ', text).strip()
+
+        if mode != 'drop':
+            text = SPACE_BEFORE_CLOSING.sub(r'\1', text)
+            text = SPACE_AFTER_OPENING.sub(r'\1', text)
+            text = REPEATED_MARKS.sub(r'\1', text)
+            text = ELLIPSIS.sub('...', text)
+            text = DOUBLE_PERIOD.sub('.', text)
+
+        terminal = rules.get('terminal')
+        if terminal and text:
+            text = TRAILING_PAUSE.sub('', text)
+            if not text.endswith(TERMINAL_MARKS):
+                text += terminal
+        return text
+
+    @staticmethod
+    def _keep_prosodic(text: str, rules: Dict[str, Any]) -> str:
+        """
+        Conserva letras, números, espacios y los signos prosódicos; los signos de palabra solo entre
+        dos caracteres alfanuméricos. El resto de los signos se reemplaza por un espacio.
+        """
+        prosodic_marks = rules['prosodic_marks']
+        word_marks = rules['word_marks']
+        chars = []
+        last = len(text) - 1
+        for index, char in enumerate(text):
+            if char.isalnum() or char.isspace() or char in prosodic_marks:
+                chars.append(char)
+            elif (char in word_marks and 0 < index < last
+                  and text[index - 1].isalnum() and text[index + 1].isalnum()):
+                chars.append(char)
+            else:
+                chars.append(' ')
+        return ''.join(chars)
@@ -0,0 +1,100 @@
+import re
+import zlib
+from typing import List
+
+# Fin de oración: signo de cierre seguido de espacios
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?…])\s+')
+# Fin de cláusula: coma, punto y coma o dos puntos seguidos de espacios
+CLAUSE_BOUNDARY = re.compile(r'(?<=[,;:])\s+')
+WORD_BOUNDARY = re.compile(r'\s+')
+# Una de cada BOUNDARY_MODULUS oraciones (según su contenido) cierra un fragmento en `split_chunks`
+BOUNDARY_MODULUS = 3
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Divide un texto en oraciones.
+    Args:
+        text (str): Texto a dividir.
+    Returns:
+        List[str]: Oraciones sin espacios al inicio ni al final.
+    """
+    return [sentence.strip() for sentence in SENTENCE_BOUNDARY.split(text.strip()) if sentence.strip()]
+
+def _split_long(segment: str, max_chars: int) -> List[str]:
+    """Divide un fragmento más largo que `max_chars` por cláusulas, luego por palabras y como último recurso por caracteres"""
+    for boundary in (CLAUSE_BOUNDARY, WORD_BOUNDARY):
+        parts = [part for part in boundary.split(segment) if part]
+        if len(parts) > 1:
+            chunks = []
+            for part in _pack(parts, max_chars):
+                chunks.extend(_split_long(part, max_chars) if len(part) > max_chars else [part])
+            return chunks
+    return [segment[start:start + max_chars] for start in range(0, len(segment), max_chars)]
+
+def _pack(parts: List[str], max_chars: int) -> List[str]:
+    """Agrupa fragmentos consecutivos, separados por un espacio, mientras el resultado no supere `max_chars`"""
+    chunks = []
+    current = ''
+    for part in parts:
+        candidate = f"{current} {part}" if current else part
+        if current and len(candidate) > max_chars:
+            chunks.append(current)
+            current = part
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+def split_text(text: str, max_chars: int) -> List[str]:
+    """
+    Divide un texto en fragmentos de a lo sumo `max_chars` caracteres respetando los límites
+    de oración y, si una oración es demasiado larga, los de cláusula y de palabra.
+    Las oraciones consecutivas se agrupan mientras quepan en un mismo fragmento.
+    Args:
+        text (str): Texto a dividir.
+        max_chars (int): Longitud máxima de cada fragmento.
+    Returns:
+        List[str]: Fragmentos en el orden original.
+    """
+    text = text.strip()
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    segments = []
+    for sentence in split_sentences(text):
+        segments.extend(_split_long(sentence, max_chars) if len(sentence) > max_chars else [sentence])
+    return _pack(segments, max_chars)
+
+def split_chunks(text: str, max_chars: int, min_chars: int) -> List[str]:
+    """
+    Divide un texto en fragmentos de oraciones completas cuyos límites dependen del contenido.
+
+    Un fragmento termina después de una oración "de corte" (elegida por el hash de su texto) una vez
+    que alcanza `min_chars`, o antes de superar `max_chars`. Como los cortes dependen de las oraciones
+    y no de su posición, dos documentos que comparten varias oraciones seguidas producen los mismos
+    fragmentos para ese tramo, lo que permite reutilizar su audio.
+    Args:
+        text (str): Texto a dividir.
+        max_chars (int): Longitud máxima de cada fragmento.
+        min_chars (int): Longitud mínima antes de cortar en una oración de corte.
+    Returns:
+        List[str]: Fragmentos en el orden original.
+    """
+    segments = []
+    for sentence in split_sentences(text):
+        segments.extend(_split_long(sentence, max_chars) if len(sentence) > max_chars else [sentence])
+
+    chunks = []
+    current = ''
+    for segment in segments:
+        if current and len(current) + 1 + len(segment) > max_chars:
+            chunks.append(current)
+            current = ''
+        current = f"{current} {segment}" if current else segment
+        if len(current) >= min_chars and zlib.crc32(segment.lower().encode('utf-8')) % BOUNDARY_MODULUS == 0:
+            chunks.append(current)
+            current = ''
+    if current:
+        chunks.append(current)
+    return chunks
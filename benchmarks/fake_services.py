@@ -0,0 +1,253 @@
+"""
+Servicios simulados para los benchmarks: proveedores TTS HTTP con latencia configurable y un
+sustituto de MySQL sobre SQLite.
+
+- `FakeProviderServer` atiende cualquier POST como lo haría la API de PlayHT o Voicemaker en modo
+  stream: espera una latencia normal (media ± jitter) y responde con tramas MP3 de silencio.
+  Registra los textos recibidos, lo que permite saber qué solicitudes llegaron al proveedor, y
+  las conexiones TCP abiertas. `fail_next` programa respuestas de error para probar los reintentos.
+- `SQLitePool` reemplaza a `mysql.connector.pooling.MySQLConnectionPool` en `DBService`: entrega
+  conexiones SQLite con la interfaz que usa el servicio (`ping`, cursores con `dictionary` y
+  `buffered`, `rowcount`, `lastrowid`) y traduce los marcadores `%s` y el
+  `ON DUPLICATE KEY UPDATE` de las inserciones masivas.
+"""
+import json
+import queue
+import random
+import re
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterable, List, Optional, Set
+
+import mysql.connector
+
+# Trama MPEG-1 Layer III de 128 kbps a 44.1 kHz: encabezado + 413 bytes de silencio (417 bytes)
+MP3_FRAME = b'\xff\xfb\x90\x64' + bytes(413)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS generated_audios (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    original_text TEXT,
+    input_text TEXT NOT NULL,
+    information_id INTEGER DEFAULT NULL,
+    file_url VARCHAR(255) NOT NULL,
+    audio_hash VARCHAR(64) NOT NULL UNIQUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS information_audios (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    voice_name VARCHAR(255) NOT NULL,
+    language VARCHAR(45) NOT NULL,
+    gender VARCHAR(1) NOT NULL,
+    type VARCHAR(10) NOT NULL,
+    platform VARCHAR(45) DEFAULT NULL,
+    model VARCHAR(500) NOT NULL,
+    metadata TEXT DEFAULT NULL
+);
+"""
+
+
+class FakeProviderServer:
+    """Proveedor TTS simulado que responde en un hilo propio con latencia media ± jitter (ms)"""
+
+    def __init__(self, name: str, latency_ms: float, jitter_ms: float, audio_kb: int = 32, token_pattern: str = None):
+        self.name = name
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.audio = MP3_FRAME * max(1, audio_kb * 1024 // len(MP3_FRAME))
+        self.token_regex = re.compile(token_pattern) if token_pattern else None
+        self.requests = 0
+        self.connections = 0
+        self.tokens: Set[str] = set()
+        self._failures: List[int] = []
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> 'FakeProviderServer':
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                with fake._lock:
+                    fake.connections += 1
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                fake.record(body)
+                status = fake.next_failure()
+                if status is not None:
+                    message = json.dumps({'error': f"Error simulado {status}"}).encode()
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(message)))
+                    self.end_headers()
+                    self.wfile.write(message)
+                    return
+                time.sleep(max(0.0, random.gauss(fake.latency_ms, fake.jitter_ms)) / 1000)
+                self.send_response(200)
+                self.send_header('Content-Type', 'audio/mpeg')
+                self.send_header('Content-Length', str(len(fake.audio)))
+                self.end_headers()
+                self.wfile.write(fake.audio)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name=f"fake-{self.name}", daemon=True).start()
+        return self
+
+    def record(self, body: bytes) -> None:
+        """Cuenta la solicitud y guarda las marcas de texto que contiene"""
+        tokens = []
+        if self.token_regex is not None:
+            try:
+                payload = json.loads(body or b'{}')
+            except json.JSONDecodeError:
+                payload = {}
+            text = payload.get('text') or payload.get('Text') or ''
+            tokens = self.token_regex.findall(text)
+        with self._lock:
+            self.requests += 1
+            self.tokens.update(tokens)
+
+    def fail_next(self, *statuses: int) -> None:
+        """Programa los códigos de error con los que se responderán las siguientes solicitudes"""
+        with self._lock:
+            self._failures.extend(statuses)
+
+    def next_failure(self) -> Optional[int]:
+        with self._lock:
+            return self._failures.pop(0) if self._failures else None
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {'requests': self.requests, 'connections': self.connections, 'tokens': set(self.tokens)}
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+class SQLiteCursor:
+    """Cursor SQLite con la interfaz del cursor de mysql.connector usada por `DBService`"""
+
+    def __init__(self, connection: sqlite3.Connection, dictionary: bool = False):
+        self._cursor = connection.cursor()
+        self._dictionary = dictionary
+
+    @staticmethod
+    def translate(sql: str) -> str:
+        sql = sql.replace('%s', '?')
+        if 'ON DUPLICATE KEY UPDATE' in sql:
+            sql = sql[:sql.index('ON DUPLICATE KEY UPDATE')].replace('INSERT INTO', 'INSERT OR IGNORE INTO', 1)
+        return sql
+
+    def execute(self, sql: str, params: Iterable[Any] = ()) -> None:
+        try:
+            self._cursor.execute(self.translate(sql), tuple(params or ()))
+        except sqlite3.Error as e:
+            raise mysql.connector.errors.DatabaseError(msg=str(e))
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return {column[0]: value for column, value in zip(self._cursor.description, row)}
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchmany(self, size: int = 1) -> List:
+        return [self._row(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self) -> List:
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self) -> int:
+        return self._cursor.lastrowid
+
+    def close(self) -> None:
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """Conexión del pool; `close` la devuelve al pool como las conexiones de mysql.connector"""
+
+    unread_result = False
+
+    def __init__(self, pool: 'SQLitePool', connection: sqlite3.Connection):
+        self._pool = pool
+        self._connection = connection
+
+    def ping(self, **kwargs) -> None:
+        pass
+
+    def cursor(self, dictionary: bool = False, buffered: bool = True) -> SQLiteCursor:
+        return SQLiteCursor(self._connection, dictionary)
+
+    def commit(self) -> None:
+        self._connection.commit()
+
+    def rollback(self) -> None:
+        self._connection.rollback()
+
+    def consume_results(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self._pool.release(self._connection)
+
+
+class SQLitePool:
+    """
+    Sustituto de `MySQLConnectionPool` sobre un archivo SQLite en modo WAL. Acepta (e ignora) los
+    parámetros de conexión de MySQL para poder crearse con los mismos argumentos.
+    """
+
+    def __init__(self, path: str, pool_size: int = 10, **kwargs):
+        self.path = path
+        self._idle: 'queue.Queue[sqlite3.Connection]' = queue.Queue()
+        connection = self._connect()
+        connection.executescript(SCHEMA)
+        connection.commit()
+        self._idle.put(connection)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+
+    def get_connection(self) -> SQLiteConnection:
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            connection = self._connect()
+        return SQLiteConnection(self, connection)
+
+    def release(self, connection: sqlite3.Connection) -> None:
+        self._idle.put(connection)
+
+    def _remove_connections(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
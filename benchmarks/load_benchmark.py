@@ -0,0 +1,442 @@
+"""
+Prueba de carga del servicio con proveedores simulados.
+
+Arranca la aplicación en proceso (con su lifespan) apuntando PlayHT y Voicemaker a servidores HTTP
+simulados con latencia y jitter configurables, S3 a moto (o al endpoint de `config.yaml`, por
+ejemplo un MinIO local) y la base de datos a un archivo SQLite temporal (o al MySQL del `.env`).
+Luego reproduce un corpus JSONL a un ritmo fijo de solicitudes por segundo, en lazo abierto: cada
+solicitud sale en su instante programado aunque las anteriores no hayan terminado, y su latencia
+se mide desde ese instante, de modo que la cola que se forma al saturarse el servicio se refleja
+en los percentiles.
+
+El corpus se reproduce dos veces: la fase `miss` con el caché frío (cada texto distinto llega al
+proveedor) y la fase `hit` con los mismos textos ya generados. Para cada fase y endpoint se reporta
+p50/p95/p99, throughput, errores, la proporción de solicitudes resueltas sin llamar al proveedor y
+la memoria residente máxima observada al completar sus solicitudes (la memoria es del proceso, no
+aislada por endpoint). A cada texto se le agrega una marca de la ejecución (`bm<id>x<n>`), con lo
+que la fase `miss` no encuentra audios de ejecuciones anteriores y los proveedores simulados saben
+qué textos sintetizaron.
+
+Cada línea del corpus puede ser un texto (`read`, `text` o `body`, o un string JSON), que se envía
+a los endpoints de `--endpoints` alternando los modelos de voz de benchmark, o una solicitud grabada
+con `method`, `path` y `json`. Los resultados se agregan a `--history` (JSONL) junto con el commit y
+los parámetros; `--compare` los contrasta con la última ejecución de iguales parámetros y termina
+con código 1 si alguna métrica empeora más de `--threshold` por ciento.
+
+Uso:
+    python -m benchmarks.load_benchmark --corpus requests.jsonl --qps 20
+    python -m benchmarks.load_benchmark --qps 50 --latency-ms 800 --jitter-ms 250 --compare
+    python -m benchmarks.load_benchmark --db mysql --s3 config --endpoints tts stream
+"""
+import argparse
+import asyncio
+import contextlib
+import datetime
+import itertools
+import json
+import math
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+from unittest import mock
+
+from benchmarks.fake_services import FakeProviderServer, SQLitePool
+from benchmarks.s3_upload_benchmark import moto_context
+from benchmarks.startup_benchmark import peak_rss_mb
+
+# Variables que exige `config.yaml`; los proveedores simulados no validan credenciales
+DEFAULT_ENV = {
+    'CORS_ORIGINS': '["*"]',
+    'PLAYHT_API_USER_ID': 'benchmark',
+    'PLAYHT_API_AUTH_TOKEN': 'benchmark',
+    'VOICEMAKER_BEARER': 'benchmark',
+    'AWS_ACCESS_KEY': 'testing',
+    'AWS_SECRET_KEY': 'testing',
+    'AWS_REGION': 'us-east-1',
+    'AWS_BUCKET': 'tts-benchmark',
+    'AWS_URL': 'https://s3.amazonaws.com',
+    'DB_HOST': 'localhost',
+    'DB_USER': 'benchmark',
+    'DB_PASSWORD': 'benchmark',
+    'DB_NAME': 'benchmark',
+}
+
+PLATFORMS = ('playht', 'voicemaker')
+ENDPOINTS = {
+    'tts': ('POST', '/tts/{model_id}'),
+    'stream': ('POST', '/tts/stream/{model_id}'),
+}
+TOKEN_PATTERN = r'bm[0-9a-f]{6}x\d+'
+HISTORY_PATH = 'benchmarks/results/load_history.jsonl'
+# Métricas comparadas entre ejecuciones y si un valor mayor es una mejora
+TRACKED_METRICS = {'p50_ms': False, 'p95_ms': False, 'p99_ms': False, 'throughput_rps': True, 'hit_ratio': True}
+
+
+def current_rss_mb() -> float:
+    """Memoria residente actual del proceso en MB (la máxima si no hay /proc)"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def percentile(values: List[float], percent: float) -> Optional[float]:
+    """Percentil por rango más cercano"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered), math.ceil(percent / 100 * len(ordered))) - 1)
+    return round(ordered[index], 2)
+
+
+def load_corpus(path: str, limit: Optional[int]) -> List[Dict[str, Any]]:
+    """Lee el corpus conservando repeticiones y orden; cada entrada es un texto o una solicitud grabada"""
+    entries = []
+    with open(path, 'r', encoding='utf-8') as corpus:
+        for number, line in enumerate(corpus, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Línea {number}: JSON inválido ({e})")
+
+            if isinstance(entry, dict) and 'path' in entry:
+                entries.append({'method': entry.get('method', 'POST').upper(), 'path': entry['path'], 'json': entry.get('json')})
+            else:
+                read_text = entry if isinstance(entry, str) else (entry.get('read') or entry.get('text') or entry.get('body'))
+                if not isinstance(read_text, str) or not read_text.strip():
+                    raise ValueError(f"Línea {number}: no contiene texto")
+                original_text = entry.get('text') if isinstance(entry, dict) else None
+                entries.append({'read': read_text, 'text': original_text or read_text})
+
+            if limit and len(entries) >= limit:
+                break
+    return entries
+
+
+def build_requests(entries: List[Dict[str, Any]], model_ids: List[int], endpoints: List[str], run_id: str) -> List[Dict[str, Any]]:
+    """
+    Convierte el corpus en solicitudes. Cada texto distinto recibe una marca propia que se agrega al
+    final de `read`; los textos repetidos conservan la misma marca y por lo tanto el mismo audio.
+    """
+    tokens: Dict[str, str] = {}
+
+    def salt(body: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+        token = tokens.setdefault(body['read'], f"bm{run_id}x{len(tokens)}")
+        return dict(body, read=f"{body['read']} {token}"), token
+
+    targets = itertools.cycle(itertools.product(endpoints, model_ids))
+    requests = []
+    for entry in entries:
+        if 'path' in entry:
+            body, request_tokens = entry['json'], []
+            if isinstance(body, dict) and body.get('read'):
+                body, token = salt(body)
+                request_tokens.append(token)
+            elif isinstance(body, list):
+                salted = [salt(item) if isinstance(item, dict) and item.get('read') else (item, None) for item in body]
+                body = [item for item, _ in salted]
+                request_tokens = [token for _, token in salted if token]
+            path = entry['path'].split('?')[0]
+            requests.append({
+                'endpoint': f"{entry['method']} {re.sub(r'/[0-9]+(?=/|$)', '/{id}', path)}",
+                'method': entry['method'], 'path': entry['path'], 'body': body, 'tokens': request_tokens,
+            })
+        else:
+            endpoint, model_id = next(targets)
+            method, path = ENDPOINTS[endpoint]
+            body, token = salt({'read': entry['read'], 'text': entry['text']})
+            requests.append({'endpoint': endpoint, 'method': method, 'path': path.format(model_id=model_id),
+                             'body': body, 'tokens': [token]})
+    return requests
+
+
+async def asgi_request(app, method: str, path: str, body: Any = None) -> Tuple[int, int]:
+    """Envía una solicitud directamente a la aplicación ASGI; retorna el código y los bytes del cuerpo"""
+    path, _, query = path.partition('?')
+    payload = json.dumps(body).encode() if body is not None else b''
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method,
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(), 'root_path': '',
+        'headers': [(b'host', b'benchmark'), (b'content-type', b'application/json'),
+                    (b'content-length', str(len(payload)).encode())],
+        'client': ('127.0.0.1', 0), 'server': ('benchmark', 80),
+    }
+    finished = asyncio.Event()
+    pending_body = [payload]
+    response = {'status': 0, 'bytes': 0}
+
+    async def receive():
+        if pending_body:
+            return {'type': 'http.request', 'body': pending_body.pop(), 'more_body': False}
+        await finished.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+        elif message['type'] == 'http.response.body':
+            response['bytes'] += len(message.get('body', b''))
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        finished.set()
+    return response['status'], response['bytes']
+
+
+def summarize(samples: List[Dict[str, Any]], duration: float) -> Dict[str, Any]:
+    """Métricas de un conjunto de solicitudes de una fase"""
+    latencies = [sample['latency_ms'] for sample in samples if sample['ok']]
+    attributable = [sample for sample in samples if sample['tokens']]
+    misses = sum(1 for sample in attributable if sample['miss'])
+    return {
+        'requests': len(samples),
+        'errors': len(samples) - len(latencies),
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'max_ms': round(max(latencies), 2) if latencies else None,
+        'throughput_rps': round(len(latencies) / duration, 2) if duration > 0 else None,
+        'hit_ratio': round(1 - misses / len(attributable), 4) if attributable else None,
+        'rss_mb_max': round(max(sample['rss_mb'] for sample in samples), 1) if samples else None,
+    }
+
+
+async def run_phase(app, requests: List[Dict[str, Any]], qps: float, timeout: float,
+                    providers: Dict[str, FakeProviderServer]) -> Dict[str, Any]:
+    """Reproduce las solicitudes en lazo abierto y agrupa las métricas por endpoint"""
+    loop = asyncio.get_running_loop()
+    before = {name: server.snapshot() for name, server in providers.items()}
+    rss_start = current_rss_mb()
+
+    async def send(request: Dict[str, Any], scheduled: float) -> Dict[str, Any]:
+        try:
+            status, _ = await asyncio.wait_for(asgi_request(app, request['method'], request['path'], request['body']), timeout)
+        except Exception as e:
+            print(f"Error en {request['method']} {request['path']}: {e}")
+            status = 0
+        return {
+            'endpoint': request['endpoint'], 'tokens': request['tokens'], 'status': status,
+            'ok': 200 <= status < 400, 'latency_ms': (loop.time() - scheduled) * 1000, 'rss_mb': current_rss_mb(),
+        }
+
+    started = loop.time()
+    tasks = []
+    for index, request in enumerate(requests):
+        scheduled = started + index / qps
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(request, scheduled)))
+    samples = await asyncio.gather(*tasks)
+    duration = loop.time() - started
+
+    after = {name: server.snapshot() for name, server in providers.items()}
+    synthesized = set().union(*(after[name]['tokens'] - before[name]['tokens'] for name in providers))
+
+    # Una solicitud es un fallo de caché si es la primera (en orden de envío) con un texto sintetizado en la fase
+    seen = set()
+    for sample in samples:
+        sample['miss'] = any(token in synthesized and token not in seen for token in sample['tokens'])
+        seen.update(sample['tokens'])
+
+    endpoints = {}
+    for sample in samples:
+        endpoints.setdefault(sample['endpoint'], []).append(sample)
+    return {
+        'duration_seconds': round(duration, 3),
+        'provider_requests': {name: after[name]['requests'] - before[name]['requests'] for name in providers},
+        'rss_mb_start': round(rss_start, 1),
+        'rss_mb_end': round(current_rss_mb(), 1),
+        'all': summarize(samples, duration),
+        'endpoints': {name: summarize(group, duration) for name, group in sorted(endpoints.items())},
+    }
+
+
+async def ensure_models(app, voice_registry) -> List[int]:
+    """Crea (o reutiliza) un modelo de voz de benchmark por proveedor simulado"""
+    model_ids = []
+    for platform in PLATFORMS:
+        voice_name = f"benchmark-{platform}"
+        body = {'voice_name': voice_name, 'language': 'es-ES', 'gender': 'F', 'type': 'adult',
+                'platform': platform, 'model': f"benchmark-{platform}-voice"}
+        status, _ = await asgi_request(app, 'POST', '/models/', body)
+        model = voice_registry.get_by_name('es-ES', voice_name)
+        if model is None:
+            raise RuntimeError(f"No se pudo crear el modelo de benchmark {voice_name} (código {status})")
+        model_ids.append(model.id)
+    return model_ids
+
+
+def configure(tts_controller, args: argparse.Namespace, work_dir: str) -> None:
+    """Redirige los archivos locales del servicio al directorio temporal y desactiva los workers de trabajos"""
+    tts_controller.output_dir = os.path.join(work_dir, 'audios')
+    os.makedirs(tts_controller.output_dir, exist_ok=True)
+    tts_controller.jobs_config['workers'] = 0
+    tts_controller.jobs_config['path'] = os.path.join(work_dir, 'jobs.sqlite3')
+    for section in tts_controller.cache_config.values():
+        if isinstance(section, dict) and 'path' in section:
+            section['path'] = os.path.join(work_dir, os.path.basename(section['path']))
+    if args.s3 == 'moto':
+        tts_controller.aws_config.update({'url': None, 'region': 'us-east-1', 'bucket': 'tts-benchmark'})
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    for name, value in DEFAULT_ENV.items():
+        os.environ.setdefault(name, value)
+
+    from app.main import app
+    from app.controllers import tts_controller
+    from app.services.database import db_service as db_module
+
+    # Los audios locales, la cola de trabajos, los archivos del caché y la base SQLite se descartan al terminar
+    work_dir = tempfile.mkdtemp(prefix='tts-load-')
+    configure(tts_controller, args, work_dir)
+    run_id = os.urandom(3).hex()
+    providers = {
+        name: FakeProviderServer(name, args.latency_ms, args.jitter_ms, args.audio_kb, TOKEN_PATTERN).start()
+        for name in PLATFORMS
+    }
+
+    try:
+        with contextlib.ExitStack() as stack:
+            if args.s3 == 'moto':
+                stack.enter_context(moto_context())
+            if args.db == 'sqlite':
+                db_path = os.path.join(work_dir, 'tts.sqlite3')
+                stack.enter_context(mock.patch.object(
+                    db_module.pooling, 'MySQLConnectionPool',
+                    lambda **kwargs: SQLitePool(db_path, **kwargs)
+                ))
+
+            async with app.router.lifespan_context(app):
+                tts_service = tts_controller.tts_service
+                for name, server in providers.items():
+                    tts_service.providers[name].config['url'] = server.url
+                if args.s3 == 'moto':
+                    s3_service = tts_controller.service_container.s3_service
+                    s3_service.s3_client.create_bucket(Bucket=s3_service.bucket_name)
+
+                model_ids = await ensure_models(app, tts_controller.voice_registry)
+                requests = build_requests(load_corpus(args.corpus, args.limit), model_ids, args.endpoints, run_id)
+
+                phases = {}
+                for phase in ('miss', 'hit'):
+                    phases[phase] = await run_phase(app, requests, args.qps, args.timeout, providers)
+                    print(f"Fase {phase}: {phases[phase]['all']}")
+                    # Deja terminar las escrituras en segundo plano (por ejemplo las del streaming)
+                    await asyncio.sleep(args.settle)
+
+                cache_stats = tts_service.get_stats()['cache']
+    finally:
+        for server in providers.values():
+            server.stop()
+        # Los archivos del caché pueden seguir mapeados por otros procesos; se ignoran los errores al borrar
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'run_id': run_id,
+        'requests': len(requests),
+        'phases': phases,
+        'cache': cache_stats,
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def benchmark_params(args: argparse.Namespace) -> Dict[str, Any]:
+    """Parámetros que deben coincidir para comparar dos ejecuciones"""
+    return {
+        'corpus': os.path.basename(args.corpus), 'limit': args.limit, 'qps': args.qps,
+        'latency_ms': args.latency_ms, 'jitter_ms': args.jitter_ms, 'audio_kb': args.audio_kb,
+        'endpoints': sorted(args.endpoints), 'db': args.db, 's3': args.s3,
+    }
+
+
+def previous_record(history_path: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(history_path):
+        return None
+    previous = None
+    with open(history_path, 'r') as history:
+        for line in history:
+            if line.strip():
+                record = json.loads(line)
+                if record.get('params') == params:
+                    previous = record
+    return previous
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any], threshold: float) -> Dict[str, Any]:
+    """Variación porcentual de las métricas por fase y endpoint; marca las que empeoran más del umbral"""
+    deltas, regressions = {}, []
+    for phase, phase_result in current['phases'].items():
+        previous_phase = previous['phases'].get(phase, {})
+        groups = dict(phase_result['endpoints'], all=phase_result['all'])
+        previous_groups = dict(previous_phase.get('endpoints', {}), all=previous_phase.get('all', {}))
+        for endpoint, metrics in groups.items():
+            for metric, higher_is_better in TRACKED_METRICS.items():
+                old, new = previous_groups.get(endpoint, {}).get(metric), metrics.get(metric)
+                if not old or new is None:
+                    continue
+                change = (new - old) / old * 100
+                deltas.setdefault(phase, {}).setdefault(endpoint, {})[metric] = round(change, 1)
+                if (-change if higher_is_better else change) > threshold:
+                    regressions.append(f"{phase} {endpoint} {metric}: {old} -> {new} ({change:+.1f}%)")
+    return {'against': previous.get('commit'), 'timestamp': previous.get('timestamp'), 'deltas': deltas, 'regressions': regressions}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Prueba de carga del servicio TTS con proveedores simulados")
+    parser.add_argument('--corpus', default='requests.jsonl', help="Archivo JSONL a reproducir")
+    parser.add_argument('--limit', type=int, default=None, help="Máximo de líneas del corpus")
+    parser.add_argument('--qps', type=float, default=20, help="Solicitudes por segundo")
+    parser.add_argument('--endpoints', nargs='+', choices=sorted(ENDPOINTS), default=['tts'], help="Endpoints para las líneas de texto")
+    parser.add_argument('--latency-ms', type=float, default=400, help="Latencia media de los proveedores simulados")
+    parser.add_argument('--jitter-ms', type=float, default=100, help="Desviación estándar de la latencia")
+    parser.add_argument('--audio-kb', type=int, default=32, help="Tamaño del audio que responden los proveedores")
+    parser.add_argument('--db', choices=['sqlite', 'mysql'], default='sqlite', help="SQLite temporal o el MySQL del .env")
+    parser.add_argument('--s3', choices=['moto', 'config'], default='moto', help="S3 simulado o el endpoint de config.yaml")
+    parser.add_argument('--timeout', type=float, default=120, help="Segundos máximos por solicitud")
+    parser.add_argument('--settle', type=float, default=1, help="Segundos de espera entre fases")
+    parser.add_argument('--label', default=None, help="Etiqueta libre de la ejecución")
+    parser.add_argument('--history', default=HISTORY_PATH, help="Archivo JSONL con el historial de resultados")
+    parser.add_argument('--no-history', action='store_true', help="No agrega el resultado al historial")
+    parser.add_argument('--compare', action='store_true', help="Compara con la última ejecución de iguales parámetros")
+    parser.add_argument('--threshold', type=float, default=10, help="Porcentaje de empeoramiento considerado regresión")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_benchmark(args))
+    record = dict(
+        timestamp=datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        commit=git_commit(), label=args.label, params=benchmark_params(args), **result
+    )
+
+    comparison = None
+    if args.compare:
+        previous = previous_record(args.history, record['params'])
+        comparison = compare(previous, record, args.threshold) if previous else {'against': None, 'regressions': []}
+    if not args.no_history:
+        os.makedirs(os.path.dirname(args.history) or '.', exist_ok=True)
+        with open(args.history, 'a') as history:
+            history.write(json.dumps(record) + '\n')
+
+    print(json.dumps(dict(record, comparison=comparison) if comparison else record, indent=2))
+    if comparison and comparison['regressions']:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Mide el rendimiento de subida de audios a S3: secuencial contra el pool de `upload_many`.
+
+Se puede ejecutar contra un S3 simulado en proceso (moto) o contra el endpoint configurado
+en `config.yaml` (por ejemplo un MinIO local definido en `AWS_URL`).
+
+Uso:
+    python -m benchmarks.s3_upload_benchmark --moto --files 200 --size-kb 64
+    python -m benchmarks.s3_upload_benchmark --files 200 --size-kb 64
+"""
+import argparse
+import contextlib
+import json
+import os
+import time
+
+from app.services.storage.s3_service import S3Service
+from app.utils.yaml_loader import YamlLoaderMixin
+
+
+def moto_context():
+    """Retorna el contexto que simula AWS en proceso según la versión de moto instalada"""
+    try:
+        from moto import mock_aws
+        return mock_aws()
+    except ImportError:
+        from moto import mock_s3
+        return mock_s3()
+
+
+def build_config(use_moto: bool, workers: int) -> dict:
+    if use_moto:
+        aws_config = {
+            'access_key_id': 'testing',
+            'secret_access_key': 'testing',
+            'region': 'us-east-1',
+            'bucket': 'tts-benchmark',
+            'url': None,
+        }
+    else:
+        aws_config = dict(YamlLoaderMixin().load_yaml('config.yaml')['aws'])
+    aws_config['upload_workers'] = workers
+    return aws_config
+
+
+def run(files: int, size_kb: int, workers: int, use_moto: bool) -> dict:
+    payloads = [os.urandom(size_kb * 1024) for _ in range(files)]
+    total_mb = files * size_kb / 1024
+
+    with moto_context() if use_moto else contextlib.nullcontext():
+        s3_service = S3Service(build_config(use_moto, workers))
+        if use_moto:
+            s3_service.s3_client.create_bucket(Bucket=s3_service.bucket_name)
+
+        started = time.perf_counter()
+        for index, payload in enumerate(payloads):
+            s3_service.upload_audio_bytes(payload, f"bench-seq-{index}")
+        sequential = time.perf_counter() - started
+
+        started = time.perf_counter()
+        uploaded, failed = s3_service.upload_many(
+            [(payload, f"bench-pool-{index}") for index, payload in enumerate(payloads)]
+        )
+        pooled = time.perf_counter() - started
+
+    return {
+        'files': files,
+        'size_kb': size_kb,
+        'upload_workers': workers,
+        'sequential': {'seconds': round(sequential, 3), 'mb_per_s': round(total_mb / sequential, 2)},
+        'pooled': {
+            'seconds': round(pooled, 3),
+            'mb_per_s': round(total_mb / pooled, 2),
+            'uploaded': len(uploaded),
+            'failed': len(failed),
+        },
+        'speedup': round(sequential / pooled, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de subida de audios a S3")
+    parser.add_argument('--files', type=int, default=200, help="Cantidad de archivos a subir")
+    parser.add_argument('--size-kb', type=int, default=64, help="Tamaño de cada archivo en KB")
+    parser.add_argument('--workers', type=int, default=16, help="Hilos del pool de subida")
+    parser.add_argument('--moto', action='store_true', help="Usar un S3 simulado con moto")
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.files, args.size_kb, args.workers, args.moto), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Mide el tiempo de arranque del servicio contra la base de datos configurada en `.env`.
+
+Reporta por separado el tiempo de importación, el tiempo hasta que la aplicación está
+lista para aceptar solicitudes (fin del lifespan de arranque) y el tiempo hasta que
+termina la precarga del caché en segundo plano.
+
+Uso:
+    python -m benchmarks.startup_benchmark [--timeout 300]
+"""
+import argparse
+import asyncio
+import json
+import resource
+import time
+
+
+def peak_rss_mb() -> float:
+    """Memoria residente máxima del proceso en MB"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def measure(timeout: float) -> dict:
+    started = time.perf_counter()
+    from app.main import app
+    from app.controllers import tts_controller
+    imported = time.perf_counter()
+
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+
+        db_service = tts_controller.service_container.db_service
+        while not db_service.is_cache_warm and time.perf_counter() - ready < timeout:
+            await asyncio.sleep(0.05)
+        warm = time.perf_counter()
+
+        return {
+            'import_seconds': round(imported - started, 3),
+            'ready_seconds': round(ready - started, 3),
+            'cache_warm_seconds': round(warm - started, 3),
+            'cache_warm': db_service.is_cache_warm,
+            'cache': db_service.get_cache_stats(),
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de arranque del servicio TTS")
+    parser.add_argument('--timeout', type=float, default=300, help="Segundos máximos a esperar la precarga del caché")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(measure(args.timeout)), indent=2))
+
+
+if __name__ == '__main__':
+    main()
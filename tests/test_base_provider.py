@@ -0,0 +1,88 @@
+import pytest
+import requests
+
+from app.models.information_model import InformationModel
+from app.providers.playht_provider import PlayHTProvider
+from benchmarks.fake_services import FakeProviderServer
+
+MODEL = InformationModel(id=1, voice_name='voz', language='es-ES', gender='F', type='neural',
+                         platform='playht', model='voice-id')
+
+def provider_config(url: str, **http) -> dict:
+    return {
+        'url': url,
+        'headers': {'Content-Type': 'application/json', 'accept': 'audio/mpeg'},
+        'credentials': {'X-USER-ID': 'user', 'AUTHORIZATION': 'token'},
+        'defaults': {'voice_engine': 'Play3.0-mini', 'output_format': 'mp3', 'speed': 1},
+        'http': dict({'connect_timeout': 1, 'read_timeout': 5, 'max_retries': 3, 'backoff_factor': 0}, **http),
+    }
+
+@pytest.fixture
+def server():
+    fake = FakeProviderServer('playht', latency_ms=0, jitter_ms=0, audio_kb=4).start()
+    yield fake
+    fake.stop()
+
+@pytest.fixture
+def provider(server):
+    playht = PlayHTProvider(provider_config(server.url))
+    yield playht
+    playht.close()
+
+def synthesize(provider: PlayHTProvider, text: str = 'hola') -> bytes:
+    response = provider.execute_request(provider.build_request(text, MODEL))
+    return response.content
+
+def test_connections_are_reused(provider, server):
+    for i in range(5):
+        assert synthesize(provider, f"texto {i}") == server.audio
+
+    snapshot = server.snapshot()
+    assert snapshot['requests'] == 5
+    assert snapshot['connections'] == 1
+    assert provider.stats()['count'] == 5
+
+def test_retries_on_5xx(provider, server):
+    server.fail_next(503, 502)
+
+    assert synthesize(provider) == server.audio
+    assert server.snapshot()['requests'] == 3
+    assert provider.stats()['errors'] == 0
+
+def test_gives_up_after_max_retries(provider, server):
+    server.fail_next(500, 500, 500, 500)
+
+    with pytest.raises(ValueError, match='Error simulado 500'):
+        synthesize(provider)
+    assert server.snapshot()['requests'] == 4
+    assert provider.stats()['errors'] == 1
+
+def test_client_errors_are_not_retried(provider, server):
+    server.fail_next(400)
+
+    with pytest.raises(ValueError, match='Error simulado 400'):
+        synthesize(provider)
+    assert server.snapshot()['requests'] == 1
+
+def test_read_timeout_is_not_retried(server):
+    server.latency_ms = 500
+    playht = PlayHTProvider(provider_config(server.url, read_timeout=0.1))
+    try:
+        with pytest.raises(requests.exceptions.RequestException):
+            synthesize(playht)
+        assert playht.stats()['errors'] == 1
+    finally:
+        playht.close()
+    # El proveedor pudo haber procesado la solicitud, por lo que no se repite
+    assert server.snapshot()['requests'] == 1
+
+def test_connection_errors_are_raised(server):
+    url = server.url
+    server.stop()
+    playht = PlayHTProvider(provider_config(url, max_retries=2))
+    try:
+        with pytest.raises(requests.exceptions.ConnectionError):
+            synthesize(playht)
+        assert playht.stats()['errors'] == 1
+    finally:
+        playht.close()
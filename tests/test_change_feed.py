@@ -0,0 +1,114 @@
+import hashlib
+import time
+from unittest import mock
+
+import pytest
+
+from app.models.information_model import CreateVoiceModel, InformationModel
+from app.models.tts_model import TextToSpeechRequestById
+from app.services.database import db_service as db_module
+from app.services.database.change_feed import ChangeFeed
+from app.services.database.db_service import DBService
+from app.services.voices.voice_registry import VoiceRegistry
+from benchmarks.fake_services import SQLitePool
+
+INTERVAL = 0.1
+URL_PREFIX = 'https://bucket.s3.amazonaws.com/audios/'
+DB_CONFIG = {'host': 'localhost', 'user': 'tts', 'password': 'tts', 'database': 'tts', 'pool': {'size': 4}}
+CACHE_CONFIG = {'memory': {'max_entries': 1000}, 'index': {'enabled': True}, 'bloom': {'enabled': False}}
+MODEL = InformationModel(id=1, voice_name='voz', language='es-ES', gender='F', type='neural',
+                         platform='playht', model='modelo')
+
+def audio_hash(text: str) -> str:
+    return hashlib.md5(text.encode()).hexdigest()
+
+def wait_for(condition, timeout: float = INTERVAL * 20) -> bool:
+    """Espera hasta que `condition` sea verdadera o venza el tiempo"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(INTERVAL / 10)
+    return condition()
+
+@pytest.fixture
+def workers(tmp_path):
+    """Dos DBService (como dos workers) sobre el mismo archivo SQLite, el segundo con su ChangeFeed"""
+    db_path = str(tmp_path / 'tts.sqlite3')
+    with mock.patch.object(db_module.pooling, 'MySQLConnectionPool', lambda **kwargs: SQLitePool(db_path, **kwargs)):
+        writer = DBService(DB_CONFIG, CACHE_CONFIG, lambda h: f"{URL_PREFIX}{h}.mp3")
+        reader = DBService(DB_CONFIG, CACHE_CONFIG, lambda h: f"{URL_PREFIX}{h}.mp3")
+    registry = VoiceRegistry(reader)
+    registry.refresh()
+    feed = ChangeFeed(reader, registry, {'interval_seconds': INTERVAL, 'lookback_rows': 10})
+    feed.poll()
+    feed.start()
+    yield writer, reader, registry, feed
+    feed.stop()
+    writer.close()
+    reader.close()
+
+def test_insert_from_one_worker_is_visible_to_the_other(workers):
+    writer, reader, _, feed = workers
+    text = 'hola desde otro worker'
+    assert reader.get_cached_url(audio_hash(text)) is None
+
+    request = TextToSpeechRequestById(read=text, text=text)
+    assert writer.save_generated_audio(request, MODEL, f"{URL_PREFIX}{audio_hash(text)}.mp3", audio_hash(text))
+
+    assert wait_for(lambda: reader.get_cached_url(audio_hash(text)) is not None)
+    assert reader.get_cached_url(audio_hash(text)) == f"{URL_PREFIX}{audio_hash(text)}.mp3"
+    assert feed.stats()['applied_audios'] == 1
+
+def test_foreign_url_is_propagated(workers):
+    writer, reader, _, _ = workers
+    text = 'audio heredado'
+    legacy_url = 'https://legacy.example.com/audio.mp3'
+    writer.save_generated_audio(TextToSpeechRequestById(read=text, text=text), MODEL, legacy_url, audio_hash(text))
+
+    assert wait_for(lambda: reader.get_cached_url(audio_hash(text)) is not None)
+    assert reader.get_cached_url(audio_hash(text)) == legacy_url
+
+def insert_audio(db: DBService, row_id: int, text: str) -> None:
+    """Inserta una fila con un id explícito, como una transacción que se confirma fuera de orden"""
+    with db._cursor('insert_audio') as (connection, cursor):
+        cursor.execute(
+            "INSERT INTO generated_audios (id, original_text, input_text, information_id, file_url, audio_hash) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            (row_id, text, text, MODEL.id, f"{URL_PREFIX}{audio_hash(text)}.mp3", audio_hash(text))
+        )
+        connection.commit()
+
+def test_row_committed_below_the_watermark_is_picked_up(workers):
+    writer, reader, _, _ = workers
+    insert_audio(writer, 1, 'uno')
+    insert_audio(writer, 3, 'tres')
+    assert wait_for(lambda: reader.get_cached_url(audio_hash('tres')) is not None)
+
+    # El id 2 se confirma después de que la marca de agua pasó al 3
+    insert_audio(writer, 2, 'tarde')
+
+    assert wait_for(lambda: reader.get_cached_url(audio_hash('tarde')) is not None)
+
+def test_voice_models_are_propagated(workers):
+    writer, _, registry, _ = workers
+    created = writer.save_voice_model(CreateVoiceModel(voice_name='nueva', language='es-ES', gender='M',
+                                                       type='neural', platform='playht', model='m1'))
+
+    assert wait_for(lambda: registry.get_by_id(created.id) is not None)
+
+    with writer._cursor('update_model') as (connection, cursor):
+        cursor.execute("UPDATE information_audios SET model = %s WHERE id = %s", ('m2', created.id))
+        connection.commit()
+
+    assert wait_for(lambda: registry.get_by_id(created.id).model == 'm2')
+
+def test_unexpected_errors_do_not_stop_the_feed(workers):
+    writer, reader, registry, feed = workers
+    with mock.patch.object(registry, 'refresh', side_effect=TypeError('fila inválida')):
+        assert wait_for(lambda: feed.stats()['errors'] >= 2)
+
+    text = 'después del error'
+    writer.save_generated_audio(TextToSpeechRequestById(read=text, text=text), MODEL,
+                                f"{URL_PREFIX}{audio_hash(text)}.mp3", audio_hash(text))
+    assert wait_for(lambda: reader.get_cached_url(audio_hash(text)) is not None)
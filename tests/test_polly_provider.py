@@ -0,0 +1,117 @@
+import io
+
+import pytest
+from botocore.response import StreamingBody
+from botocore.stub import Stubber
+
+from app.models.information_model import InformationModel
+from app.providers.polly_provider import PollyAudioResponse, PollyProvider
+from app.services.tts.tts_service import TTSService
+from benchmarks.fake_services import MP3_FRAME
+
+CONFIG = {
+    'access_key_id': 'test',
+    'secret_access_key': 'test',
+    'region': 'us-east-1',
+    'output_format': 'mp3',
+    'engine': 'neural',
+    'max_text_length': 30,
+}
+MODEL = InformationModel(id=1, voice_name='Lucia', language='es-ES', gender='F', type='neural',
+                         platform='polly', model='Lucia',
+                         metadata={'LanguageCode': 'es-ES', 'fallback_voices': [2]})
+PARTS = ['Hola mundo.', 'Esta es la segunda parte.', 'Y esta la tercera.']
+
+def audio_stream(data: bytes) -> StreamingBody:
+    return StreamingBody(io.BytesIO(data), len(data))
+
+def expected_params(text: str, text_type: str = 'text') -> dict:
+    return {'OutputFormat': 'mp3', 'VoiceId': 'Lucia', 'Engine': 'neural', 'LanguageCode': 'es-ES',
+            'Text': text, 'TextType': text_type}
+
+@pytest.fixture
+def provider():
+    polly = PollyProvider(CONFIG)
+    yield polly
+    polly.close()
+
+@pytest.fixture
+def stubber(provider):
+    with Stubber(provider.client) as stub:
+        yield stub
+
+def stub_parts(stubber: Stubber, parts=PARTS) -> list:
+    """Programa una respuesta por parte y retorna los audios de cada una"""
+    audios = [MP3_FRAME * (index + 1) for index in range(len(parts))]
+    for part, audio in zip(parts, audios):
+        stubber.add_response('synthesize_speech', {'AudioStream': audio_stream(audio), 'ContentType': 'audio/mpeg'},
+                             expected_params(part))
+    return audios
+
+def test_build_request_splits_text_and_skips_routing_metadata(provider):
+    request = provider.build_request(' '.join(PARTS), MODEL)
+
+    assert request['parts'] == [expected_params(part) for part in PARTS]
+
+def test_ssml_is_sent_whole(provider, stubber):
+    ssml = '<speak>Hola</speak>'
+    stubber.add_response('synthesize_speech', {'AudioStream': audio_stream(MP3_FRAME)}, expected_params(ssml, 'ssml'))
+
+    response = provider.execute_request(provider.build_request(ssml, MODEL))
+
+    assert response.content == MP3_FRAME
+    stubber.assert_no_pending_responses()
+
+def test_parts_are_synthesized_as_the_stream_is_read(provider, stubber):
+    audios = stub_parts(stubber)
+
+    response = provider.execute_request(provider.build_request(' '.join(PARTS), MODEL))
+    assert isinstance(response, PollyAudioResponse)
+    # Solo la primera parte se sintetiza antes de leer la respuesta
+    with pytest.raises(AssertionError):
+        stubber.assert_no_pending_responses()
+
+    chunks = list(response.iter_content(chunk_size=100))
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert b''.join(chunks) == b''.join(audios)
+    stubber.assert_no_pending_responses()
+    assert provider.stats()['count'] == len(PARTS)
+
+def test_content_reads_every_part_once(provider, stubber):
+    audios = stub_parts(stubber)
+
+    response = provider.execute_request(provider.build_request(' '.join(PARTS), MODEL))
+
+    assert response.content == b''.join(audios)
+    assert response.content == b''.join(audios)
+    stubber.assert_no_pending_responses()
+
+def test_file_path_writes_the_whole_audio(provider, stubber, tmp_path):
+    audios = stub_parts(stubber)
+    audio_path = tmp_path / 'audio.mp3'
+
+    response = provider.execute_request(provider.build_request(' '.join(PARTS), MODEL))
+    TTSService.save_audio_from_response(response, str(audio_path))
+
+    assert audio_path.read_bytes() == b''.join(audios)
+
+def test_close_discards_pending_parts(provider, stubber):
+    stub_parts(stubber, PARTS[:1])
+
+    response = provider.execute_request(provider.build_request(' '.join(PARTS), MODEL))
+    response.close()
+
+    assert list(response.iter_content()) == []
+    stubber.assert_no_pending_responses()
+
+def test_client_errors_become_value_errors(provider, stubber):
+    stubber.add_client_error('synthesize_speech', service_error_code='TextLengthExceededException',
+                             service_message='Texto demasiado largo', http_status_code=400)
+
+    with pytest.raises(ValueError, match='TextLengthExceededException'):
+        provider.execute_request(provider.build_request(PARTS[0], MODEL))
+    assert provider.stats()['errors'] == 1
+
+def test_empty_text_is_rejected(provider):
+    with pytest.raises(ValueError):
+        provider.execute_request({'parts': []})
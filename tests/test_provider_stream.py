@@ -0,0 +1,86 @@
+import asyncio
+from contextlib import AsyncExitStack
+
+from app.services.tts.provider_governor import ProviderGovernor
+from app.services.tts.provider_stream import ProviderStream, ProviderStreamingResponse
+
+AUDIO = [b'uno', b'dos', b'tres']
+
+class FakeResponse:
+    """Respuesta del proveedor con `iter_content` y `close`"""
+
+    def __init__(self):
+        self.closed = 0
+
+    def iter_content(self, chunk_size: int = 8192):
+        return iter(AUDIO)
+
+    def close(self) -> None:
+        self.closed += 1
+
+async def open_stream(governor: ProviderGovernor) -> ProviderStream:
+    """Toma el turno y arma el flujo como `TTSService.stream_audio`"""
+    slot = AsyncExitStack()
+    await slot.enter_async_context(governor.slot(timeout=1))
+
+    async def chunks(stream: ProviderStream):
+        try:
+            for chunk in stream.response.iter_content():
+                # Como `iterate_in_threadpool`, cada bloque cede el control al event loop
+                await asyncio.sleep(0)
+                yield chunk
+        finally:
+            await stream.release()
+
+    return ProviderStream(FakeResponse(), slot, chunks)
+
+async def serve(stream: ProviderStream, messages: list) -> list:
+    """Ejecuta la respuesta ASGI con los mensajes del cliente indicados y retorna lo enviado"""
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        await asyncio.sleep(0)
+        sent.append(message)
+
+    scope = {'type': 'http', 'asgi': {'version': '3.0', 'spec_version': '2.0'}}
+    await ProviderStreamingResponse(stream, media_type='audio/mpeg')(scope, receive, send)
+    return sent
+
+def test_stream_is_released_after_being_read():
+    async def scenario():
+        governor = ProviderGovernor('playht', max_in_flight=1)
+        stream = await open_stream(governor)
+        sent = await serve(stream, [])
+        body = b''.join(message.get('body', b'') for message in sent if message['type'] == 'http.response.body')
+        return governor.stats()['in_flight'], stream.response.closed, body
+
+    in_flight, closed, body = asyncio.run(scenario())
+    assert body == b''.join(AUDIO)
+    assert in_flight == 0
+    assert closed == 1
+
+def test_stream_is_released_when_client_disconnects_before_the_first_chunk():
+    async def scenario():
+        governor = ProviderGovernor('playht', max_in_flight=1)
+        for _ in range(3):
+            stream = await open_stream(governor)
+            await serve(stream, [{'type': 'http.disconnect'}])
+            assert stream.response.closed == 1
+        return governor.stats()['in_flight']
+
+    assert asyncio.run(scenario()) == 0
+
+def test_release_is_idempotent():
+    async def scenario():
+        governor = ProviderGovernor('playht', max_in_flight=1)
+        stream = await open_stream(governor)
+        await stream.release()
+        await stream.release()
+        return governor.stats()['in_flight'], stream.response.closed
+
+    assert asyncio.run(scenario()) == (0, 1)